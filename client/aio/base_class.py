@@ -0,0 +1,163 @@
+import json as jsonlib
+
+from client.api.base_class import BaseAPIClass
+from client.model.polling import PollingStrategy
+from config import ConfigClass
+
+
+class AsyncResponse:
+    """the response of async request. The body is already read so `json()` can be called
+    as the `requests` response without await."""
+
+    def __init__(self, status_code, headers, content: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def json(self):
+        return jsonlib.loads(self.content)
+
+
+class AsyncBaseAPIClass(BaseAPIClass):
+    def __init__(self, api_client):
+        """Function Summary: The base class for all async apis class. The request is sent with the aiohttp
+        session of async client so it will not block the event loop.
+
+        Args:
+            api_client (AsyncPILOT): the async client instance after login
+
+        Examples:
+            >>> async with AsyncPILOT(endpoint, user, pass) as api_client:
+            >>>     ABAC = AsyncBaseAPIClass(api_client)
+        """
+
+        super().__init__(api_client)
+
+    @staticmethod
+    def _format_params(params):
+        """Function Summary: private function to convert the query parameters into the format of aiohttp. The
+        None value is skipped and list value is sent as repeated key like `requests` does.
+
+        Args:
+            params (dict): the args for the api logics
+
+        Returns:
+            list of (key, value) pairs
+        """
+
+        pairs = []
+        for key, value in (params or {}).items():
+            values = value if isinstance(value, (list, tuple)) else [value]
+            for v in values:
+                if v is None:
+                    continue
+                if isinstance(v, bool):
+                    v = str(v)
+                pairs.append((key, v if isinstance(v, (str, int, float)) else str(v)))
+
+        return pairs
+
+    async def _cached(self, key, loader, use_cache=True):
+        """Function Summary: the async version of `BaseAPIClass._cached`. The <loader> is the coroutine
+        function without argument.
+
+        Args:
+            key (hashable): the cache key eg. ('project_geid', <geid>)
+            loader (callable): the coroutine function to call the api
+            use_cache (bool): if false, always call the api and refresh the cache
+
+        Returns:
+            the cached or loaded value
+        """
+
+        cache = getattr(self.client, 'metadata_cache', None)
+        if cache is None:
+            return await loader()
+
+        missing = object()
+        value = cache.get(key, missing) if use_cache else missing
+        if value is missing:
+            value = await loader()
+            # only the found entity is cached
+            if value:
+                cache.set(key, value)
+
+        return value
+
+    async def _poll(self, check, is_done, description='task'):
+        """Function Summary: the async version of `BaseAPIClass._poll`. The <check> is the coroutine function.
+
+        Args:
+            check (callable): the coroutine function without argument to fetch the status
+            is_done (callable): the function takes the status and returns if the task is finished
+            description (string): the task name in the timeout message
+
+        Returns:
+            the last status returned by <check>
+        """
+
+        polling = getattr(self.client, 'polling', None) or PollingStrategy()
+        return await polling.async_poll(check, is_done, description)
+
+    async def _send_request(
+        self, api_endpoint, method='GET', json=None, params=None, headers=None, data=None, cookies=None, stream=False
+    ):
+        """Function Summary: private function for sending the async request. It adds the `Authorization` and
+        `Refresh-token` headers like the sync version. The token about to expire is refreshed before the request
+        and the request rejected with 401 is sent again once with the new token.
+
+        Args:
+            api_endpoint (string): the relative path for the api endpoints
+            method (string): HTTP methods: GET, POST, DELETE, PUT
+            json (dict): the payload for the api logics
+            params (dict): the args for the api logics
+            headers (dict): the extra headers for the api logic
+            data (FormData or bytes): the request body eg. the multipart form of chunk
+            cookies (dict): the cookies of request
+            stream (bool): if true, return the aiohttp response without reading the body. the
+                caller should use it with `async with`
+
+        Returns:
+            AsyncResponse or aiohttp ClientResponse if stream is true
+
+        Examples:
+            >>> res = await self._send_request(<relative_path>)
+        """
+
+        headers = dict(headers or {})
+        # add the at and rt into headers if there is no provided new token in header
+        with_token = not headers.get('Authorization', None)
+        refresh_token = getattr(self.client, 'refresh_token', None)
+        token = self.client.token
+        if with_token and callable(refresh_token) and token.is_expired(ConfigClass.token_refresh_margin):
+            token = await refresh_token(stale=token)
+
+        async def send(token):
+            request_headers = dict(headers, **self._auth_headers(token)) if with_token else headers
+            # aiohttp does not skip the None header as requests
+            request_headers = {k: v for k, v in request_headers.items() if v is not None}
+            return await self.client.session.request(
+                method,
+                self.client.base_url + api_endpoint,
+                json=json,
+                params=self._format_params(params),
+                headers=request_headers,
+                data=data,
+                cookies=cookies,
+            )
+
+        res = await send(token)
+        # the token expired or revoked. send again with the new token
+        if res.status == 401 and with_token and callable(refresh_token) and self._rewind(data, None):
+            res.release()
+            res = await send(await refresh_token(stale=token))
+
+        # if we request large return eg(files) we will return it right away
+        if stream:
+            return res
+
+        async with res:
+            content = await res.read()
+
+        res = AsyncResponse(res.status, res.headers, content)
+        return self._check_response(res, api_endpoint, method, json, params, headers)
@@ -0,0 +1,349 @@
+import asyncio
+import json
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    raise ImportError('The async client requires aiohttp. Please install it by `pip install aiohttp`')
+
+from client.credentials import Credentials
+from client.exceptions import AuthenticationError
+from client.model.metadata_cache import MetadataCache
+from client.model.polling import PollingStrategy
+from client.model.token_cache import TokenCache
+from config import ConfigClass
+
+
+class AsyncBaseClient:
+    """the base class of async client objects.
+
+    It manages the aiohttp session shared by all the async api classes bound to the
+    client. The session is created on the first request inside the event loop and
+    released by `await close()` or leaving the `async with` block.
+    """
+
+    def _init_session(self, pool_connections=None, pool_maxsize=None, timeout=None):
+        """Function Summary: private function to keep the settings of connection pool.
+
+        Args:
+            pool_connections (int): the number of hosts to keep the connection pool for. default
+                is `http_pool_connections` in config
+            pool_maxsize (int): the max number of connections per host. default is
+                `http_pool_maxsize` in config
+            timeout (float or tuple): the (connect, read) timeout in seconds for each request.
+                default is `http_connect_timeout` and `http_read_timeout` in config
+
+        Returns:
+            None
+        """
+
+        self.pool_connections = pool_connections or ConfigClass.http_pool_connections
+        self.pool_maxsize = pool_maxsize or ConfigClass.http_pool_maxsize
+        self.timeout = timeout or (ConfigClass.http_connect_timeout, ConfigClass.http_read_timeout)
+        self._session = None
+
+    @property
+    def session(self):
+        if self._session is None or self._session.closed:
+            connect_timeout, read_timeout = self.timeout if isinstance(self.timeout, tuple) else (self.timeout,) * 2
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_connections * self.pool_maxsize, limit_per_host=self.pool_maxsize
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=None, connect=connect_timeout, sock_read=read_timeout),
+            )
+
+        return self._session
+
+    async def _post_login(self, url, payload):
+        """Function Summary: private function to send the login request.
+
+        Args:
+            url (string): the full url of login api
+            payload (dict): the login payload
+
+        Returns:
+            dict: Contains the access token, refresh token and other login information
+        """
+
+        headers = {'Content-Type': 'application/json'}
+        async with self.session.post(url, json=payload, headers=headers) as response:
+            res_json = await response.json(content_type=None)
+
+        # parse the token if return 200 else raise the error
+        if response.status != 200:
+            raise AuthenticationError('Failed to login. ' + str(res_json))
+
+        return res_json['result']
+
+    async def _init_token(self):
+        """Function Summary: private function to get the non-expired token from cache or login. the
+        cache is only used when `token_cache` is set.
+
+        Args:
+            None
+
+        Returns:
+            Credentials
+        """
+
+        if not self.token_cache:
+            return await self._new_token()
+
+        # the file lock blocks, so the cache is read and written in the executor with the short lock and
+        # the login is awaited outside the lock. the other process might login at the same time
+        token_cache = self.token_cache if isinstance(self.token_cache, TokenCache) else TokenCache()
+        key = self._token_cache_key()
+        loop = asyncio.get_running_loop()
+        token = await loop.run_in_executor(None, token_cache.get, key)
+        # the token without expiry cannot be told if it is still valid
+        if token is None or token.expires_at is None or token.is_expired(ConfigClass.token_expiry_leeway):
+            token = await self._new_token()
+            await loop.run_in_executor(None, token_cache.put, key, token)
+
+        return token
+
+    async def refresh_token(self, stale: Credentials = None):
+        """Function Summary: renew the token of client. The api classes refresh the token which expires in
+        `token_refresh_margin` seconds before sending the request, so there is no background task. Only one
+        refresh is sent when many requests find the same token expired.
+
+        Args:
+            stale (Credentials): the token which is rejected or about to expire. if the client already
+                has another token, it is returned without refresh. default is to always refresh
+
+        Returns:
+            Credentials: the current token of client
+
+        Examples:
+            >>> await pilot_client.refresh_token()
+        """
+
+        if getattr(self, '_token_lock', None) is None:
+            self._token_lock = asyncio.Lock()
+
+        async with self._token_lock:
+            # another request has refreshed the token
+            if stale is not None and self.token is not stale:
+                return self.token
+
+            token = await self._refresh(self.token)
+            if self.token_cache:
+                token_cache = self.token_cache if isinstance(self.token_cache, TokenCache) else TokenCache()
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, token_cache.put, self._token_cache_key(), token)
+            self.token = token
+
+        return token
+
+    async def close(self):
+        """Function Summary: release the connection pool of client.
+
+        Args:
+            None
+
+        Examples:
+            >>> await pilot_client.close()
+        """
+
+        if self._session is not None:
+            await self._session.close()
+
+    async def __aenter__(self):
+        # the client created with token does not need login
+        if self.token is None:
+            await self.login()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+
+class AsyncPILOT(AsyncBaseClient):
+    def __init__(
+        self,
+        end_point=None,
+        username=None,
+        password=None,
+        token_crediential: Credentials = None,
+        upload_concurrency: int = None,
+        pool_connections: int = None,
+        pool_maxsize: int = None,
+        timeout=None,
+        cache_size: int = None,
+        cache_ttl: float = None,
+        polling: PollingStrategy = None,
+        token_cache=False,
+    ):
+        """Function Summary: The async version of PILOT client. The login is sent by `await login()` or entering
+        the `async with` block since it cannot be awaited in the initialization.
+
+        Args:
+            endpoint (string): the connection to PILOT server. default is `api_gateway` in config
+            username (string): the username in the PILOT system you will get it from
+                system admin
+            password (string): couple with username
+            token_crediential (Credentials): token is the another way to fulfill the
+                username/password authentication
+            upload_concurrency (int): the number of chunks uploading at the same time for all
+                the uploads of this client. default is `upload_concurrency` in config
+            pool_connections (int): the number of hosts to keep the connection pool for
+            pool_maxsize (int): the max number of connections per host
+            timeout (float or tuple): the (connect, read) timeout in seconds for each request
+            cache_size (int): the max number of entries in the metadata cache
+            cache_ttl (float): the seconds before the cached metadata expire
+            polling (PollingStrategy): the interval, backoff and deadline to wait for the tasks. default
+                is from the `poll_*` settings in config
+            token_cache (bool or TokenCache): reuse the non-expired token saved on disk by the previous
+                runs instead of login. True means the cache file at `token_cache_path` in config
+
+        Examples:
+            >>> async with AsyncPILOT(endpoint, user, pass) as pilot_client:
+            >>>     projects = await AsyncProjectApis(pilot_client).list_projects()
+
+            >>> pilot_client = AsyncPILOT(endpoint, user, pass)
+            >>> await pilot_client.login()
+        """
+
+        if not username and not password and not token_crediential:
+            raise ValueError('Either username/password or tokens is required')
+
+        self.base_url = end_point or ConfigClass.api_gateway
+        self.username = username
+        self.password = password
+        self.upload_concurrency = upload_concurrency or ConfigClass.upload_concurrency
+        # the project/dataset lookups shared by all the api classes of client
+        self.metadata_cache = MetadataCache(cache_size, cache_ttl)
+        self.polling = polling or PollingStrategy()
+        self.token = token_crediential
+        self.token_cache = token_cache
+        if self.token is not None:
+            self.username = self.username or self.token.claims.get('preferred_username')
+        self._init_session(pool_connections, pool_maxsize, timeout)
+
+    async def login(self):
+        """Function Summary: perform the user login and keep the token in client.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        Examples:
+            >>> await pilot_client.login()
+        """
+
+        self.token = await self._init_token()
+
+    async def _new_token(self):
+        payload = {
+            'username': self.username,
+            'password': self.password,
+        }
+        token = await self._post_login(self.base_url + ConfigClass.auth_url, payload)
+        return Credentials(token['access_token'], token['refresh_token'])
+
+    async def _refresh(self, token):
+        # get the new token with refresh token. login again if it fails and the password is known
+        if token.refresh_token:
+            url = self.base_url + ConfigClass.refresh_url
+            payload = {'refreshtoken': token.refresh_token}
+            async with self.session.post(url, json=payload, headers={'Content-Type': 'application/json'}) as response:
+                text = await response.text()
+            if response.status == 200:
+                result = json.loads(text)['result']
+                return Credentials(result['access_token'], result.get('refresh_token') or token.refresh_token)
+            # the server error might go away, so it is not taken as the rejected token
+            if response.status >= 500:
+                raise ConnectionError('Failed to refresh token. ' + text)
+            error = text
+        else:
+            error = 'no refresh token'
+
+        if self.password:
+            return await self._new_token()
+        raise AuthenticationError('Failed to refresh token. ' + error)
+
+    def _token_cache_key(self):
+        return TokenCache.key(self.base_url, self.username)
+
+
+class AsyncHPC(AsyncBaseClient):
+    def __init__(
+        self,
+        token_issuer,
+        end_point=None,
+        username=None,
+        password=None,
+        token_crediential: Credentials = None,
+        pool_connections: int = None,
+        pool_maxsize: int = None,
+        timeout=None,
+        token_cache=False,
+    ):
+        """Function Summary: The async version of HPC client. The login is sent by `await login()` or entering the
+        `async with` block.
+
+        Args:
+            token_issuer (string): the issuer of hpc token
+            endpoint (string): the connection to hpc service. default is `hpc_endpoint` in config
+            username (string): the username in the PILOT system
+            password (string): couple with username
+            token_crediential (Credentials): token is the another way to fulfill the
+                username/password authentication
+            pool_connections (int): the number of hosts to keep the connection pool for
+            pool_maxsize (int): the max number of connections per host
+            timeout (float or tuple): the (connect, read) timeout in seconds for each request
+            token_cache (bool or TokenCache): reuse the non-expired token saved on disk by the previous
+                runs instead of login. True means the cache file at `token_cache_path` in config
+
+        Examples:
+            >>> async with AsyncHPC(<token_issuer>, endpoint, user, pass) as hpc_client:
+            >>>     hpc_api = AsyncHPCApis(hpc_client, <slurm_host>)
+        """
+
+        if not username and not password and not token_crediential:
+            raise ValueError('Either username/password or tokens is required')
+
+        self.base_url = end_point or ConfigClass.hpc_endpoint
+        self.username = username
+        self.password = password
+        self.token_issuer = token_issuer
+        self.token = token_crediential
+        self.token_cache = token_cache
+        self._init_session(pool_connections, pool_maxsize, timeout)
+
+    async def login(self):
+        """Function Summary: perform the hpc login and keep the token in client.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        Examples:
+            >>> await hpc_client.login()
+        """
+
+        self.token = await self._init_token()
+
+    async def _new_token(self):
+        payload = {
+            'username': self.username,
+            'password': self.password,
+            'token_issuer': self.token_issuer,
+        }
+        token = await self._post_login(self.base_url + '/v1/hpc/auth', payload)
+        return Credentials(token)
+
+    async def _refresh(self, token):
+        # the hpc service only issues the access token
+        if not self.password:
+            raise AuthenticationError('Failed to refresh token. The hpc token can only be renewed by login')
+        return await self._new_token()
+
+    def _token_cache_key(self):
+        return TokenCache.key(self.base_url, self.token_issuer, self.username)
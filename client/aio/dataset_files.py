@@ -0,0 +1,242 @@
+import json
+import uuid
+
+from client.aio.base_class import AsyncBaseAPIClass
+from client.aio.file_task_socket import AsyncDatasetFileTaskManager
+from config import ConfigClass
+
+
+class AsyncDatasetFileApis(AsyncBaseAPIClass):
+    async def _wait_dataset_task(self, dataset_geid, action, session_id, send, timeout=None):
+        """Function Summary: private function to send the dataset file request and wait for the
+        socketio notification of the processing files.
+
+        Args:
+            dataset_geid (string): unique identifier of entity for dataset
+            action (string): the action of notification eg. dataset_file_import
+            session_id (string): the session id of file operation
+            send (callable): the coroutine function without argument to send the request
+            timeout (float): the max seconds to wait. default is scaled by the number of files
+
+        Returns:
+            (response, list of notification message). empty list if no file is processing
+        """
+
+        # connect before sending the request so the fast jobs are not missed
+        task_manager = AsyncDatasetFileTaskManager(
+            socketio_endpoint=ConfigClass.socketio_endpoint,
+            dataset_geid=dataset_geid,
+            action=action,
+            session_id=session_id,
+        )
+        await task_manager.connect()
+        try:
+            res = await send()
+            # NOTE: we might have the duplicate import, base on the return to waiting
+            # the message for the job status. if all files are block we just quit.
+            processed_geid = [x.get('global_entity_id') for x in res.json().get('result')['processing']]
+            task_res = []
+            if len(processed_geid) > 0:
+                await task_manager.set_sources(processed_geid)
+                # then use socketio to wait for the job done
+                task_res = await task_manager.wait_response(timeout)
+        finally:
+            await task_manager.close()
+
+        return res, task_res
+
+    async def import_files(self, dataset_geid, source_project_geid, source_list: list, timeout=None):
+        """Function Summary: The async version of `DatasetFileApis.import_files`.
+
+        Args:
+            dataset_geid (string): unique identifier of entity for dataset
+            source_project_geid (string): unique identifier of entity for project
+            source_list (list of string): list of folder/files geid will be import
+                to dataset
+            timeout (float): the max seconds to wait for the jobs. default is scaled by the
+                number of files(see `dataset_wait_timeout` in config)
+
+        Returns:
+            the job status of each file. The status will have the detail of new node
+
+        Examples:
+            >>> DFA = AsyncDatasetFileApis(pilot_client)
+            >>> res = await DFA.import_files(<dataset_geid>, <project_geid>, [<file_geid>, <folder_geid>])
+        """
+
+        session_id = self.client.username + '-' + str(uuid.uuid4())
+        payload = {
+            'source_list': source_list,
+            'operator': self.client.username,
+            'project_geid': source_project_geid,
+        }
+        cookies = {
+            'sessionId': session_id,
+        }
+
+        url = ConfigClass.dataset_files_url % (dataset_geid)
+        res, _ = await self._wait_dataset_task(
+            dataset_geid,
+            'dataset_file_import',
+            session_id,
+            lambda: self._send_request(url, method='PUT', json=payload, cookies=cookies),
+            timeout,
+        )
+
+        return res.json().get('result', {})
+
+    async def list_files(
+        self,
+        dataset_geid,
+        folder_geid=None,
+        page=0,
+        page_size=25,
+        order_by='create_time',
+        order_type='desc',
+        query=None,
+    ):
+        """Function Summary: The async version of `DatasetFileApis.list_files`.
+
+        Args:
+            dataset_geid (string): unique identifier of entity
+            folder_geid (string): will list the folder/file under the geid if specified
+                else will list the folder/file under project.
+            order_by (string): "time_created", "name" or "code"
+            order_type (string): increasing order(asc) or decreasing order(desc)
+            page_size (int): page size for the result(eg limit)
+            page (int): page number(eg. skip = page_size*page)
+            query (dict): dict of attribute that you want to search
+
+        Returns:
+            list of file and folder node under given dataset
+
+        Examples:
+            >>> DFA = AsyncDatasetFileApis(pilot_client)
+            >>> res = await DFA.list_files(<dataset_geid>, folder_geid="<some_folder_geid>")
+        """
+
+        query_params = {
+            'page': page,
+            'page_size': page_size,
+            'order_by': order_by,
+            'order_type': order_type,
+            'query': json.dumps(query or {}),
+        }
+        if folder_geid:
+            query_params.update({'folder_geid': folder_geid})
+
+        url = ConfigClass.dataset_files_url % (dataset_geid)
+        res = await self._send_request(url, method='GET', params=query_params)
+
+        return res.json().get('result', {}).get('data', [])
+
+    async def delete_files(self, dataset_geid, source_list: list, timeout=None):
+        """Function Summary: The async version of `DatasetFileApis.delete_files`.
+
+        Args:
+            dataset_geid (string): unique identifier of entity for dataset
+            source_list (list of string): list of file/folder that will be deleted
+            timeout (float): the max seconds to wait for the jobs. default is scaled by the
+                number of files(see `dataset_wait_timeout` in config)
+
+        Returns:
+            the job status of each file. The status will have the detail of new node
+
+        Examples:
+            >>> DFA = AsyncDatasetFileApis(pilot_client)
+            >>> res = await DFA.delete_files(<dataset_geid>, [<file_geid>, <folder_geid>])
+        """
+
+        session_id = self.client.username + '-' + str(uuid.uuid4())
+        payload = {
+            'source_list': source_list,
+            'operator': self.client.username,
+        }
+        cookies = {
+            'sessionId': session_id,
+        }
+
+        url = ConfigClass.dataset_files_url % (dataset_geid)
+        res, _ = await self._wait_dataset_task(
+            dataset_geid,
+            'dataset_file_delete',
+            session_id,
+            lambda: self._send_request(url, method='DELETE', json=payload, cookies=cookies),
+            timeout,
+        )
+
+        return res.json().get('result', {})
+
+    async def move_files(self, dataset_geid, source_files: list, target_folder_geid: str, timeout=None):
+        """Function Summary: The async version of `DatasetFileApis.move_files`.
+
+        Args:
+            dataset_geid (string): unique identifier of entity for dataset
+            source_files (list of string): list of file/folder that will be moved
+            target_folder_geid (string): the target folder you want to move. this
+                can be the datset geid.
+            timeout (float): the max seconds to wait for the jobs. default is scaled by the
+                number of files(see `dataset_wait_timeout` in config)
+
+        Returns:
+            the job status of each file. The status will have the detail of new node
+
+        Examples:
+            >>> DFA = AsyncDatasetFileApis(pilot_client)
+            >>> res = await DFA.move_files(<dataset_geid>, [<file_geid>, <folder_geid>], <folder_geid>)
+        """
+
+        session_id = self.client.username + '-' + str(uuid.uuid4())
+        payload = {'source_list': source_files, 'operator': self.client.username, 'target_geid': target_folder_geid}
+        cookies = {
+            'sessionId': session_id,
+        }
+
+        url = ConfigClass.dataset_files_url % (dataset_geid)
+        res, task_res = await self._wait_dataset_task(
+            dataset_geid,
+            'dataset_file_move',
+            session_id,
+            lambda: self._send_request(url, method='POST', json=payload, cookies=cookies),
+            timeout,
+        )
+
+        return task_res
+
+    async def rename_file(self, dataset_geid, file_geid: str, new_name: str, timeout=None):
+        """Function Summary: The async version of `DatasetFileApis.rename_file`.
+
+        Args:
+            dataset_geid (string): unique identifier of entity for dataset
+            file_geid (string): unique identifier of target file
+            new_name (string): the new name string
+            timeout (float): the max seconds to wait for the jobs. default is scaled by the
+                number of files(see `dataset_wait_timeout` in config)
+
+        Returns:
+            the job status of target file. The status will have the detail of new node
+
+        Examples:
+            >>> DFA = AsyncDatasetFileApis(pilot_client)
+            >>> res = await DFA.rename_file(<dataset_geid>, <file_geid>, "new name")
+        """
+
+        session_id = self.client.username + '-' + str(uuid.uuid4())
+        payload = {
+            'new_name': new_name,
+            'operator': self.client.username,
+        }
+        cookies = {
+            'sessionId': session_id,
+        }
+
+        url = ConfigClass.dataset_file_ops_url % (dataset_geid, file_geid)
+        res, task_res = await self._wait_dataset_task(
+            dataset_geid,
+            'dataset_file_rename',
+            session_id,
+            lambda: self._send_request(url, method='POST', json=payload, cookies=cookies),
+            timeout,
+        )
+
+        return task_res
@@ -0,0 +1,119 @@
+from client.aio.base_class import AsyncBaseAPIClass
+from client.model.validator import array_of_string_vali
+from config import ConfigClass
+
+
+class AsyncDatasetApis(AsyncBaseAPIClass):
+    async def list_dataset(self, order_by='time_created', order_type='desc', page=0, page_size=10, filters=None):
+        """Function Summary: The async version of `DatasetApis.list_dataset`.
+
+        Args:
+            order_by (string): "time_created", "name" or "code"
+            order_type (string): increasing order(asc) or decreasing order(desc)
+            page_size (int): page size for the result(eg limit)
+            page (int): page number(eg. skip = page_size*page)
+            filters (dict): dict of special query for the searching
+
+        Returns:
+            list of dataset detail
+
+        Examples:
+            >>> DA = AsyncDatasetApis(pilot_client)
+            >>> res = await DA.list_dataset()
+        """
+
+        query_params = {
+            'order_by': order_by,
+            'order_type': order_type,
+            'page_size': page_size,
+            'page': page,
+            'filter': filters or {},
+        }
+
+        url = ConfigClass.user_dataset_url % (self.client.username)
+        res = await self._send_request(url, method='POST', json=query_params)
+
+        return res.json().get('result', [])
+
+    async def get_dataset(self, dataset_geid, use_cache=True):
+        """Function Summary: The async version of `DatasetApis.get_dataset`.
+
+        Args:
+            dataset_geid (string): unique identifier of dataset
+            use_cache (bool): if false, always fetch from server and refresh the cache
+
+        Returns:
+            dataset detail
+
+        Examples:
+            >>> DA = AsyncDatasetApis(pilot_client)
+            >>> res = await DA.get_dataset(<dataset_geid>)
+        """
+
+        async def load():
+            url = ConfigClass.dataset_ops_url % (dataset_geid)
+            res = await self._send_request(url, method='GET')
+            return res.json().get('result', {})
+
+        return await self._cached(('dataset_geid', dataset_geid), load, use_cache)
+
+    async def create_dataset(
+        self,
+        title,
+        code,
+        description,
+        type_='GENERAL',
+        modality=None,
+        authors=None,
+        collection_method=None,
+        license_='',
+        tags=None,
+    ):
+        """Function Summary: The async version of `DatasetApis.create_dataset`.
+
+        Args:
+            title (string): project name
+            code (string): project code
+            description (string): searching parameter for description
+            type_ (string): "GENERAL" or "BIDS",
+            modality (list): modality
+            authors (list): authors
+            collection_method (list): collection_method,
+            license_ (string): license_
+            tags (list): tags
+
+        Returns:
+            new dataset detail
+
+        Examples:
+            >>> DA = AsyncDatasetApis(pilot_client)
+            >>> res = await DA.create_dataset(<title>, <code>, <description>)
+        """
+
+        modality = modality or []
+        authors = authors or []
+        collection_method = collection_method or []
+        tags = tags or []
+
+        # validation for the array of string
+        fields = {'authors': authors, 'collection_method': collection_method, 'tags': tags}
+        for f_name, f_value in fields.items():
+            array_of_string_vali(f_name, f_value)
+
+        url = ConfigClass.dataset_url
+        create_payload = {
+            'username': self.client.username,
+            'title': title,
+            'code': code,
+            'authors': authors,
+            'type': type_,
+            'modality': modality,
+            'collection_method': collection_method,
+            'license': license_,
+            'tags': tags,
+            'description': description,
+        }
+
+        res = await self._send_request(url, method='POST', json=create_payload)
+
+        return res.json().get('result')
@@ -0,0 +1,24 @@
+from client.aio.base_class import AsyncBaseAPIClass
+from config import ConfigClass
+
+
+class AsyncProjectFileTaskManager(AsyncBaseAPIClass):
+
+    label = 'Container'
+
+    @property
+    def project_file_task_url(self):
+        return ConfigClass.project_file_task_url
+
+    async def check_status(self, action, project_code, session_id, job_id='*'):
+
+        query_params = {
+            'action': action,
+            'project_code': project_code,
+            'session_id': session_id,
+        }
+
+        res = await self._send_request(self.project_file_task_url, method='GET', params=query_params)
+
+        # since we only do operation per file
+        return res.json().get('result')[0]
@@ -0,0 +1,85 @@
+import asyncio
+
+from client.exceptions import DatasetTaskTimeoutError
+from client.model.file_task_socket import dataset_wait_timeout
+
+
+# the async version of DatasetFileTaskManager. It waits for the socketio
+# notification on the event loop instead of sleeping in the thread
+class AsyncDatasetFileTaskManager(object):
+    def __init__(self, socketio_endpoint, dataset_geid, action, session_id):
+        self.socketio_endpoint = socketio_endpoint
+        self.namespace = '/' + dataset_geid
+        # the source geids are only known after the request. set by `set_sources`
+        self.source_map = None
+        self.action = action
+        self.session_id = session_id
+        self.file_notification_msg = []
+        self._early_msg = []
+        # socketio is only loaded when the dataset operation waits for notification
+        import socketio
+
+        self.sio = socketio.AsyncClient()
+
+        self._finished = asyncio.Event()
+
+        self.sio.on('DATASET_FILE_NOTIFICATION', self.set_notification, namespace=self.namespace)
+
+    async def set_notification(self, data):
+        # same checking condition as the sync version:
+        # status is FINISH, action and session_id are the same
+        # and the geid IS in the record map
+        source_geid = data['payload']['source']['global_entity_id']
+        if (
+            data['payload']['session_id'] == self.session_id
+            and data['payload']['status'] == 'FINISH'
+            and data['payload']['action'] == self.action
+        ):
+            # the job finished before the request returns the geids
+            if self.source_map is None:
+                self._early_msg.append(data)
+            elif self.source_map.get(source_geid):
+                self.file_notification_msg.append(data)
+                self.source_map.pop(source_geid)
+
+                if not self.source_map:
+                    self._finished.set()
+
+    async def set_sources(self, source_geids: list):
+        """set the geids to wait and apply the notifications received before."""
+
+        # since we might have batch operation so make a dict
+        # to keep track if all job are finished
+        self.source_map = {x: 1 for x in source_geids}
+        early_msg, self._early_msg = self._early_msg, []
+        if not self.source_map:
+            self._finished.set()
+
+        for data in early_msg:
+            await self.set_notification(data)
+
+    async def connect(self):
+        # connect to socket server
+        await self.sio.connect(self.socketio_endpoint, namespaces=[self.namespace])
+
+    async def wait_response(self, timeout=None):
+        if timeout is None:
+            timeout = dataset_wait_timeout(len(self.source_map))
+
+        try:
+            await asyncio.wait_for(self._finished.wait(), timeout)
+        except asyncio.TimeoutError:
+            # raise the error if we timeout. the jobs might still finish on server
+            pending = list(self.source_map)
+            raise DatasetTaskTimeoutError(
+                'Timeout after %s seconds for socketio, Job %s are not finished' % (timeout, str(pending)),
+                pending,
+                list(self.file_notification_msg),
+            )
+
+        return self.file_notification_msg
+
+    async def close(self):
+        """stop receiving the notifications and disconnect from socket server."""
+
+        await self.sio.disconnect()
@@ -0,0 +1,127 @@
+from client.aio.base_class import AsyncBaseAPIClass
+from client.aio.client import AsyncHPC
+
+
+class AsyncHPCApis(AsyncBaseAPIClass):
+    def __init__(self, api_client: AsyncHPC, slurm_host: str, protocol: str = 'http'):
+        """Function Summary: The async version of `HPCApis`. The client must be logged in before.
+
+        Args:
+            api_client (AsyncHPC): the object where user do the authentication first
+            slurm_host (str): the http endpoint where the slurm worker node is located
+            protocol (str): http or https protocol
+
+        Returns:
+            None
+
+        Examples:
+            >>> async with AsyncHPC(<token_issuer>, <hpc_service_endpoints>, <username>, <password>) as hpc_client:
+            >>>     hpc_api = AsyncHPCApis(hpc_client, <slurm_host>)
+        """
+
+        super().__init__(api_client)
+
+        self.slurm_host = slurm_host
+        self.protocol = protocol
+
+    @property
+    def auth_header(self):
+        """the authorization header with the current token of client."""
+
+        return self._auth_headers(self.client.token)
+
+    def _auth_headers(self, token):
+        # here customize the authorization heades since it dont have Bearer
+        return {'Authorization': token.access_token}
+
+    def _query_params(self):
+        return {
+            'username': self.client.username,
+            'slurm_host': self.slurm_host,
+            'protocol': self.protocol,
+        }
+
+    async def list_nodes(self):
+        """Function Summary: List the available running nodes.
+
+        Examples:
+            >>> res = await hpc_api.list_nodes()
+        """
+
+        url = '/v1/hpc/nodes'
+        res = await self._send_request(url, method='GET', params=self._query_params())
+
+        return res.json().get('result')
+
+    async def get_node_info(self, node_name):
+        """Function Summary: get the information of specific running node.
+
+        Args:
+            node_name(string): the name of target node
+
+        Examples:
+            >>> res = await hpc_api.get_node_info("slurm-master-ubuntu2110")
+        """
+
+        url = '/v1/hpc/nodes/%s' % (node_name)
+        res = await self._send_request(url, method='GET', params=self._query_params())
+
+        return res.json().get('result')
+
+    async def list_partitions(self):
+        """Function Summary: List the available partitions.
+
+        Examples:
+            >>> res = await hpc_api.list_partitions()
+        """
+
+        url = '/v1/hpc/partitions'
+        res = await self._send_request(url, method='GET', params=self._query_params())
+
+        return res.json().get('result')
+
+    async def get_partition_info(self, partition_name):
+        """Function Summary: get the information of specific running partition.
+
+        Args:
+            partition_name(string): the name of target partition
+
+        Examples:
+            >>> res = await hpc_api.get_partition_info("debug")
+        """
+
+        url = '/v1/hpc/partitions/%s' % (partition_name)
+        res = await self._send_request(url, method='GET', params=self._query_params())
+
+        return res.json().get('result')
+
+    async def submit_job(self, job_info: dict) -> dict:
+        """Function Summary: submit the job to slurm.
+
+        Args:
+            job_info(dict): the job information
+
+        Examples:
+            >>> res = await hpc_api.submit_job(<job_info>)
+        """
+
+        url = '/v1/hpc/job'
+        payload = dict(self._query_params(), job_info=job_info)
+        res = await self._send_request(url, method='POST', json=payload)
+
+        return res.json().get('result')
+
+    async def get_job_info(self, job_id: int):
+        """Function Summary: fetch the job status by id.
+
+        Args:
+            job_id(int): the id of job
+
+        Examples:
+            >>> res = await hpc_api.get_job_info(40)
+        """
+
+        url = '/v1/hpc/job/%s' % (job_id)
+        res = await self._send_request(url, method='GET', params=self._query_params())
+
+        return res.json()
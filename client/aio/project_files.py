@@ -0,0 +1,366 @@
+import asyncio
+import json
+import os
+import uuid
+
+import aiohttp
+
+from client.aio.base_class import AsyncBaseAPIClass
+from client.aio.file_task import AsyncProjectFileTaskManager
+from client.aio.projects import AsyncProjectApis
+from client.credentials import decode_jwt
+from client.model.chunk_uploader import ChunkLayout
+from config import ConfigClass
+
+
+class AsyncProjectFilesApis(AsyncBaseAPIClass):
+    FILE_COPY_JOB = 'data_transfer'
+    FILE_DELE_JOB = 'data_delete'
+    UPLOAD_FINISHED_STATUS = ['SUCCEED', 'TERMINATED']
+
+    # the size of each read from the download stream
+    BLOCK_SIZE = 1024 * 1024
+
+    async def _wait_file_task(self, job_type, project_geid, session_id):
+        """Function Summary: private function to long poll the file task without blocking the event loop.
+
+        Args:
+            job_type (string): the action of task eg. data_transfer, data_delete
+            project_geid (string): unique identifier of project
+            session_id (string): the session id of file operation
+
+        Returns:
+            the task status
+        """
+
+        project = await AsyncProjectApis(self.client).get_project_by_geid(project_geid)
+        project_code = project.get('code', None)
+
+        file_task_manager = AsyncProjectFileTaskManager(self.client)
+        file_task_manager.track_flag = self.track_flag
+        return await self._poll(
+            lambda: file_task_manager.check_status(job_type, project_code, session_id),
+            lambda x: x.get('status') != 'RUNNING',
+            '%s task of session %s' % (job_type, session_id),
+        )
+
+    async def list_child_entities(
+        self,
+        project_geid,
+        folder_geid=None,
+        page=0,
+        page_size=10,
+        order_by='time_created',
+        order_type='desc',
+        query=None,
+        partial=None,
+        zone='Greenroom',
+        source_type='Folder',
+        archived=False,
+    ):
+        """Function Summary: The async version of `ProjectFilesApis.list_child_entities`.
+
+        Args:
+            project_geid (string): unique identifier of entity
+            folder_geid (string): will list the folder/file under the geid if specified
+                else will list the folder/file under project.
+            order_by (string): "time_created", "name" or "code"
+            order_type (string): increasing order(asc) or decreasing order(desc)
+            page_size (int): page size for the result(eg limit)
+            page (int): page number(eg. skip = page_size*page)
+            query (dict): dict of attribute that you want to search
+            partial (list): ?
+            zone (string): "Greenroom" or "Core"
+            source_type (string): 'Project', 'Folder', 'TrashFile', 'Collection'
+            archived (bool): list the archived entities instead of the normal ones. the `archived`
+                in <query> takes precedence
+
+        Returns:
+            list of file and folder node
+
+        Examples:
+            >>> PFA = AsyncProjectFilesApis(pilot_client)
+            >>> res = await PFA.list_child_entities(<project_geid>, folder_geid="<some_folder_geid>")
+
+            >>> # list the archived entities
+            >>> res = await PFA.list_child_entities(<project_geid>, archived=True)
+        """
+
+        # copy the query so the one from caller is not changed
+        query = dict(query or {})
+        query.setdefault('archived', archived)
+        query_params = {
+            'project_geid': project_geid,
+            'page': page,
+            'page_size': page_size,
+            'order_by': order_by,
+            'order_type': order_type,
+            'zone': zone,
+            'source_type': source_type,
+            'partial': json.dumps(partial or []),
+            'query': json.dumps(query),
+        }
+
+        url = ConfigClass.project_file_meta_url
+        if folder_geid:
+            url += folder_geid
+        res = await self._send_request(url, method='GET', params=query_params)
+
+        return res.json().get('result', {}).get('data', [])
+
+    async def copy_to_core(self, project_geid, source_geids: list, target_geid: str):
+        """Function Summary: The async version of `ProjectFilesApis.copy_to_core`.
+
+        Args:
+            project_geid (string): unique identifier of entity
+            source_geids (list): a list of geid for copy. Note the geid must from
+                target project geid.
+            target_geid (string): the destination folder geid.
+
+        Returns:
+            the status of copy task
+
+        Examples:
+            >>> PFA = AsyncProjectFilesApis(pilot_client)
+            >>> res = await PFA.copy_to_core("<project_geid>", source_geids=[{"geid":"<file_geid>"}])
+        """
+
+        session_id = self.client.username + '-' + str(uuid.uuid4())
+        payload = {
+            'payload': {'targets': source_geids, 'destination': target_geid},
+            'operator': self.client.username,
+            'operation': 'copy',
+            'project_geid': project_geid,
+        }
+        header = {
+            'Session-ID': session_id,
+        }
+
+        url = ConfigClass.project_file_action_url
+        copy_res = await self._send_request(url, method='POST', json=payload, headers=header)
+        session_id = copy_res.json().get('result', [])[0].get('session_id', None)
+
+        return await self._wait_file_task(self.FILE_COPY_JOB, project_geid, session_id)
+
+    async def delete_entity(self, project_geid, targets: list):
+        """Function Summary: The async version of `ProjectFilesApis.delete_entity`.
+
+        Args:
+            project_geid (string): unique identifier of entity
+            targets (list): a list of geid for deletion. Note the geid must from
+                target project geid.
+
+        Returns:
+            the status of delete task
+
+        Examples:
+            >>> PFA = AsyncProjectFilesApis(pilot_client)
+            >>> res = await PFA.delete_entity("<project_geid>", targets=[{"geid":"<file_geid>"}])
+        """
+
+        session_id = self.client.username + '-' + str(uuid.uuid4())
+        payload = {
+            'operation': 'delete',
+            'operator': self.client.username,
+            'payload': {'targets': targets},
+            'project_geid': project_geid,
+            'session_id': session_id,
+        }
+        header = {
+            'Session-ID': session_id,
+        }
+
+        url = ConfigClass.project_file_action_url
+        await self._send_request(url, method='POST', json=payload, headers=header)
+
+        return await self._wait_file_task(self.FILE_DELE_JOB, project_geid, session_id)
+
+    async def fput_file_entity(self, project_code, source_file_path, target_path='', concurrency=None, chunk_size=None):
+        """Function Summary: The async version of `ProjectFilesApis.fput_file_entity`. The chunks are read in the
+        default executor and at most <concurrency> chunks are uploading at the same time on the event loop.
+
+        Args:
+            project_code (string): project code
+            source_file_path (string): the file path on the local file system
+            target_path (string): the optional params for the upload to some subfolder
+            concurrency (int): the number of chunks uploading at the same time. default is
+                the `upload_concurrency` of client
+            chunk_size (int): the chunk size in bytes. default is `upload_chunk_size` in config
+
+        Returns:
+            the status of the file operation
+
+        Examples:
+            >>> PFA = AsyncProjectFilesApis(pilot_client)
+            >>> res = await PFA.fput_file_entity(<project_code>, <your_file_path>, target_path="test0913")
+        """
+
+        filename = os.path.basename(source_file_path)
+        resumable_relative_path = self.client.username + '/' + target_path if target_path else self.client.username
+        total_file_size = os.path.getsize(source_file_path)
+        concurrency = max(1, int(concurrency or self.client.upload_concurrency))
+        layout = ChunkLayout(total_file_size, chunk_size or ConfigClass.upload_chunk_size)
+
+        session_id = self.client.username + '-' + str(uuid.uuid4())
+        header = {
+            'Session-ID': session_id,
+        }
+
+        # do pre upload
+        pre_payload = {
+            'project_code': project_code,
+            'operator': self.client.username,
+            'job_type': 'AS_FILE',
+            'data': [{'resumable_filename': filename, 'resumable_relative_path': resumable_relative_path}],
+            'upload_message': '',
+            'current_folder_node': target_path,
+        }
+        url = ConfigClass.pre_upload_url
+        upload_pre_res = await self._send_request(url, method='POST', json=pre_payload, headers=header)
+        resumable_identifier = upload_pre_res.json().get('result', [])[0].get('payload', {}).get('resumable_identifier')
+
+        chunk_payload = {
+            'project_code': project_code,
+            'operator': self.client.username,
+            'resumable_identifier': resumable_identifier,
+            'resumable_filename': filename,
+            'resumable_relative_path': resumable_relative_path,
+            'resumable_dataType': 'SINGLE_FILE_DATA',
+            'resumable_chunk_size': layout.chunk_size,
+            'resumable_total_chunks': layout.total_chunks,
+            'resumable_total_size': total_file_size,
+        }
+
+        # each worker takes the next chunk number so only <concurrency> chunks are in memory
+        chunk_numbers = iter(range(1, layout.total_chunks + 1))
+        loop = asyncio.get_running_loop()
+
+        async def worker():
+            for chunk_number in chunk_numbers:
+                chunk = await loop.run_in_executor(
+                    None, self._read_chunk, source_file_path, layout.offset(chunk_number), layout.length(chunk_number)
+                )
+                await self._upload_chunk(chunk_number, chunk, chunk_payload, header, filename)
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(min(concurrency, layout.total_chunks))]
+        try:
+            await asyncio.gather(*workers)
+        except Exception as e:
+            for w in workers:
+                w.cancel()
+            raise e
+
+        # do combine chunks
+        combine_payload = {
+            'project_code': project_code,
+            'operator': self.client.username,
+            'resumable_identifier': resumable_identifier,
+            'resumable_filename': filename,
+            'resumable_relative_path': resumable_relative_path,
+            'resumable_total_chunks': layout.total_chunks,
+            'resumable_total_size': total_file_size,
+        }
+        await self._send_request(ConfigClass.combine_chunk_url, method='POST', json=combine_payload, headers=header)
+
+        # get the status
+        task_param = {
+            'project_code': project_code,
+            'operator': self.client.username,
+        }
+        task_url = ConfigClass.upload_status_url
+
+        async def check():
+            res = await self._send_request(task_url, method='GET', params=task_param, headers=header)
+            return res.json().get('result', [])[0]
+
+        return await self._poll(
+            check, lambda x: x.get('status') in self.UPLOAD_FINISHED_STATUS, 'upload of session %s' % session_id
+        )
+
+    @staticmethod
+    def _read_chunk(source_file_path, offset, length):
+        with open(source_file_path, 'rb') as f:
+            f.seek(offset)
+            return f.read(length)
+
+    async def _upload_chunk(self, chunk_number, chunk, chunk_payload, header, filename):
+        """Function Summary: private function to upload single chunk as multipart form.
+
+        Args:
+            chunk_number (int): the resumable_chunk_number of chunk start from 1
+            chunk (bytes): the chunk data
+            chunk_payload (dict): the form payload shared by all chunks
+            header (dict): the headers for chunk request
+            filename (string): the file name of chunk data
+
+        Returns:
+            the chunk number
+        """
+
+        form = aiohttp.FormData()
+        for name, value in dict(chunk_payload, resumable_chunk_number=chunk_number).items():
+            form.add_field(name, str(value))
+        form.add_field('chunk_data', chunk, filename=filename, content_type='application/octet-stream')
+
+        await self._send_request(ConfigClass.chunk_upload_url, method='POST', data=form, headers=header)
+
+        return chunk_number
+
+    async def fget_file_entity(self, project_code, source_geids: list):
+        """Function Summary: The async version of `ProjectFilesApis.fget_file_entity`. The stream is read on the
+        event loop and each block is written to the file in the default executor, so the disk does not block
+        the loop.
+
+        Args:
+            project_code (string): project code
+            source_geids (list of string): the file geid from system
+
+        Returns:
+            the status of the download file operation
+
+        Examples:
+            >>> PFA = AsyncProjectFilesApis(pilot_client)
+            >>> res = await PFA.fget_file_entity(<project_code>, [<geid1>, <geid2>])
+        """
+
+        # send pre download request
+        session_id = self.client.username + '-' + str(uuid.uuid4())
+        pre_payload = {
+            'files': [{'geid': x} for x in source_geids],
+            'project_code': project_code,
+            'operator': self.client.username,
+            'session_id': session_id,
+        }
+        header = {
+            'Session-ID': session_id,
+        }
+
+        url = ConfigClass.pre_download_url
+        upload_pre_res = await self._send_request(url, method='POST', json=pre_payload, headers=header)
+        hash_code = upload_pre_res.json().get('result', {}).get('payload', {}).get('hash_code', None)
+
+        # loop to check if file prepared
+        task_url = ConfigClass.download_status_url % (hash_code)
+        file_download_res = await self._poll(
+            lambda: self._send_request(task_url, method='GET', headers=header),
+            lambda x: x.json().get('result', {}).get('status') != 'ZIPPING',
+            'download preparation of session %s' % session_id,
+        )
+        status = file_download_res.json().get('result', {})
+
+        download_name = decode_jwt(hash_code)
+        download_name = os.path.basename(download_name.get('full_path'))
+
+        # download to local block by block. the file operations run in the executor
+        loop = asyncio.get_running_loop()
+        r = await self._send_request(ConfigClass.download_url % (hash_code), method='GET', stream=True)
+        async with r:
+            r.raise_for_status()
+            f = await loop.run_in_executor(None, open, download_name, 'wb')
+            try:
+                async for chunk in r.content.iter_chunked(self.BLOCK_SIZE):
+                    await loop.run_in_executor(None, f.write, chunk)
+            finally:
+                await loop.run_in_executor(None, f.close)
+
+        return status
@@ -0,0 +1,154 @@
+from client.aio.base_class import AsyncBaseAPIClass
+from client.model.validator import array_of_string_vali
+from config import ConfigClass
+
+
+class AsyncProjectApis(AsyncBaseAPIClass):
+    async def list_projects(
+        self,
+        order_by='time_created',
+        order_type='desc',
+        page_size=10,
+        page=0,
+        name=None,
+        code=None,
+        tags=None,
+        description=None,
+        create_time_start=None,
+        create_time_end=None,
+        is_all=False,
+    ):
+        """Function Summary: The async version of `ProjectApis.list_projects`. List the project by the query
+        parameters.
+
+        Args:
+            order_by (string): "time_created", "name" or "code"
+            order_type (string): increasing order(asc) or decreasing order(desc)
+            page_size (int): page size for the result(eg limit)
+            page (int): page number(eg. skip = page_size*page)
+            name (string): project name
+            code (string): project code
+            tags (list of string): searching parameter for list
+            description (string): searching parameter for description
+            create_time_start (int): start timestamp for searching create time range
+            create_time_end (int): end timestamp for searching create time range
+            is_all (bool): indicate if user want to fetch their own projects OR all projects
+
+        Returns:
+            list of projects
+
+        Examples:
+            >>> PA = AsyncProjectApis(pilot_client)
+            >>> res = await PA.list_projects(page_size=10)
+        """
+        if not tags:
+            tags = []
+
+        query_params = {
+            'order_by': order_by,
+            'order_type': order_type,
+            'page_size': page_size,
+            'page': page,
+            'name': name,
+            'code': code,
+            'tags': tags,
+            'description': description,
+            'create_time_start': create_time_start,
+            'create_time_end': create_time_end,
+        }
+
+        if is_all:
+            url = ConfigClass.list_all_project_url
+            res = await self._send_request(url, method='GET', params=query_params)
+        else:
+            url = ConfigClass.list_project_by_user_url % (self.client.username)
+            res = await self._send_request(url, method='POST', json=query_params)
+
+        return res.json().get('result', [])
+
+    async def create_project(self, name, code, tags=None, description='', discoverable=True):
+        """Function Summary: The async version of `ProjectApis.create_project`.
+
+        Args:
+            name (string): project name
+            code (string): project code
+            tags (list of string): searching parameter for list
+            description (string): searching parameter for description
+            discoverable (bool): the flag to indicate if other can see the project
+
+        Returns:
+            project detail
+
+        Examples:
+            >>> PA = AsyncProjectApis(pilot_client)
+            >>> await PA.create_project(<your_project_name>, <your_project_code>)
+        """
+        if not tags:
+            tags = []
+
+        # validation for the array of string
+        fields = {'tags': tags}
+        for f_name, f_value in fields.items():
+            array_of_string_vali(f_name, f_value)
+
+        payload = {
+            'name': name,
+            'code': code,
+            'tags': tags,
+            'description': description,
+            'type': 'project',
+            'discoverable': discoverable,
+        }
+
+        url = ConfigClass.create_project_url
+        res = await self._send_request(url, method='POST', json=payload)
+
+        return res.json().get('result', [])
+
+    async def get_project_by_geid(self, geid, use_cache=True):
+        """Function Summary: The async version of `ProjectApis.get_project_by_geid`.
+
+        Args:
+            geid (string): unique identifier for the project
+            use_cache (bool): if false, always fetch from server and refresh the cache
+
+        Returns:
+            project detail
+
+        Examples:
+            >>> PA = AsyncProjectApis(pilot_client)
+            >>> res = await PA.get_project_by_geid(<project_geid>)
+        """
+
+        async def load():
+            url = ConfigClass.get_project_by_geid_url % (geid)
+            res = await self._send_request(url, method='GET')
+            project = res.json().get('result', [])
+            self._cache_project(project)
+            return project
+
+        return await self._cached(('project_geid', geid), load, use_cache)
+
+    async def get_project_by_code(self, code, use_cache=True):
+        """Function Summary: The async version of `ProjectApis.get_project_by_code`.
+
+        Args:
+            code (string): project code
+            use_cache (bool): if false, always fetch from server and refresh the cache
+
+        Returns:
+            project detail. None if the project is not found
+
+        Examples:
+            >>> PA = AsyncProjectApis(pilot_client)
+            >>> res = await PA.get_project_by_code(<project_code>)
+        """
+
+        async def load():
+            # the code query might be the fuzzy match so pick the exact one
+            projects = await self.list_projects(code=code, is_all=True, page_size=ConfigClass.list_page_size)
+            project = next((x for x in projects if x.get('code') == code), None)
+            self._cache_project(project)
+            return project
+
+        return await self._cached(('project_code', code), load, use_cache)
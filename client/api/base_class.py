@@ -7,11 +7,14 @@ from client.exceptions import InternalServerError
 from client.exceptions import NotFound
 from client.exceptions import Unauthorized
 from client.logger import SrvLoggerFactory
+from client.model.polling import PollingStrategy
 
 
 class BaseAPIClass:
 
-    _logger = SrvLoggerFactory().get_logger()
+    # the logger shared by all api classes. created on the first message so
+    # the import has no side effect(eg. the ./logs folder)
+    _shared_logger = None
 
     def __init__(self, api_client):
         """Function Summary: The base class for all apis class. It will include some common functions for api
@@ -30,10 +33,21 @@ class BaseAPIClass:
         self.track_flag = True
 
     def _send_request(
-        self, api_endpoint, method='GET', json={}, params={}, headers={}, data={}, cookies={}, files=None, stream=False
+        self,
+        api_endpoint,
+        method='GET',
+        json=None,
+        params=None,
+        headers=None,
+        data=None,
+        cookies=None,
+        files=None,
+        stream=False,
     ):
         """Function Summary: private function for sending the request. Since all the api will need to send with
-        `Authorization` and `Refresh-token` in headers. it is a wrapper for request sending.
+        `Authorization` and `Refresh-token` in headers. it is a wrapper for request sending. The request goes
+        through the connection pool of client so the connections are reused. If the token is rejected(401),
+        the token of client is refreshed and the request is sent again once.
 
         Args:
             api_endpoint (string): the relative path for the api endpoints
@@ -50,27 +64,91 @@ class BaseAPIClass:
             >>> self._send_request(<relative_path>)
         """
 
-        # add the at and rt into headers if there is no provided new token in header
-        if not headers.get('Authorization', None):
-            headers.update({'Authorization': 'Bearer ' + self.client.token.access_token})
-            headers.update({'Refresh-token': self.client.token.refresh_token})
-
-        res = requests.request(
-            method=method,
-            url=self.client.base_url + api_endpoint,
-            json=json,
-            params=params,
-            headers=headers,
-            data=data,
-            cookies=cookies,
-            files=files,
-            stream=stream,
-        )
+        json = {} if json is None else json
+        params = {} if params is None else params
+        data = {} if data is None else data
+        cookies = {} if cookies is None else cookies
+
+        # the token is only added if the caller does not provide one. it is taken
+        # once so the refresh from other threads does not mix the headers
+        token = self.client.token
+        headers = dict(headers or {})
+        with_token = not headers.get('Authorization', None)
+        if with_token:
+            headers.update(self._auth_headers(token))
+
+        # reuse the pooled session of client. fall back to the one-off request if
+        # the client object does not manage the session
+        http = getattr(self.client, 'session', requests)
+        request_kwargs = {
+            'method': method,
+            'url': self.client.base_url + api_endpoint,
+            'json': json,
+            'params': params,
+            'data': data,
+            'cookies': cookies,
+            'files': files,
+            'stream': stream,
+            'timeout': getattr(self.client, 'timeout', None),
+        }
+        res = http.request(headers=headers, **request_kwargs)
+
+        # the token expired or revoked. send again with the new token
+        refresh_token = getattr(self.client, 'refresh_token', None)
+        if res.status_code == 401 and with_token and callable(refresh_token) and self._rewind(data, files):
+            res.close()
+            headers.update(self._auth_headers(refresh_token(stale=token)))
+            res = http.request(headers=headers, **request_kwargs)
 
         # if we request large return eg(files) we will return it right away
         if stream:
             return res
 
+        return self._check_response(res, api_endpoint, method, json, params, headers)
+
+    @property
+    def _logger(self):
+        if BaseAPIClass._shared_logger is None:
+            BaseAPIClass._shared_logger = SrvLoggerFactory().get_logger()
+        return BaseAPIClass._shared_logger
+
+    def _auth_headers(self, token):
+        """private function to build the auth headers from the token. override it for the service
+        which uses other scheme."""
+
+        return {'Authorization': 'Bearer ' + token.access_token, 'Refresh-token': token.refresh_token}
+
+    @staticmethod
+    def _rewind(data, files):
+        """private function to check if the request body can be sent again. the file-like body is rewound
+        to the beginning and the iterator body cannot be replayed."""
+
+        for body in [data] + list((files or {}).values()):
+            if hasattr(body, 'read'):
+                if not hasattr(body, 'seek'):
+                    return False
+                body.seek(0)
+            elif body is not None and not isinstance(body, (dict, list, tuple, str, bytes, bytearray, memoryview)):
+                return False
+
+        return True
+
+    def _check_response(self, res, api_endpoint, method, json, params, headers):
+        """Function Summary: private function to log the request and map the error code of response into the
+        exceptions. It is shared by the sync and async api classes.
+
+        Args:
+            res (Response): the response which has the `json()` function
+            api_endpoint (string): the relative path for the api endpoints
+            method (string): HTTP methods: GET, POST, DELETE, PUT
+            json (dict): the payload for the api logics
+            params (dict): the args for the api logics
+            headers (dict): the headers of request
+
+        Returns:
+            the response if no error
+        """
+
         try:
             self._track_print('====== ')
             self._track_print('calling:', method, self.client.base_url + api_endpoint)
@@ -100,6 +178,58 @@ class BaseAPIClass:
 
         return res
 
+    def _cached(self, key, loader, use_cache=True):
+        """Function Summary: private function to look up the metadata cache of client before calling the api.
+
+        Args:
+            key (hashable): the cache key eg. ('project_geid', <geid>)
+            loader (callable): the function without argument to call the api
+            use_cache (bool): if false, always call the api and refresh the cache
+
+        Returns:
+            the cached or loaded value
+
+        Examples:
+            >>> self._cached(('project_geid', geid), lambda: self._get_project(geid))
+        """
+
+        cache = getattr(self.client, 'metadata_cache', None)
+        if cache is None:
+            return loader()
+
+        if not use_cache:
+            cache.invalidate(key)
+
+        return cache.get_or_load(key, loader)
+
+    def _poll(self, check, is_done, description='task'):
+        """Function Summary: private function to poll the task status with the polling strategy of client.
+
+        Args:
+            check (callable): the function without argument to fetch the status
+            is_done (callable): the function takes the status and returns if the task is finished
+            description (string): the task name in the timeout message
+
+        Returns:
+            the last status returned by <check>
+
+        Examples:
+            >>> self._poll(lambda: manager.check_status(...), lambda x: x.get('status') != 'RUNNING')
+        """
+
+        polling = getattr(self.client, 'polling', None) or PollingStrategy()
+        return polling.poll(check, is_done, description)
+
+    def _cache_project(self, project):
+        """private function to keep the project in the metadata cache by both geid and code."""
+
+        cache = getattr(self.client, 'metadata_cache', None)
+        if cache is None or not project:
+            return
+
+        cache.set(('project_geid', project.get('global_entity_id')), project)
+        cache.set(('project_code', project.get('code')), project)
+
     def track_on(self):
         """Function Summary: private function for flagging up the logger.
 
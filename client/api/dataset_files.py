@@ -3,11 +3,45 @@ import uuid
 
 from client.api.base_class import BaseAPIClass
 from client.model.file_task_socket import DatasetFileTaskManager
+from client.model.page_iterator import PageIterator
+from client.model.tree_walker import walk_tree
 from config import ConfigClass
 
 
 class DatasetFileApis(BaseAPIClass):
-    def import_files(self, dataset_geid, source_project_geid, source_list: list):
+    def _wait_dataset_task(self, dataset_geid, action, session_id, send, timeout=None):
+        """Function Summary: private function to send the dataset file request and wait for the
+        notifications of all processing files from the notification hub of client.
+
+        Args:
+            dataset_geid (string): unique identifier of entity for dataset
+            action (string): the action of job eg. dataset_file_import
+            session_id (string): the session id of request
+            send (callable): the function without argument to send the request
+            timeout (float): the max seconds to wait. default is scaled by the number of files
+
+        Returns:
+            (response, list of notification message)
+        """
+
+        # listen before sending the request so the fast jobs are not missed
+        task_manager = DatasetFileTaskManager(self.client.notification_hub, dataset_geid, action, session_id)
+        try:
+            res = send()
+            # NOTE: we might have the duplicate import, base on the return to waiting
+            # the message for the job status. if all files are block we just quit.
+            processed_geid = [x.get('global_entity_id') for x in res.json().get('result')['processing']]
+            task_res = []
+            if len(processed_geid) > 0:
+                task_manager.set_sources(processed_geid)
+                # then use socketio to wait for the job done
+                task_res = task_manager.wait_response(timeout)
+        finally:
+            task_manager.close()
+
+        return res, task_res
+
+    def import_files(self, dataset_geid, source_project_geid, source_list: list, timeout=None):
 
         """Function Summary: The function import the designated folders/files(geid) from source project to the dataset.
         Note for now the dataset will only allow to import from same project.
@@ -17,6 +51,8 @@ class DatasetFileApis(BaseAPIClass):
             source_project_geid (string): unique identifier of entity for project
             source_list (list of string): list of folder/files geid will be import
                 to dataset
+            timeout (float): the max seconds to wait for the jobs. default is scaled by the
+                number of files(see `dataset_wait_timeout` in config)
 
         Returns:
             the job status of each file. The status will have the detail of new node
@@ -40,23 +76,13 @@ class DatasetFileApis(BaseAPIClass):
         }
 
         url = ConfigClass.dataset_files_url % (dataset_geid)
-        res = self._send_request(url, method='PUT', json=payload, cookies=cookies)
-
-        # NOTE: we might have the duplicate import, base on the return to waiting
-        # the message for the job status. if all files are block we just quit.
-        processed_geid = [x.get('global_entity_id') for x in res.json().get('result')['processing']]
-
-        # todo update endpoint to config
-        if len(processed_geid) > 0:
-            task_manager = DatasetFileTaskManager(
-                socketio_endpoint=ConfigClass.socketio_endpoint,
-                dataset_geid=dataset_geid,
-                source_geids=processed_geid,
-                action='dataset_file_import',
-                session_id=session_id,
-            )
-            # then use socketio to wait for the job done
-            task_manager.wait_response()
+        res, _ = self._wait_dataset_task(
+            dataset_geid,
+            'dataset_file_import',
+            session_id,
+            lambda: self._send_request(url, method='PUT', json=payload, cookies=cookies),
+            timeout,
+        )
 
         return res.json().get('result', {})
 
@@ -106,12 +132,73 @@ class DatasetFileApis(BaseAPIClass):
 
         return res.json().get('result', {}).get('data', [])
 
-    def delete_files(self, dataset_geid, source_list: list):
+    def iter_files(self, dataset_geid, folder_geid=None, page_size=None, prefetch=None, **kwargs):
+        """Function Summary: The function will yield the folder and files under the target geid across all the
+        pages. The next pages are requested in background while the current page is consumed.
+
+        Args:
+            dataset_geid (string): unique identifier of entity
+            folder_geid (string): will list the folder/file under the geid if specified
+                else will list the folder/file under dataset.
+            page_size (int): page size of each request. default is `list_page_size` in config
+            prefetch (int): the number of pages requested ahead. default is `list_prefetch_pages`
+                in config. 0 means no prefetch
+            kwargs: the other query parameters of `list_files` eg. order_by, query
+
+        Returns:
+            iterator of file and folder node
+
+        Examples:
+            >>> DFA = DatasetFileApis(pilot_client)
+            >>> for node in DFA.iter_files(<dataset_geid>, prefetch=2):
+            >>>     print(node.get('name'))
+        """
+
+        page_size = page_size or ConfigClass.list_page_size
+        return PageIterator(
+            lambda page: self.list_files(dataset_geid, folder_geid, page=page, page_size=page_size, **kwargs),
+            page_size,
+            prefetch,
+        )
+
+    def walk(self, dataset_geid, folder_geid=None, folder_path='', max_depth=None, concurrency=None, page_size=None):
+        """Function Summary: The function will walk the folder tree under the dataset breadth first like
+        `os.walk`. The folders are listed with a bounded pool of concurrent requests and each (path, folders, files)
+        is yielded as soon as its listing arrives.
+
+        Args:
+            dataset_geid (string): unique identifier of entity
+            folder_geid (string): the folder to start from. default is the root of dataset
+            folder_path (string): the path of start folder in the result
+            max_depth (int): the max level of sub folders to list. 0 means only the start folder.
+                default is no limit
+            concurrency (int): the number of listing requests at the same time. default is
+                `walk_concurrency` in config
+            page_size (int): page size of each listing request. default is `list_page_size` in config
+
+        Returns:
+            iterator of (path, folders, files). folders and files are the list of nodes. the
+            folders removed from the list by caller will not be walked into
+
+        Examples:
+            >>> DFA = DatasetFileApis(pilot_client)
+            >>> for path, folders, files in DFA.walk(<dataset_geid>):
+            >>>     print(path, [x.get('name') for x in files])
+        """
+
+        def list_children(geid):
+            return self.iter_files(dataset_geid, geid, page_size=page_size, prefetch=0)
+
+        return walk_tree(list_children, folder_geid, folder_path, max_depth=max_depth, concurrency=concurrency)
+
+    def delete_files(self, dataset_geid, source_list: list, timeout=None):
         """Function Summary: The function delete the designated folders/files(geid) from target dataset.
 
         Args:
             dataset_geid (string): unique identifier of entity for dataset
             source_list (list of string): list of file/folder that will be deleted
+            timeout (float): the max seconds to wait for the jobs. default is scaled by the
+                number of files(see `dataset_wait_timeout` in config)
 
         Returns:
             the job status of each file. The status will have the detail of new node
@@ -133,27 +220,17 @@ class DatasetFileApis(BaseAPIClass):
         }
 
         url = ConfigClass.dataset_files_url % (dataset_geid)
-        res = self._send_request(url, method='DELETE', json=payload, cookies=cookies)
-
-        # NOTE: we might have the duplicate import, base on the return to waiting
-        # the message for the job status. if all files are block we just quit.
-        processed_geid = [x.get('global_entity_id') for x in res.json().get('result')['processing']]
-
-        # todo update endpoint to config
-        if len(processed_geid) > 0:
-            task_manager = DatasetFileTaskManager(
-                socketio_endpoint=ConfigClass.socketio_endpoint,
-                dataset_geid=dataset_geid,
-                source_geids=processed_geid,
-                action='dataset_file_delete',
-                session_id=session_id,
-            )
-            # then use socketio to wait for the job done
-            task_res = task_manager.wait_response()
+        res, _ = self._wait_dataset_task(
+            dataset_geid,
+            'dataset_file_delete',
+            session_id,
+            lambda: self._send_request(url, method='DELETE', json=payload, cookies=cookies),
+            timeout,
+        )
 
         return res.json().get('result', {})
 
-    def move_files(self, dataset_geid, source_files: list, target_folder_geid: str):
+    def move_files(self, dataset_geid, source_files: list, target_folder_geid: str, timeout=None):
         """Function Summary: The function move the designated folders/files(geid) within the dataset.
 
         Args:
@@ -161,6 +238,8 @@ class DatasetFileApis(BaseAPIClass):
             source_files (list of string): list of file/folder that will be moved
             target_folder_geid (string): the target folder you want to move. this
                 can be the datset geid.
+            timeout (float): the max seconds to wait for the jobs. default is scaled by the
+                number of files(see `dataset_wait_timeout` in config)
 
         Returns:
             the job status of each file. The status will have the detail of new node
@@ -180,26 +259,17 @@ class DatasetFileApis(BaseAPIClass):
         }
 
         url = ConfigClass.dataset_files_url % (dataset_geid)
-        res = self._send_request(url, method='POST', json=payload, cookies=cookies)
-        # NOTE: we might have the duplicate import, base on the return to waiting
-        # the message for the job status. if all files are block we just quit.
-        processed_geid = [x.get('global_entity_id') for x in res.json().get('result')['processing']]
-
-        # todo update endpoint to config
-        if len(processed_geid) > 0:
-            task_manager = DatasetFileTaskManager(
-                socketio_endpoint=ConfigClass.socketio_endpoint,
-                dataset_geid=dataset_geid,
-                source_geids=processed_geid,
-                action='dataset_file_move',
-                session_id=session_id,
-            )
-            # then use socketio to wait for the job done
-            task_res = task_manager.wait_response()
+        res, task_res = self._wait_dataset_task(
+            dataset_geid,
+            'dataset_file_move',
+            session_id,
+            lambda: self._send_request(url, method='POST', json=payload, cookies=cookies),
+            timeout,
+        )
 
         return task_res
 
-    def rename_file(self, dataset_geid, file_geid: str, new_name: str):
+    def rename_file(self, dataset_geid, file_geid: str, new_name: str, timeout=None):
 
         """Function Summary: The function rename the target file into new name. cannot rename to the old name.
 
@@ -207,6 +277,8 @@ class DatasetFileApis(BaseAPIClass):
             dataset_geid (string): unique identifier of entity for dataset
             file_geid (string): unique identifier of target file
             new_name (string): the new name string
+            timeout (float): the max seconds to wait for the jobs. default is scaled by the
+                number of files(see `dataset_wait_timeout` in config)
 
         Returns:
             the job status of target file. The status will have the detail of new node
@@ -229,21 +301,12 @@ class DatasetFileApis(BaseAPIClass):
         }
 
         url = ConfigClass.dataset_file_ops_url % (dataset_geid, file_geid)
-        res = self._send_request(url, method='POST', json=payload, cookies=cookies)
-        # NOTE: we might have the duplicate import, base on the return to waiting
-        # the message for the job status. if all files are block we just quit.
-        processed_geid = [x.get('global_entity_id') for x in res.json().get('result')['processing']]
-
-        # todo update endpoint to config
-        if len(processed_geid) > 0:
-            task_manager = DatasetFileTaskManager(
-                socketio_endpoint=ConfigClass.socketio_endpoint,
-                dataset_geid=dataset_geid,
-                source_geids=processed_geid,
-                action='dataset_file_rename',
-                session_id=session_id,
-            )
-            # then use socketio to wait for the job done
-            task_res = task_manager.wait_response()
+        res, task_res = self._wait_dataset_task(
+            dataset_geid,
+            'dataset_file_rename',
+            session_id,
+            lambda: self._send_request(url, method='POST', json=payload, cookies=cookies),
+            timeout,
+        )
 
         return task_res
@@ -1,4 +1,5 @@
 from client.api.base_class import BaseAPIClass
+from client.model.page_iterator import PageIterator
 from client.model.validator import array_of_string_vali
 from config import ConfigClass
 
@@ -39,6 +40,53 @@ class DatasetApis(BaseAPIClass):
 
         return res.json().get('result', [])
 
+    def iter_dataset(self, page_size=None, prefetch=None, **kwargs):
+        """Function Summary: The function will yield the dataset owned by authorized user across all the pages.
+        The next pages are requested in background while the current page is consumed.
+
+        Args:
+            page_size (int): page size of each request. default is `list_page_size` in config
+            prefetch (int): the number of pages requested ahead. default is `list_prefetch_pages`
+                in config. 0 means no prefetch
+            kwargs: the other query parameters of `list_dataset` eg. order_by, filters
+
+        Returns:
+            iterator of dataset detail
+
+        Examples:
+            >>> DA = DatasetApis(pilot_client)
+            >>> for dataset in DA.iter_dataset(page_size=50):
+            >>>     print(dataset.get('code'))
+        """
+
+        page_size = page_size or ConfigClass.list_page_size
+        return PageIterator(
+            lambda page: self.list_dataset(page=page, page_size=page_size, **kwargs), page_size, prefetch
+        )
+
+    def get_dataset(self, dataset_geid, use_cache=True):
+        """Function Summary: The function will get the dataset detail by geid. The result is kept in the
+        metadata cache of client.
+
+        Args:
+            dataset_geid (string): unique identifier of dataset
+            use_cache (bool): if false, always fetch from server and refresh the cache
+
+        Returns:
+            dataset detail
+
+        Examples:
+            >>> DA = DatasetApis(pilot_client)
+            >>> res = DA.get_dataset(<dataset_geid>)
+        """
+
+        def load():
+            url = ConfigClass.dataset_ops_url % (dataset_geid)
+            res = self._send_request(url, method='GET')
+            return res.json().get('result', {})
+
+        return self._cached(('dataset_geid', dataset_geid), load, use_cache)
+
     def create_dataset(
         self,
         title,
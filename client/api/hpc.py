@@ -25,8 +25,15 @@ class HPCApis(BaseAPIClass):
         self.slurm_host = slurm_host
         self.protocol = protocol
 
+    @property
+    def auth_header(self):
+        """the authorization header with the current token of client."""
+
+        return self._auth_headers(self.client.token)
+
+    def _auth_headers(self, token):
         # here customize the authorization heades since it dont have Bearer
-        self.auth_header = {'Authorization': self.client.token.access_token}
+        return {'Authorization': token.access_token}
 
     def list_nodes(self):
         """Function Summary: List the available running nodes.
@@ -48,7 +55,7 @@ class HPCApis(BaseAPIClass):
             'slurm_host': self.slurm_host,
             'protocol': self.protocol,
         }
-        res = self._send_request(url, method='GET', headers=self.auth_header, params=params)
+        res = self._send_request(url, method='GET', params=params)
 
         return res.json().get('result')
 
@@ -72,7 +79,7 @@ class HPCApis(BaseAPIClass):
             'slurm_host': self.slurm_host,
             'protocol': self.protocol,
         }
-        res = self._send_request(url, method='GET', headers=self.auth_header, params=params)
+        res = self._send_request(url, method='GET', params=params)
 
         return res.json().get('result')
 
@@ -96,7 +103,7 @@ class HPCApis(BaseAPIClass):
             'slurm_host': self.slurm_host,
             'protocol': self.protocol,
         }
-        res = self._send_request(url, method='GET', headers=self.auth_header, params=params)
+        res = self._send_request(url, method='GET', params=params)
 
         return res.json().get('result')
 
@@ -120,7 +127,7 @@ class HPCApis(BaseAPIClass):
             'slurm_host': self.slurm_host,
             'protocol': self.protocol,
         }
-        res = self._send_request(url, method='GET', headers=self.auth_header, params=params)
+        res = self._send_request(url, method='GET', params=params)
 
         return res.json().get('result')
 
@@ -135,7 +142,7 @@ class HPCApis(BaseAPIClass):
             'protocol': self.protocol,
             'job_info': job_info,
         }
-        res = self._send_request(url, method='POST', headers=self.auth_header, json=payload)
+        res = self._send_request(url, method='POST', json=payload)
 
         return res.json().get('result')
 
@@ -158,6 +165,6 @@ class HPCApis(BaseAPIClass):
             'slurm_host': self.slurm_host,
             'protocol': self.protocol,
         }
-        res = self._send_request(url, method='GET', headers=self.auth_header, params=params)
+        res = self._send_request(url, method='GET', params=params)
 
         return res.json()
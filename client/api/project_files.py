@@ -1,47 +1,76 @@
+import contextlib
 import json
 import math
 import os
-import time
+import posixpath
+import threading
 import uuid
 from functools import wraps
 
-import jwt
-
 from client.api.base_class import BaseAPIClass
 from client.api.projects import ProjectApis
+from client.credentials import decode_jwt
+from client.model.checksum import StreamingChecksum
+from client.model.checksum import checksum_algorithms
+from client.model.checksum import checksum_chunks
+from client.model.chunk_tuner import ChunkSizeTuner
+from client.model.chunk_uploader import ChunkLayout
+from client.model.chunk_uploader import ChunkUploader
+from client.model.chunk_uploader import file_chunks
+from client.model.chunk_uploader import mmap_chunks
+from client.model.chunk_uploader import stream_chunks
+from client.model.download_record import DownloadRecord
 from client.model.file_task import ProjectFileTaskManager
+from client.model.folder_sync import FolderSyncPlan
+from client.model.folder_sync import local_tree
+from client.model.hash_cache import HashCache
+from client.model.page_iterator import PageIterator
+from client.model.range_downloader import RangeDownloader
+from client.model.task_handle import TaskHandle
+from client.model.tree_walker import is_folder
+from client.model.tree_walker import walk_tree
+from client.model.upload_journal import UploadJournal
 from config import ConfigClass
 
 
 class ProjectFilesApis(BaseAPIClass):
     FILE_COPY_JOB = 'data_transfer'
     FILE_DELE_JOB = 'data_delete'
+    UPLOAD_FINISHED_STATUS = ['SUCCEED', 'TERMINATED']
+    # the folder under the target path to stage the new version of changed files in sync
+    SYNC_STAGING_FOLDER = '.pilot_sync'
 
     def _wait_file_task(job_type):
         def decorator(func):
-            def wrapper(self, project_geid, *args, **kwargs):
+            def wrapper(self, project_geid, *args, wait=True, **kwargs):
                 # print('====== Running long polling for', job_type)
                 if not project_geid:
                     project_geid = kwargs.get('project_geid')
 
                 res = func(self, project_geid, *args, **kwargs)
 
+                submitted = res
                 session_id = res[0].get('session_id', None)
                 # the job status long pulling
+                # the project is served from the metadata cache of client after the first lookup
                 project_apis = ProjectApis(self.client)
                 # project_apis.track_off()
                 res = project_apis.get_project_by_geid(project_geid)
                 project_code = res.get('code', None)
 
+                # hand back the job right after submission. the status is followed
+                # by the shared task watcher of client together with other jobs
+                if not wait:
+                    future = self.client.task_watcher.watch_file_task(project_code, job_type, session_id)
+                    return TaskHandle(future, job_type, session_id, submitted)
+
                 # long polling to wait for job done
                 file_task_manager = ProjectFileTaskManager(self.client)
-                while 1:
-                    res = file_task_manager.check_status(job_type, project_code, session_id)
-                    if res.get('status') != 'RUNNING':
-                        return res
-                    time.sleep(2)
-
-                return project_geid
+                return self._poll(
+                    lambda: file_task_manager.check_status(job_type, project_code, session_id),
+                    lambda x: x.get('status') != 'RUNNING',
+                    '%s task of session %s' % (job_type, session_id),
+                )
 
             return wrapper
 
@@ -94,7 +123,10 @@ class ProjectFilesApis(BaseAPIClass):
             >>> res = PFA.list_child_entities(<project_geid>, query={"name":"<file_name>"})
         """
 
-        query.update({'archived': False})
+        # the archived filter is off by default. copy the query so the caller
+        # and the default dict are not changed
+        query = dict(query)
+        query.setdefault('archived', False)
         query_params = {
             'project_geid': project_geid,
             'page': page,
@@ -114,6 +146,79 @@ class ProjectFilesApis(BaseAPIClass):
 
         return res.json().get('result', {}).get('data', [])
 
+    def iter_child_entities(self, project_geid, folder_geid=None, page_size=None, prefetch=None, **kwargs):
+        """Function Summary: The function will yield the folder and files under the target geid across all the
+        pages. The next pages are requested in background while the current page is consumed.
+
+        Args:
+            project_geid (string): unique identifier of entity
+            folder_geid (string): will list the folder/file under the geid if specified
+                else will list the folder/file under project.
+            page_size (int): page size of each request. default is `list_page_size` in config
+            prefetch (int): the number of pages requested ahead. default is `list_prefetch_pages`
+                in config. 0 means no prefetch
+            kwargs: the other query parameters of `list_child_entities` eg. zone, query
+
+        Returns:
+            iterator of file and folder node
+
+        Examples:
+            >>> PFA = ProjectFilesApis(pilot_client)
+            >>> for node in PFA.iter_child_entities(<project_geid>, zone='Core', page_size=500):
+            >>>     print(node.get('name'))
+        """
+
+        page_size = page_size or ConfigClass.list_page_size
+        return PageIterator(
+            lambda page: self.list_child_entities(project_geid, folder_geid, page=page, page_size=page_size, **kwargs),
+            page_size,
+            prefetch,
+        )
+
+    def walk(
+        self,
+        project_geid,
+        folder_geid=None,
+        folder_path='',
+        max_depth=None,
+        zone='Greenroom',
+        archived=False,
+        concurrency=None,
+        page_size=None,
+    ):
+        """Function Summary: The function will walk the folder tree under the project breadth first like
+        `os.walk`. The folders are listed with a bounded pool of concurrent requests and each (path, folders, files)
+        is yielded as soon as its listing arrives.
+
+        Args:
+            project_geid (string): unique identifier of entity
+            folder_geid (string): the folder to start from. default is the root of project
+            folder_path (string): the path of start folder in the result
+            max_depth (int): the max level of sub folders to list. 0 means only the start folder.
+                default is no limit
+            zone (string): "Greenroom" or "Core"
+            archived (bool): list the archived entities instead of the normal ones
+            concurrency (int): the number of listing requests at the same time. default is
+                `walk_concurrency` in config
+            page_size (int): page size of each listing request. default is `list_page_size` in config
+
+        Returns:
+            iterator of (path, folders, files). folders and files are the list of nodes. the
+            folders removed from the list by caller will not be walked into
+
+        Examples:
+            >>> PFA = ProjectFilesApis(pilot_client)
+            >>> for path, folders, files in PFA.walk(<project_geid>, zone='Core', max_depth=3):
+            >>>     print(path, [x.get('name') for x in files])
+        """
+
+        def list_children(geid):
+            return self.iter_child_entities(
+                project_geid, geid, page_size=page_size, prefetch=0, zone=zone, query={'archived': archived}
+            )
+
+        return walk_tree(list_children, folder_geid, folder_path, max_depth=max_depth, concurrency=concurrency)
+
     @_wait_file_task(job_type=FILE_COPY_JOB)
     def copy_to_core(self, project_geid, source_geids: list, target_geid: str):
         """Function Summary: The function will copy a list of file from greenroom to the core zone.
@@ -123,13 +228,20 @@ class ProjectFilesApis(BaseAPIClass):
             source_geids (list): a list of geid for copy. Note the geid must from
                 target project geid.
             target_geid (string): the destination folder geid.
+            wait (bool): if false, return the TaskHandle right after the submission
+                instead of waiting for the job
 
         Returns:
-            list of file and folder node has been copied
+            list of file and folder node has been copied, or TaskHandle if wait is false
 
         Examples:
             >>> PFA = ProjectFilesApis(pilot_client)
             >>> res = PFA.copy_to_core("<project_geid>", source_geids=[{"geid":"<file_geid>"}])
+
+            >>> # submit the copies then wait for all of them
+            >>> from client.model.task_handle import wait_all
+            >>> handles = [PFA.copy_to_core(<project_geid>, x, <target_geid>, wait=False) for x in <batches>]
+            >>> done, not_done = wait_all(handles, timeout=600)
         """
 
         session_id = self.client.username + '-' + str(uuid.uuid4())
@@ -156,9 +268,11 @@ class ProjectFilesApis(BaseAPIClass):
             project_geid (string): unique identifier of entity
             targets (list): a list of geid for deletion. Note the geid must from
                 target project geid.
+            wait (bool): if false, return the TaskHandle right after the submission
+                instead of waiting for the job
 
         Returns:
-            list of file and folder node has been deleted
+            list of file and folder node has been deleted, or TaskHandle if wait is false
 
         Examples:
             >>> PFA = ProjectFilesApis(pilot_client)
@@ -186,17 +300,52 @@ class ProjectFilesApis(BaseAPIClass):
 
         return res_json
 
-    def fput_file_entity(self, project_code, source_file_path, target_path=''):
-        """Function Summary: The function will read the input file and upload with chunks(2MB). The defualt path is user
-        name space. if target path is specified than it will upload to <username>/<target_path>
+    def fput_file_entity(
+        self,
+        project_code,
+        source_file_path,
+        target_path='',
+        concurrency=None,
+        resumable=False,
+        memory_map=True,
+        chunk_size=None,
+        checksum=True,
+        dedup=False,
+        hash_cache: HashCache = None,
+    ):
+        """Function Summary: The function will read the input file and upload with chunks(2MB by default). The
+        defualt path is user name space. if target path is specified than it will upload to
+        <username>/<target_path>. The chunks are uploaded concurrently and the combine request is sent after every
+        chunk is acknowledged.
 
         Args:
             project_code (string): project code
             source_file_path (string): the file path on the local file system
             target_path (string): the optional params for the upload to some subfolder
+            concurrency (int): the number of chunks uploading at the same time. default is
+                the `upload_concurrency` of client
+            resumable (bool): if true, the progress will be recorded in a local journal under
+                `upload_journal_dir`. Re-running the same upload will skip the acknowledged chunks
+                as long as the local file is not changed
+            memory_map (bool): if true, the chunks are sliced from the memory mapped file and
+                streamed without copy. Otherwise each chunk is read into memory
+            chunk_size (int or string): the chunk size in bytes. default is `upload_chunk_size` in
+                config. if it is "auto", the size is picked from the throughput measured on the previous
+                uploads of client(the default size for the first one). the size is the same for all the
+                chunks of file
+            checksum (bool or list): the hash algorithms computed from the chunks while they are
+                read for upload. True means `checksum_algorithms` in config, eg. ["md5", "blake2b"]
+                for the faster extra hash. The md5 is sent with the combine request. False to turn off
+            dedup (bool): if true, the upload is skipped when the target folder already has the file
+                with same name, size and md5(if the server exposes it)
+            hash_cache (HashCache): the local md5 cache for dedup so the unchanged file is not
+                hashed again. it is left open for the caller. default is the one at `hash_cache_path`
+                in config which is closed after use
 
         Returns:
-            the status of the file operation
+            the status of the file operation. the `chunk_size` is the size used for the chunks and
+            the `checksum` is the dict of hex digests. if the upload is skipped by dedup, the status
+            is "SKIPPED" and `duplicate` is the existing file node
 
         Examples:
             >>> PFA = ProjectFilesApis(pilot_client)
@@ -205,45 +354,98 @@ class ProjectFilesApis(BaseAPIClass):
 
             >>> # to some subfolder
             >>> PFA.fput_file_entity(<project_code>, <your_file_path>, target_path="test0913")
-        """
 
-        filename = os.path.basename(source_file_path)
-        # TODO unify the sessionid
-        session_id = self.client.username + '-' + str(uuid.uuid4())
+            >>> # with 8 chunks in flight
+            >>> PFA.fput_file_entity(<project_code>, <your_file_path>, concurrency=8)
 
-        resumable_relative_path = self.client.username + '/' + target_path if target_path else self.client.username
-        # do pre upload
-        pre_payload = {
-            'project_code': project_code,
-            'operator': self.client.username,
-            'job_type': 'AS_FILE',
-            'data': [{'resumable_filename': filename, 'resumable_relative_path': resumable_relative_path}],
-            'upload_message': '',
-            'current_folder_node': target_path,
-        }
-        header = {
-            'Session-ID': session_id,
-        }
+            >>> # continue from the last acknowledged chunk if it is interrupted before
+            >>> PFA.fput_file_entity(<project_code>, <your_file_path>, resumable=True)
 
-        url = ConfigClass.pre_upload_url
-        upload_pre_res = self._send_request(url, method='POST', json=pre_payload, headers=header)
-        print(upload_pre_res.json())
-        upload_pre_res = upload_pre_res.json().get('result')[0]
-        resumable_identifier = upload_pre_res.get('payload', {}).get('resumable_identifier')
+            >>> # let the sdk pick the chunk size
+            >>> res = PFA.fput_file_entity(<project_code>, <your_file_path>, chunk_size="auto")
+            >>> print(res.get("chunk_size"))
 
-        # for loop to cut the chunks
-        chunk_size = 1024 * 1024 * 2  # 2MB TODO update to config
-        chunk_number = 1
+            >>> # skip the file if it is already uploaded
+            >>> res = PFA.fput_file_entity(<project_code>, <your_file_path>, dedup=True)
+        """
+
+        filename = os.path.basename(source_file_path)
+        resumable_relative_path = self.client.username + '/' + target_path if target_path else self.client.username
         total_file_size = os.path.getsize(source_file_path)
-        total_chunk_number = math.ceil(total_file_size / chunk_size)
-        # print(total_file_size, total_chunk_number)
 
-        f = open(source_file_path, 'rb')
-        while 1:
-            chunk = f.read(chunk_size)
-            if not chunk:
-                break
+        # skip the upload if the identical file is already in target folder
+        if dedup:
+            signature = HashCache.signature(source_file_path)
+            with self._open_hash_cache(hash_cache) as cache:
+                duplicate = self._find_duplicate(project_code, source_file_path, target_path, cache)
+            if duplicate:
+                return {'status': 'SKIPPED', 'duplicate': duplicate}
+
+        chunk_uploader = ChunkUploader(self.client, concurrency=concurrency)
+        chunk_uploader.track_flag = self.track_flag
+
+        # with auto tuning, the whole file uses the size picked from the throughput of the previous
+        # uploads of client, and its chunks are measured for the next upload
+        auto_chunk_size = chunk_size == 'auto'
+        if auto_chunk_size:
+            chunk_uploader.tuner = self._chunk_size_tuner()
+            chunk_size = chunk_uploader.tuner.pick_chunk_size(ConfigClass.upload_chunk_size)
+        else:
+            chunk_size = chunk_size or ConfigClass.upload_chunk_size
+
+        # check if there is the journal from last interrupted upload
+        journal = None
+        if resumable:
+            journal_path = UploadJournal.journal_path_for(
+                ConfigClass.upload_journal_dir, project_code, source_file_path, target_path
+            )
+            expected = dict(UploadJournal.file_signature(source_file_path), auto_chunk_size=auto_chunk_size)
+            # the picked size might be different in this run, so the auto upload continues with its size
+            if not auto_chunk_size:
+                expected['chunk_size'] = chunk_size
+            journal = UploadJournal.load(journal_path, expected)
+
+        if journal:
+            session_id = journal.header.get('session_id')
+            resumable_identifier = journal.header.get('resumable_identifier')
+            chunk_size = journal.header.get('chunk_size', chunk_size)
+            header = {
+                'Session-ID': session_id,
+            }
+        else:
+            # TODO unify the sessionid
+            session_id = self.client.username + '-' + str(uuid.uuid4())
+
+            header = {
+                'Session-ID': session_id,
+            }
 
+            # do pre upload
+            upload_data = [{'resumable_filename': filename, 'resumable_relative_path': resumable_relative_path}]
+            upload_pre_res = self._pre_upload(project_code, upload_data, target_path, header)[0]
+            resumable_identifier = upload_pre_res.get('payload', {}).get('resumable_identifier')
+
+            if resumable:
+                journal_header = dict(
+                    expected,
+                    chunk_size=chunk_size,
+                    file_path=os.path.abspath(source_file_path),
+                    project_code=project_code,
+                    target_path=target_path,
+                    resumable_identifier=resumable_identifier,
+                    session_id=session_id,
+                )
+                journal = UploadJournal.create(journal_path, journal_header)
+
+        # cut the file into chunks and upload them with the worker pool
+        layout = ChunkLayout(total_file_size, chunk_size)
+        job_id = journal.job_id if journal else None
+
+        # the hashes are computed in the same pass as the chunk reads
+        algorithms = checksum_algorithms(checksum)
+        file_checksum = StreamingChecksum(algorithms, source_file_path) if algorithms else None
+
+        if not job_id:
             chunk_payload = {
                 'project_code': project_code,
                 'operator': self.client.username,
@@ -251,111 +453,843 @@ class ProjectFilesApis(BaseAPIClass):
                 'resumable_filename': filename,
                 'resumable_relative_path': resumable_relative_path,
                 'resumable_dataType': 'SINGLE_FILE_DATA',
-                'resumable_chunk_number': chunk_number,
-                'resumable_chunk_size': chunk_size,
-                'resumable_total_chunks': total_chunk_number,
+                'resumable_chunk_size': layout.chunk_size,
+                'resumable_total_chunks': layout.total_chunks,
                 'resumable_total_size': total_file_size,
                 'dcm_id': None,
                 'tags': [],
             }
 
-            files = {'chunk_data': chunk}
+            acked_chunks = set(journal.acked_chunks) if journal else set()
+            on_ack = journal.ack_chunk if journal else None
+            chunk_source = mmap_chunks if memory_map else file_chunks
 
-            upload_url = ConfigClass.chunk_upload_url
-            upload_pre_res = self._send_request(
-                upload_url, method='POST', data=chunk_payload, headers=header, files=files
+            rest = [x for x in range(1, layout.total_chunks + 1) if x not in acked_chunks]
+            chunks = checksum_chunks(chunk_source(source_file_path, layout, rest), layout.offset, file_checksum)
+            chunk_uploader.upload(chunks, chunk_payload, header, on_ack=on_ack)
+
+            print('chunk uploading done..')
+
+            # do combine chunks
+            combine_payload = {
+                'project_code': project_code,
+                'operator': self.client.username,
+                'resumable_identifier': resumable_identifier,
+                'resumable_filename': filename,
+                'resumable_relative_path': resumable_relative_path,
+                'resumable_total_chunks': layout.total_chunks,
+                'resumable_total_size': total_file_size,
+            }
+            # the chunks skipped by resume are read from file for the checksum
+            if file_checksum and 'md5' in algorithms:
+                combine_payload['md5'] = file_checksum.hexdigests(total_file_size)['md5']
+
+            job_id = self._combine_chunks(combine_payload, header)
+            if journal:
+                journal.set_job(job_id)
+
+        # get the status
+        status = self._wait_upload_status(project_code, header)
+
+        if journal:
+            journal.remove()
+
+        status['chunk_size'] = layout.chunk_size
+        if file_checksum:
+            status['checksum'] = file_checksum.hexdigests(total_file_size)
+            # keep the md5 from upload so the next dedup does not hash the file again
+            if dedup and 'md5' in status['checksum']:
+                with self._open_hash_cache(hash_cache) as cache:
+                    cache.put(source_file_path, status['checksum']['md5'], signature)
+        return status
+
+    def _chunk_size_tuner(self):
+        """return the tuner of client which measures the throughput across the uploads, or a new one if the
+        client does not have it."""
+
+        return getattr(self.client, 'chunk_size_tuner', None) or ChunkSizeTuner()
+
+    @staticmethod
+    def _open_hash_cache(hash_cache=None):
+        """return the context of the given hash cache which is left open, or of the default one which is
+        closed on exit."""
+
+        return contextlib.nullcontext(hash_cache) if hash_cache else HashCache()
+
+    def _find_duplicate(self, project_code, source_file_path, target_path, hash_cache):
+        """Function Summary: private function to find the file with same name, size and md5(if the server
+        exposes it) under <username>/<target_path> with the listing api.
+
+        Args:
+            project_code (string): project code
+            source_file_path (string): the file path on the local file system
+            target_path (string): the folder under user name space
+            hash_cache (HashCache): the local md5 cache
+
+        Returns:
+            the existing file node. None if not found
+        """
+
+        project = ProjectApis(self.client).get_project_by_code(project_code)
+        if not project:
+            return None
+        project_geid = project.get('global_entity_id')
+
+        def find_child(folder_geid, name, folder):
+            nodes = self.list_child_entities(
+                project_geid, folder_geid, page_size=ConfigClass.list_page_size, query={'name': name}
             )
-            print(upload_pre_res.json())
+            # the name query might be the fuzzy match
+            return [x for x in nodes if x.get('name') == name and is_folder(x) == folder]
+
+        # look up the target folder level by level
+        folder_geid = None
+        for name in [self.client.username] + [x for x in target_path.split('/') if x]:
+            folders = find_child(folder_geid, name, True)
+            if not folders:
+                return None
+            folder_geid = folders[0].get('global_entity_id')
+
+        size = os.path.getsize(source_file_path)
+        for node in find_child(folder_geid, os.path.basename(source_file_path), False):
+            if node.get('file_size') != size:
+                continue
+            remote_checksum = node.get(FolderSyncPlan.CHECKSUM_FIELD)
+            if not remote_checksum or hash_cache.md5(source_file_path) == remote_checksum:
+                return node
+
+        return None
+
+    def fput_stream_entity(
+        self, project_code, stream, filename, target_path='', size=None, concurrency=None, chunk_size=None
+    ):
+        """Function Summary: The function will upload the data from a stream instead of local file. The stream is
+        cut into chunks on the fly and uploaded concurrently, so the data does not need to be staged on disk. The
+        total size and chunk number are sent to the combine request once the stream ends.
+
+        Args:
+            project_code (string): project code
+            stream (file-like or iterable): binary file-like object with `read` or any iterable
+                of bytes eg. generator, object store stream or subprocess stdout
+            filename (string): the file name in the project
+            target_path (string): the optional params for the upload to some subfolder
+            size (int): the optional total size of stream. if it is not given the chunk request
+                will carry the bytes received so far as the total size
+            concurrency (int): the number of chunks uploading at the same time. default is
+                the `upload_concurrency` of client
+            chunk_size (int): the chunk size in bytes. default is `upload_chunk_size` in config
+
+        Returns:
+            the status of the file operation. the `total_size` and `total_chunks` are the number
+            of bytes and chunks read from the stream
+
+        Examples:
+            >>> PFA = ProjectFilesApis(pilot_client)
+            >>> # upload from file-like object
+            >>> PFA.fput_stream_entity(<project_code>, io.BytesIO(b"data"), "data.txt")
 
-            chunk_number += 1  # uploaded successfully
+            >>> # upload from the output of other process
+            >>> proc = subprocess.Popen(["tar", "-c", "folder"], stdout=subprocess.PIPE)
+            >>> PFA.fput_stream_entity(<project_code>, proc.stdout, "folder.tar")
+        """
 
-        print('chunk uploading done..')
+        resumable_relative_path = self.client.username + '/' + target_path if target_path else self.client.username
+        session_id = self.client.username + '-' + str(uuid.uuid4())
+        header = {
+            'Session-ID': session_id,
+        }
+
+        # do pre upload
+        upload_data = [{'resumable_filename': filename, 'resumable_relative_path': resumable_relative_path}]
+        upload_pre_res = self._pre_upload(project_code, upload_data, target_path, header)[0]
+        resumable_identifier = upload_pre_res.get('payload', {}).get('resumable_identifier')
+
+        chunk_size = chunk_size or ConfigClass.upload_chunk_size
+        chunk_uploader = ChunkUploader(self.client, concurrency=concurrency)
+        chunk_uploader.track_flag = self.track_flag
 
-        # do combine chunks
         combine_payload = {
             'project_code': project_code,
             'operator': self.client.username,
             'resumable_identifier': resumable_identifier,
             'resumable_filename': filename,
             'resumable_relative_path': resumable_relative_path,
-            'resumable_total_chunks': total_chunk_number,
-            'resumable_total_size': total_file_size,
+            'resumable_total_chunks': 0,
+            'resumable_total_size': 0,
+        }
+
+        def tasks():
+            for chunk_number, chunk in stream_chunks(stream, chunk_size):
+                combine_payload['resumable_total_chunks'] = chunk_number
+                combine_payload['resumable_total_size'] += len(chunk)
+
+                # the total is only known at the end of stream if size is not given
+                chunk_payload = dict(
+                    combine_payload,
+                    resumable_dataType='SINGLE_FILE_DATA',
+                    resumable_chunk_size=chunk_size,
+                    dcm_id=None,
+                    tags=[],
+                )
+                if size is not None:
+                    chunk_payload['resumable_total_size'] = size
+                    chunk_payload['resumable_total_chunks'] = math.ceil(size / chunk_size)
+
+                yield chunk_number, chunk, chunk_payload, None
+
+        chunk_uploader.upload_many(tasks(), header)
+
+        if size is not None and size != combine_payload['resumable_total_size']:
+            raise ValueError(
+                'The stream ended after %s bytes but the size is %s' % (combine_payload['resumable_total_size'], size)
+            )
+
+        self._combine_chunks(combine_payload, header)
+        status = self._wait_upload_status(project_code, header)
+
+        status['total_size'] = combine_payload['resumable_total_size']
+        status['total_chunks'] = combine_payload['resumable_total_chunks']
+        return status
+
+    def fput_folder_entity(
+        self,
+        project_code,
+        source_folder_path,
+        target_path='',
+        concurrency=None,
+        batch_size=None,
+        memory_map=True,
+        chunk_size=None,
+        checksum=True,
+    ):
+        """Function Summary: The function will walk the local folder and upload all the files under it. The folder
+        itself will be created under user name space or <username>/<target_path>. The files are registered with
+        pre upload api in batches and the chunks of all files are uploaded on one shared worker pool. Each file is
+        combined once its chunks are acknowledged and then all the jobs are tracked together.
+
+        Args:
+            project_code (string): project code
+            source_folder_path (string): the folder path on the local file system
+            target_path (string): the optional params for the upload to some subfolder
+            concurrency (int): the number of chunks uploading at the same time. default is
+                the `upload_concurrency` of client
+            batch_size (int): the number of files registered in one pre upload request. default
+                is `upload_pre_batch_size` in config
+            memory_map (bool): if true, the chunks are sliced from the memory mapped file and
+                streamed without copy. Otherwise each chunk is read into memory
+            chunk_size (int or string): the chunk size in bytes. default is `upload_chunk_size` in
+                config. if it is "auto", the chunk size of each file is picked from the throughput
+                measured on the previous files
+            checksum (bool or list): the hash algorithms computed from the chunks of each file. True
+                means `checksum_algorithms` in config. False to turn off
+
+        Returns:
+            list of upload job status for each file. the `checksum` is the dict of hex digests
+
+        Examples:
+            >>> PFA = ProjectFilesApis(pilot_client)
+            >>> # upload the folder to <username>/<folder_name>
+            >>> res = PFA.fput_folder_entity(<project_code>, <your_folder_path>)
+
+            >>> # upload the folder to <username>/test0913/<folder_name>
+            >>> res = PFA.fput_folder_entity(<project_code>, <your_folder_path>, target_path="test0913")
+        """
+
+        folder_name = os.path.basename(os.path.normpath(source_folder_path))
+        upload_files = []
+        for root, _, files in os.walk(source_folder_path):
+            relative_folder = os.path.relpath(root, source_folder_path)
+            if relative_folder == '.':
+                relative_folder = folder_name
+            else:
+                relative_folder = folder_name + '/' + relative_folder.replace(os.sep, '/')
+
+            for name in sorted(files):
+                upload_files.append((os.path.join(root, name), relative_folder))
+
+        return self._upload_files(
+            project_code,
+            upload_files,
+            target_path=target_path,
+            concurrency=concurrency,
+            batch_size=batch_size,
+            memory_map=memory_map,
+            chunk_size=chunk_size,
+            checksum=checksum,
+        )
+
+    def sync_folder(
+        self,
+        project_geid,
+        source_folder_path,
+        target_path='',
+        delete=False,
+        dry_run=False,
+        checksum=False,
+        concurrency=None,
+        batch_size=None,
+        memory_map=True,
+        chunk_size=None,
+    ):
+        """Function Summary: The function will sync the local folder to the project folder like rsync. The local
+        tree is compared with <username>/<target_path>/<folder_name> in greenroom(the same place as
+        `fput_folder_entity`) by the relative path, size and the checksum where the server has it. Only the new
+        and changed files are uploaded in parallel. Since the existing file cannot be overwritten, the new version
+        of changed file is uploaded to the staging folder(<username>/<target_path>/.pilot_sync) first. The remote
+        version is only deleted after the staged upload SUCCEEDED, then the file is uploaded to its place and the
+        staged copy is removed. So there is always a good copy in project, at the cost of uploading the changed
+        files twice. The remote extras are deleted in a separate step after the uploads.
+
+        Args:
+            project_geid (string): unique identifier of project
+            source_folder_path (string): the folder path on the local file system
+            target_path (string): the optional params for the upload to some subfolder
+            delete (bool): if true, remove the remote files and folders which are not in local folder
+            dry_run (bool): if true, only return the report without any change
+            checksum (bool): if true, compare the md5 of local file with the remote one when the
+                sizes are same and the remote node has the checksum. the local md5 is kept in the
+                hash cache at `hash_cache_path` in config
+            concurrency (int): the number of chunks uploading at the same time. default is
+                the `upload_concurrency` of client
+            batch_size (int): the number of files registered in one pre upload request. default
+                is `upload_pre_batch_size` in config
+            memory_map (bool): slice the chunks from memory mapped file
+            chunk_size (int or string): the chunk size in bytes or "auto"
+
+        Returns:
+            dict of report. "upload", "update" and "delete" are the relative paths, "unchanged" is
+            the number of skipped files, "jobs" is the upload job status(empty for dry run) and
+            "failed" is the relative paths which are not uploaded. the remote version of failed
+            file is kept, or its staged copy if the old one is already replaced or cannot be deleted
+
+        Examples:
+            >>> PFA = ProjectFilesApis(pilot_client)
+            >>> # see what will be changed
+            >>> report = PFA.sync_folder(<project_geid>, <your_folder_path>, dry_run=True)
+
+            >>> # upload the new/changed files and remove the files deleted locally
+            >>> report = PFA.sync_folder(<project_geid>, <your_folder_path>, target_path="raw", delete=True)
+        """
+
+        folder_name = os.path.basename(os.path.normpath(source_folder_path))
+        target_path = target_path.strip('/')
+        base_path = posixpath.join(self.client.username, target_path, folder_name)
+        local_files, local_folders = local_tree(source_folder_path)
+        _, remote_files, extra_folders = self._remote_tree(project_geid, base_path, local_folders)
+
+        # the unchanged local files are not hashed again across the runs
+        if checksum:
+            with HashCache() as hash_cache:
+                plan = FolderSyncPlan(local_files, remote_files, extra_folders, checksum=True, hash_file=hash_cache.md5)
+        else:
+            plan = FolderSyncPlan(local_files, remote_files, extra_folders)
+        report = dict(plan.summary(), dry_run=dry_run, jobs=[], failed=[])
+        if not delete:
+            report['delete'] = []
+        if dry_run:
+            return report
+
+        project_code = None
+        if plan.upload or plan.update:
+            project_code = ProjectApis(self.client).get_project_by_geid(project_geid).get('code')
+
+        def upload(relative_paths, upload_target):
+            upload_files = []
+            for relative_path in relative_paths:
+                relative_folder = posixpath.dirname(posixpath.join(folder_name, relative_path))
+                upload_files.append((local_files[relative_path][0], relative_folder))
+
+            jobs = self._upload_files(
+                project_code,
+                upload_files,
+                target_path=upload_target,
+                concurrency=concurrency,
+                batch_size=batch_size,
+                memory_map=memory_map,
+                chunk_size=chunk_size,
+            )
+            failed = [x for x, job in zip(relative_paths, jobs) if job.get('status') != 'SUCCEED']
+            return jobs, failed
+
+        if plan.upload:
+            jobs, failed = upload(plan.upload, target_path)
+            report['jobs'] += jobs
+            report['failed'] += failed
+
+        if plan.update:
+            self._sync_update(project_geid, plan.update, remote_files, target_path, folder_name, upload, report)
+
+        # the remote extras are removed after the uploads
+        if delete and plan.delete:
+            self.delete_entity(project_geid, [{'geid': node.get('global_entity_id')} for _, node in plan.delete])
+
+        return report
+
+    def _sync_update(self, project_geid, relative_paths, remote_files, target_path, folder_name, upload, report):
+        """Function Summary: private function to replace the changed files of `sync_folder` without losing the
+        remote copy. The old version is only deleted after the new one is staged successfully, and the new one
+        is only uploaded to its place after the old one is deleted.
+
+        Args:
+            project_geid (string): unique identifier of project
+            relative_paths (list): the relative paths of changed files
+            remote_files (dict): the remote node of each relative path
+            target_path (string): the target path of sync
+            folder_name (string): the name of synced folder
+            upload (callable): takes the relative paths and upload target, returns (jobs, failed paths)
+            report (dict): the report of sync to add the jobs and failed paths
+
+        Returns:
+            None
+        """
+
+        staging_target = posixpath.join(target_path, self.SYNC_STAGING_FOLDER)
+        _, failed = upload(relative_paths, staging_target)
+        report['failed'] += failed
+
+        replace = [x for x in relative_paths if x not in failed]
+        if not replace:
+            return
+
+        # the new version cannot be uploaded over the old one which is not deleted
+        base_path = posixpath.join(self.client.username, target_path, folder_name)
+        not_deleted = self._sync_delete_old(project_geid, replace, remote_files, base_path)
+        report['failed'] += not_deleted
+
+        replace = [x for x in replace if x not in not_deleted]
+        if replace:
+            jobs, failed = upload(replace, target_path)
+            report['jobs'] += jobs
+            report['failed'] += failed
+
+        # keep the staged copy of the file which is not uploaded to its place
+        keep = set(failed) | set(not_deleted)
+        staging_base = posixpath.join(self.client.username, staging_target, folder_name)
+        staging_root, staged_files, _ = self._remote_tree(project_geid, staging_base)
+        if keep:
+            targets = [{'geid': node.get('global_entity_id')} for x, node in staged_files.items() if x not in keep]
+        else:
+            targets = [{'geid': staging_root.get('global_entity_id')}] if staging_root else []
+        if targets:
+            self.delete_entity(project_geid, targets)
+
+    def _sync_delete_old(self, project_geid, relative_paths, remote_files, base_path):
+        """Function Summary: private function to delete the old version of changed files for `sync_folder`.
+
+        Args:
+            project_geid (string): unique identifier of project
+            relative_paths (list): the relative paths of changed files
+            remote_files (dict): the remote node of each relative path
+            base_path (string): the folder path of sync from project root eg. <username>/<folder_name>
+
+        Returns:
+            list of the relative paths whose old version is still in project
+        """
+
+        try:
+            status = self.delete_entity(
+                project_geid, [{'geid': remote_files[x].get('global_entity_id')} for x in relative_paths]
+            )
+            if status.get('status') == 'SUCCEED':
+                return []
+
+            # the job might delete part of the files, so the remote tree tells which ones are left
+            _, files, _ = self._remote_tree(project_geid, base_path)
+        except Exception as e:
+            # nothing is known to be deleted
+            self._logger.warning('Failed to delete the old version of changed files: %s' % e)
+            return list(relative_paths)
+
+        geid = lambda node: node.get('global_entity_id')
+        return [x for x in relative_paths if x in files and geid(files[x]) == geid(remote_files[x])]
+
+    def _remote_tree(self, project_geid, base_path, local_folders=None):
+        """Function Summary: private function to list the files under the greenroom folder by relative path. Only
+        the folders towards <base_path> are walked above it.
+
+        Args:
+            project_geid (string): unique identifier of project
+            base_path (string): the folder path from project root eg. <username>/<folder_name>
+            local_folders (set): the relative folders to walk into. the other remote folders are returned
+                as extra folders without walking. None means to walk all the folders
+
+        Returns:
+            (root, files, extra_folders). root is the folder node of <base_path>(None if not exist), files
+            is the dict of <relative_path>: node and extra_folders is the list of (<relative_path>, node)
+        """
+
+        root, remote_files, extra_folders = None, {}, []
+        for path, folders, files in self.walk(project_geid, zone='Greenroom'):
+            # above the folder, only walk towards it
+            if path != base_path and not path.startswith(base_path + '/'):
+                for node in folders:
+                    if posixpath.join(path, node.get('name', '')) == base_path:
+                        root = node
+                folders[:] = [
+                    x for x in folders if (base_path + '/').startswith(posixpath.join(path, x.get('name', '')) + '/')
+                ]
+                continue
+
+            relative_folder = path[len(base_path) + 1 :]
+            for node in files:
+                remote_files[posixpath.join(relative_folder, node.get('name', ''))] = node
+            if local_folders is None:
+                continue
+
+            # the remote folder not in local is removed as a whole so it is not walked into
+            keep = []
+            for node in folders:
+                relative_path = posixpath.join(relative_folder, node.get('name', ''))
+                if relative_path in local_folders:
+                    keep.append(node)
+                else:
+                    extra_folders.append((relative_path, node))
+            folders[:] = keep
+
+        return root, remote_files, extra_folders
+
+    def _upload_files(
+        self,
+        project_code,
+        upload_files: list,
+        target_path='',
+        concurrency=None,
+        batch_size=None,
+        memory_map=True,
+        chunk_size=None,
+        checksum=True,
+    ):
+        """Function Summary: private function to upload many files under one session. The pre upload requests are
+        sent lazily batch by batch while the chunks of previous batch are uploading.
+
+        Args:
+            project_code (string): project code
+            upload_files (list): list of (<local_file_path>, <relative_folder>). the relative folder
+                is the path under <username>/<target_path>. empty string for the target itself
+            target_path (string): the optional params for the upload to some subfolder
+            concurrency (int): the number of chunks uploading at the same time
+            batch_size (int): the number of files registered in one pre upload request
+            memory_map (bool): slice the chunks from memory mapped file
+            chunk_size (int or string): the chunk size in bytes or "auto"
+            checksum (bool or list): the hash algorithms computed from the chunks of each file
+
+        Returns:
+            list of upload job status for each file
+        """
+
+        session_id = self.client.username + '-' + str(uuid.uuid4())
+        header = {
+            'Session-ID': session_id,
         }
+        base_path = self.client.username + '/' + target_path if target_path else self.client.username
+        batch_size = batch_size or ConfigClass.upload_pre_batch_size
+
+        chunk_uploader = ChunkUploader(self.client, concurrency=concurrency)
+        chunk_uploader.track_flag = self.track_flag
+        if chunk_size == 'auto':
+            chunk_uploader.tuner = self._chunk_size_tuner()
+            chunk_size = None
+        chunk_size = chunk_size or ConfigClass.upload_chunk_size
+        chunk_source = mmap_chunks if memory_map else file_chunks
+
+        job_ids = [None] * len(upload_files)
+        checksums = [None] * len(upload_files)
+        algorithms = checksum_algorithms(checksum)
+        lock = threading.Lock()
+
+        def combine(index, combine_payload, file_checksum):
+            # all the chunks are hashed before they are sent so the digest is ready
+            if file_checksum:
+                checksums[index] = file_checksum.hexdigests(combine_payload['resumable_total_size'])
+                if 'md5' in algorithms:
+                    combine_payload['md5'] = checksums[index]['md5']
+            job_ids[index] = self._combine_chunks(combine_payload, header)
+
+        def file_tasks(index, source_file_path, data, upload_item):
+            total_file_size = os.path.getsize(source_file_path)
+            file_chunk_size = chunk_size
+            if chunk_uploader.tuner:
+                file_chunk_size = chunk_uploader.tuner.pick_chunk_size(chunk_size)
+            layout = ChunkLayout(total_file_size, file_chunk_size)
+            file_checksum = StreamingChecksum(algorithms, source_file_path) if algorithms else None
+
+            resumable_identifier = upload_item.get('payload', {}).get('resumable_identifier')
+            combine_payload = {
+                'project_code': project_code,
+                'operator': self.client.username,
+                'resumable_identifier': resumable_identifier,
+                'resumable_filename': data['resumable_filename'],
+                'resumable_relative_path': data['resumable_relative_path'],
+                'resumable_total_chunks': layout.total_chunks,
+                'resumable_total_size': total_file_size,
+            }
+            chunk_payload = dict(
+                combine_payload,
+                resumable_dataType='SINGLE_FILE_DATA',
+                resumable_chunk_size=layout.chunk_size,
+                dcm_id=None,
+                tags=[],
+            )
+
+            # empty file does not have chunk to upload
+            if layout.total_chunks == 0:
+                combine(index, combine_payload, file_checksum)
+                return
+
+            # the last acknowledged chunk will trigger the combine of file
+            remaining = {'chunks': layout.total_chunks}
+
+            def on_ack(chunk_number):
+                with lock:
+                    remaining['chunks'] -= 1
+                    finished = remaining['chunks'] == 0
+                if finished:
+                    combine(index, combine_payload, file_checksum)
+
+            chunk_numbers = range(1, layout.total_chunks + 1)
+            chunks = checksum_chunks(
+                chunk_source(source_file_path, layout, chunk_numbers), layout.offset, file_checksum
+            )
+            for chunk_number, chunk in chunks:
+                yield chunk_number, chunk, chunk_payload, on_ack
+
+        def tasks():
+            for batch_start in range(0, len(upload_files), batch_size):
+                batch = upload_files[batch_start : batch_start + batch_size]
+                pre_payload_data = []
+                for source_file_path, relative_folder in batch:
+                    relative_path = base_path + '/' + relative_folder if relative_folder else base_path
+                    pre_payload_data.append(
+                        {
+                            'resumable_filename': os.path.basename(source_file_path),
+                            'resumable_relative_path': relative_path,
+                        }
+                    )
+
+                # register the whole batch with one pre upload request
+                upload_items = self._pre_upload(project_code, pre_payload_data, target_path, header)
+
+                for offset, (source_file_path, _) in enumerate(batch):
+                    data, upload_item = pre_payload_data[offset], upload_items[offset]
+                    yield from file_tasks(batch_start + offset, source_file_path, data, upload_item)
+
+        chunk_uploader.upload_many(tasks(), header)
+
+        # track all the jobs of this session together
+        job_status = self._wait_upload_jobs(project_code, header, job_ids)
+        for status, digests in zip(job_status, checksums):
+            if digests:
+                status['checksum'] = digests
+
+        return job_status
+
+    def _pre_upload(self, project_code, upload_data: list, target_path, header):
+        """Function Summary: private function to register the files with pre upload api.
+
+        Args:
+            project_code (string): project code
+            upload_data (list): list of {"resumable_filename", "resumable_relative_path"}
+            target_path (string): the folder where files are uploaded to
+            header (dict): the headers with `Session-ID`
+
+        Returns:
+            list of upload job for each item in <upload_data>
+        """
+
+        pre_payload = {
+            'project_code': project_code,
+            'operator': self.client.username,
+            'job_type': 'AS_FILE',
+            'data': upload_data,
+            'upload_message': '',
+            'current_folder_node': target_path,
+        }
+
+        url = ConfigClass.pre_upload_url
+        upload_pre_res = self._send_request(url, method='POST', json=pre_payload, headers=dict(header))
+
+        return upload_pre_res.json().get('result', [])
+
+    def _combine_chunks(self, combine_payload: dict, header):
+        """Function Summary: private function to send the combine request after all chunks are uploaded.
+
+        Args:
+            combine_payload (dict): the resumable information of file
+            header (dict): the headers with `Session-ID`
+
+        Returns:
+            the job id of upload
+        """
 
         combine_url = ConfigClass.combine_chunk_url
-        combine_res = self._send_request(combine_url, method='POST', json=combine_payload, headers=header)
-        # print(combine_res.json())
-        job_id = combine_res.json().get('result', {}).get('job_id')
-        # print(job_id)
+        combine_res = self._send_request(combine_url, method='POST', json=combine_payload, headers=dict(header))
+
+        return combine_res.json().get('result', {}).get('job_id')
+
+    def _wait_upload_status(self, project_code, header):
+        """Function Summary: private function to long poll the upload status of single file session.
+
+        Args:
+            project_code (string): project code
+            header (dict): the headers with `Session-ID`
+
+        Returns:
+            the upload status
+        """
 
-        # get the status
         task_url = ConfigClass.upload_status_url
         task_param = {
             'project_code': project_code,
             'operator': self.client.username,
         }
-        while 1:
-            res = self._send_request(task_url, method='GET', params=task_param, headers=header)
-            status = res.json().get('result', [])[0]
-            if status.get('status') == 'SUCCEED':
-                break
-            time.sleep(2)
 
-        return status
+        def check():
+            res = self._send_request(task_url, method='GET', params=task_param, headers=dict(header))
+            return res.json().get('result', [])[0]
+
+        return self._poll(
+            check,
+            lambda x: x.get('status') in self.UPLOAD_FINISHED_STATUS,
+            'upload of session %s' % header.get('Session-ID'),
+        )
 
-    def fget_file_entity(self, project_code, source_geids: list):
+    def _wait_upload_jobs(self, project_code, header, job_ids: list):
+        """Function Summary: private function to long poll the status of all the upload jobs in one session.
+
+        Args:
+            project_code (string): project code
+            header (dict): the headers with `Session-ID`
+            job_ids (list): the job ids returned by combine requests
+
+        Returns:
+            list of upload status in the same order of <job_ids>
+        """
+
+        task_url = ConfigClass.upload_status_url
+        task_param = {
+            'project_code': project_code,
+            'operator': self.client.username,
+        }
+
+        def check():
+            res = self._send_request(task_url, method='GET', params=task_param, headers=dict(header))
+            status_map = {x.get('job_id'): x for x in res.json().get('result', [])}
+            return [status_map.get(x, {}) for x in job_ids]
+
+        return self._poll(
+            check,
+            lambda job_status: all([x.get('status') in self.UPLOAD_FINISHED_STATUS for x in job_status]),
+            '%s upload jobs of session %s' % (len(job_ids), header.get('Session-ID')),
+        )
+
+    def fget_file_entity(self, project_code, source_geids: list, concurrency=None, resumable=False, checksum=True):
         """Function Summary: The function will send the request to PILOT service to prepare the download. if the job
-        status changed from `ZIPPING`. it will request the file stream and read it byte by byte to the local file.
+        status changed from `ZIPPING`. it will request the file stream and read it block by block to the local file.
+        If the download api supports HTTP Range, the file will be fetched in byte ranges over several connections.
+        The data is written into `<download_name>.part` with a sidecar record `<download_name>.part.json`, and the
+        part file is renamed to the final name only after the size matches.
 
         Args:
             project_code (string): project code
             source_geids (list of string): the file geid from system
+            concurrency (int): the number of ranges downloading at the same time. default is
+                `download_concurrency` in config. 1 means single stream
+            resumable (bool): if true, the unfinished download of the same geids in current
+                folder will be continued with the Range request. The pre download and ZIPPING
+                wait are skipped if the prepared download is still available
+            checksum (bool or list): the hash algorithms computed from the data while it is written.
+                True means `checksum_algorithms` in config. The digest is compared with the one in
+                response headers if server provides it. False to turn off
 
         Returns:
-            the status of the download file operation
+            the status of the download file operation. the `checksum` is the dict of hex digests
 
         Examples:
             >>> PFA = ProjectFilesApis(pilot_client)
             >>> res = PFA.fget_file_entity(<project_code>, [<geid1>, <geid2>])
+
+            >>> # continue the interrupted download
+            >>> res = PFA.fget_file_entity(<project_code>, [<geid1>, <geid2>], resumable=True)
         """
 
-        # send pre download request
-        session_id = self.client.username + '-' + str(uuid.uuid4())
-        pre_payload = {
-            'files': [{'geid': x} for x in source_geids],
-            'project_code': project_code,
-            'operator': self.client.username,
-            'session_id': session_id,
-        }
-        header = {
-            'Session-ID': session_id,
-        }
+        # check if the prepared download from last try is still available
+        record = DownloadRecord.find('.', project_code, source_geids) if resumable else None
+        if record:
+            hash_code = record.get('hash_code')
+            header = {
+                'Session-ID': record.get('session_id'),
+            }
+            try:
+                task_url = ConfigClass.download_status_url % (hash_code)
+                file_download_res = self._send_request(task_url, method='GET', headers=header)
+            except Exception:
+                record.remove()
+                record = None
+
+        if not record:
+            # send pre download request
+            session_id = self.client.username + '-' + str(uuid.uuid4())
+            pre_payload = {
+                'files': [{'geid': x} for x in source_geids],
+                'project_code': project_code,
+                'operator': self.client.username,
+                'session_id': session_id,
+            }
+            header = {
+                'Session-ID': session_id,
+            }
+
+            url = ConfigClass.pre_download_url
+            upload_pre_res = self._send_request(url, method='POST', json=pre_payload, headers=header)
+            hash_code = upload_pre_res.json().get('result', {}).get('payload', {}).get('hash_code', None)
+            # zone = upload_pre_res.json().get("result", {}).get("payload", {}).get("zone", "")
+
+            # loop to check if file prepared
+            # TODO after update the task api change to task object
+            task_url = ConfigClass.download_status_url % (hash_code)
+            file_download_res = self._poll(
+                lambda: self._send_request(task_url, method='GET', headers=header),
+                lambda x: x.json().get('result', {}).get('status') != 'ZIPPING',
+                'download preparation of session %s' % session_id,
+            )
 
-        url = ConfigClass.pre_download_url
-        upload_pre_res = self._send_request(url, method='POST', json=pre_payload, headers=header)
-        hash_code = upload_pre_res.json().get('result', {}).get('payload', {}).get('hash_code', None)
-        # zone = upload_pre_res.json().get("result", {}).get("payload", {}).get("zone", "")
-
-        # loop to check if file prepared
-        # TODO after update the task api change to task object
-        task_url = ConfigClass.download_status_url % (hash_code)
-        while 1:
-            file_download_res = self._send_request(task_url, method='GET', headers=header)
-            status = file_download_res.json().get('result', {})
-            if status.get('status') != 'ZIPPING':
-                break
-            time.sleep(2)
+            download_name = decode_jwt(hash_code)
+            download_name = os.path.basename(download_name.get('full_path'))
+            record = DownloadRecord.create(
+                download_name,
+                hash_code=hash_code,
+                session_id=session_id,
+                project_code=project_code,
+                source_geids=sorted(source_geids),
+            )
 
         # download to local
+        # fetch the byte ranges over several connections if server support Range
+        # otherwise it will be the single stream
         download_url = ConfigClass.download_url % (hash_code)
-        download_name = jwt.decode(hash_code, options={'verify_signature': False}, algorithms=['HS256'])
-        download_name = os.path.basename(download_name.get('full_path'))
-        # here the request is in stream mode, since we request the file which might
-        # be very large. It will save the file byte by byte to avoid blowing up the memory
-        with self._send_request(download_url, method='GET', stream=True) as r:
-            r.raise_for_status()
-            with open(download_name, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
-
-        return file_download_res.json().get('result', {})
+        downloader = RangeDownloader(self.client, concurrency=concurrency)
+        downloader.track_flag = self.track_flag
+        algorithms = checksum_algorithms(checksum)
+        file_checksum = StreamingChecksum(algorithms, record.part_path) if algorithms else None
+        total_size = downloader.download(download_url, record.part_path, record, checksum=file_checksum)
+
+        # only the complete file will have the final name
+        part_size = os.path.getsize(record.part_path)
+        if total_size is not None and part_size != total_size:
+            raise IOError('Download is incomplete, received %s of %s bytes' % (part_size, total_size))
+
+        digests = file_checksum.hexdigests(part_size) if file_checksum else {}
+        mismatched = [x for x, y in downloader.expected_digests.items() if x in digests and digests[x] != y]
+        if mismatched:
+            # the corrupted part should not be resumed
+            os.remove(record.part_path)
+            record.remove()
+            raise IOError('Download is corrupted, the %s checksum does not match' % ', '.join(mismatched))
+
+        os.replace(record.part_path, record.get('output_path'))
+        record.remove()
+
+        result = file_download_res.json().get('result', {})
+        if digests:
+            result['checksum'] = digests
+        return result
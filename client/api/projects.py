@@ -1,4 +1,5 @@
 from client.api.base_class import BaseAPIClass
+from client.model.page_iterator import PageIterator
 from client.model.validator import array_of_string_vali
 from config import ConfigClass
 
@@ -77,6 +78,30 @@ class ProjectApis(BaseAPIClass):
         # TODO need object??
         return res.json().get('result', [])
 
+    def iter_projects(self, page_size=None, prefetch=None, **kwargs):
+        """Function Summary: The function will yield the projects across all the pages. The next pages are
+        requested in background while the current page is consumed.
+
+        Args:
+            page_size (int): page size of each request. default is `list_page_size` in config
+            prefetch (int): the number of pages requested ahead. default is `list_prefetch_pages`
+                in config. 0 means no prefetch
+            kwargs: the other query parameters of `list_projects` eg. order_by, name, is_all
+
+        Returns:
+            iterator of projects
+
+        Examples:
+            >>> PA = ProjectApis(pilot_client)
+            >>> for project in PA.iter_projects(is_all=True):
+            >>>     print(project.get('code'))
+        """
+
+        page_size = page_size or ConfigClass.list_page_size
+        return PageIterator(
+            lambda page: self.list_projects(page=page, page_size=page_size, **kwargs), page_size, prefetch
+        )
+
     def create_project(self, name, code, tags=None, description='', discoverable=True):
         """Function Summary: create new project based on name/code.
 
@@ -120,11 +145,13 @@ class ProjectApis(BaseAPIClass):
 
         return res.json().get('result', [])
 
-    def get_project_by_geid(self, geid):
-        """Function Summary: get project detail by geid.
+    def get_project_by_geid(self, geid, use_cache=True):
+        """Function Summary: get project detail by geid. The result is kept in the metadata cache of client
+        and also can be found by `get_project_by_code`.
 
         Args:
             geid (string): unique identifier for the project
+            use_cache (bool): if false, always fetch from server and refresh the cache
 
         Returns:
             project detail
@@ -135,7 +162,36 @@ class ProjectApis(BaseAPIClass):
             >>> res = PA.get_project_by_geid(<project_geid>)
         """
 
-        url = ConfigClass.get_project_by_geid_url % (geid)
-        res = self._send_request(url, method='GET')
+        def load():
+            url = ConfigClass.get_project_by_geid_url % (geid)
+            res = self._send_request(url, method='GET')
+            project = res.json().get('result', [])
+            self._cache_project(project)
+            return project
 
-        return res.json().get('result', [])
+        return self._cached(('project_geid', geid), load, use_cache)
+
+    def get_project_by_code(self, code, use_cache=True):
+        """Function Summary: get project detail by code. The result is kept in the metadata cache of client
+        and also can be found by `get_project_by_geid`.
+
+        Args:
+            code (string): project code
+            use_cache (bool): if false, always fetch from server and refresh the cache
+
+        Returns:
+            project detail. None if the project is not found
+
+        Examples:
+            >>> PA = ProjectApis(pilot_client)
+            >>> res = PA.get_project_by_code(<project_code>)
+        """
+
+        def load():
+            # the code query might be the fuzzy match so pick the exact one
+            projects = self.list_projects(code=code, is_all=True, page_size=ConfigClass.list_page_size)
+            project = next((x for x in projects if x.get('code') == code), None)
+            self._cache_project(project)
+            return project
+
+        return self._cached(('project_code', code), load, use_cache)
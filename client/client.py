@@ -1,25 +1,257 @@
+import threading
+import time
+import weakref
+
 import requests
 
 from client.credentials import Credentials
 from client.exceptions import AuthenticationError
+from client.model.chunk_tuner import ChunkSizeTuner
+from client.model.metadata_cache import MetadataCache
+from client.model.notification_hub import NotificationHub
+from client.model.polling import PollingStrategy
+from client.model.task_watcher import TaskWatcher
+from client.model.token_cache import TokenCache
 from config import ConfigClass
 
 
-class PILOT:
+class BaseClient:
+    """the base class of client objects.
+
+    It manages the pooled http session shared by all the api classes bound to the
+    client. The connections are kept alive between the calls and released by
+    `close()` or leaving the `with` block.
+    """
+
+    def _init_session(self, pool_connections=None, pool_maxsize=None, timeout=None):
+        """Function Summary: private function to create the pooled http session.
+
+        Args:
+            pool_connections (int): the number of hosts to keep the connection pool for. default
+                is `http_pool_connections` in config
+            pool_maxsize (int): the max number of connections kept per host. default is
+                `http_pool_maxsize` in config
+            timeout (float or tuple): the (connect, read) timeout in seconds for each request.
+                default is `http_connect_timeout` and `http_read_timeout` in config
+
+        Returns:
+            None
+        """
+
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=pool_connections or ConfigClass.http_pool_connections,
+            pool_maxsize=pool_maxsize or ConfigClass.http_pool_maxsize,
+        )
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.timeout = timeout or (ConfigClass.http_connect_timeout, ConfigClass.http_read_timeout)
+
+    def _init_token(self, token_crediential=None, token_cache=False):
+        """Function Summary: private function to get the token of client. the given token is used
+        as it is, then the non-expired token in cache, then the login.
+
+        Args:
+            token_crediential (Credentials): the token passed by user
+            token_cache (bool or TokenCache): True to use the cache file at `token_cache_path` in
+                config. the login token is saved back to cache
+
+        Returns:
+            Credentials
+        """
+
+        self._token_lock = threading.Lock()
+        self._token_refresher = None
+        self._token_refresh_thread = None
+        self._auto_refresh = False
+        self._token_cache = None
+        if token_cache:
+            self._token_cache = token_cache if isinstance(token_cache, TokenCache) else TokenCache()
+
+        if token_crediential is not None:
+            return token_crediential
+        if not token_cache:
+            return self._new_token()
+
+        token_cache = self._token_cache
+        key = self._token_cache_key()
+        with token_cache.lock():
+            token = token_cache.load(key)
+            # the token without expiry cannot be told if it is still valid
+            if token is None or token.expires_at is None or token.is_expired(ConfigClass.token_expiry_leeway):
+                token = self._new_token()
+                token_cache.save(key, token)
+
+        return token
+
+    def refresh_token(self, stale: Credentials = None):
+        """Function Summary: renew the token of client. The new token object replaces the old one at once, so
+        the threads sharing the client pick it up from their next request. Only one refresh is sent when many
+        threads get 401 with the same token.
+
+        Args:
+            stale (Credentials): the token which is rejected or about to expire. if the client already
+                has another token, it is returned without refresh. default is to always refresh
+
+        Returns:
+            Credentials: the current token of client
+
+        Examples:
+            >>> pilot_client.refresh_token()
+        """
+
+        with self._token_lock:
+            # another thread has refreshed the token
+            if stale is not None and self.token is not stale:
+                return self.token
+
+            token = self._refresh(self.token)
+            if self._token_cache is not None:
+                with self._token_cache.lock():
+                    self._token_cache.save(self._token_cache_key(), token)
+            self.token = token
+
+        # the background refresh which gave up is started again with the new token
+        self._start_token_refresh(self._auto_refresh)
+        return token
+
+    def _start_token_refresh(self, auto_refresh=True):
+        """private function to start the background thread which refreshes the token before it expires.
+        the token without expiry is never refreshed in background. The thread only keeps the weak reference
+        of client, so it stops with `close()` or when the client is garbage collected."""
+
+        self._auto_refresh = auto_refresh
+        if not auto_refresh or self.token.expires_at is None:
+            return
+
+        with self._token_lock:
+            if self._token_refresher is not None:
+                # closed or still running
+                if self._token_refresher.is_set() or self._token_refresh_thread.is_alive():
+                    return
+
+            stopped = self._token_refresher = threading.Event()
+            weakref.finalize(self, stopped.set)
+            self._token_refresh_thread = threading.Thread(
+                target=self._refresh_loop, args=(weakref.ref(self), stopped), name='pilot-token-refresh', daemon=True
+            )
+            self._token_refresh_thread.start()
+
+    @staticmethod
+    def _refresh_loop(client_ref, stopped):
+        """Function Summary: private function of the background refresh. The failed refresh is retried with
+        exponential backoff(from `token_refresh_retry_interval` seconds up to `token_refresh_margin`). The thread
+        gives up after `token_refresh_max_failures` failures in a row or when the token is rejected, then the
+        next request with expired token refreshes it on 401.
+
+        Args:
+            client_ref (weakref): the weak reference of client
+            stopped (threading.Event): set by `close()` or when the client is collected
+
+        Returns:
+            None
+        """
+
+        margin = ConfigClass.token_refresh_margin
+        failures = 0
+        while True:
+            client = client_ref()
+            if client is None:
+                return
+            token = client.token
+            del client
+            if token.expires_at is None:
+                return
+
+            if failures:
+                delay = min(ConfigClass.token_refresh_retry_interval * 2 ** (failures - 1), margin)
+            else:
+                # refresh <margin> seconds before expiry, or at the half of lifetime for the short-lived token
+                remaining = token.expires_at - time.time()
+                delay = remaining - margin if remaining > 2 * margin else remaining / 2
+            if stopped.wait(max(delay, 1)):
+                return
+
+            client = client_ref()
+            if client is None:
+                return
+            try:
+                client.refresh_token(stale=token)
+                failures = 0
+            except AuthenticationError:
+                # the refresh token is revoked or expired
+                return
+            except Exception:
+                failures += 1
+                if failures >= ConfigClass.token_refresh_max_failures:
+                    return
+            finally:
+                del client
+
+    def close(self):
+        """Function Summary: stop the token refresh and release the connection pool of client.
+
+        Args:
+            None
+
+        Examples:
+            >>> pilot_client.close()
+        """
+
+        if getattr(self, '_token_refresher', None) is not None:
+            self._token_refresher.set()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class PILOT(BaseClient):
     def __init__(
-        self, end_point=ConfigClass.api_gateway, username=None, password=None, token_crediential: Credentials = None
+        self,
+        end_point=None,
+        username=None,
+        password=None,
+        token_crediential: Credentials = None,
+        upload_concurrency: int = None,
+        pool_connections: int = None,
+        pool_maxsize: int = None,
+        timeout=None,
+        cache_size: int = None,
+        cache_ttl: float = None,
+        polling: PollingStrategy = None,
+        token_cache=False,
+        auto_refresh: bool = True,
     ):
         """Function Summary: The PILOT class is the client object. It allow to utilize all the apis and perform the
         operation.
 
         Args:
-            endpoint (string): the connection to PILOT server
+            endpoint (string): the connection to PILOT server. default is `api_gateway` in config
             username (string): the username in the PILOT system you will get it from
                 system admin
             password (string): couple with username
             token_crediential (Credentials): token is the another way to fulfill the
                 username/password authentication if you dont want to pass the username/password
                 around the system
+            upload_concurrency (int): the number of chunks uploading at the same time for all
+                the uploads of this client. default is `upload_concurrency` in config
+            pool_connections (int): the number of hosts to keep the connection pool for
+            pool_maxsize (int): the max number of connections kept per host
+            timeout (float or tuple): the (connect, read) timeout in seconds for each request
+            cache_size (int): the max number of entries in the metadata cache. default is
+                `metadata_cache_size` in config
+            cache_ttl (float): the seconds before the cached metadata expire. default is
+                `metadata_cache_ttl` in config. 0 means no cache
+            polling (PollingStrategy): the interval, backoff and deadline to wait for the tasks. default
+                is from the `poll_*` settings in config
+            token_cache (bool or TokenCache): reuse the non-expired token saved on disk by the previous
+                runs instead of login. True means the cache file at `token_cache_path` in config
+            auto_refresh (bool): refresh the token in background `token_refresh_margin` seconds before
+                it expires. the request rejected with 401 is always sent again once with the new token
 
         Examples:
             >>> # password based auth
@@ -28,19 +260,74 @@ class PILOT:
             >>> # token based auth
             >>> credential = Credentials(at, refresh_token=rt)
             >>> pilot_client = PILOT(endpoint, token_crediential=credential)
+
+            >>> # only login when the cached token is expired
+            >>> pilot_client = PILOT(endpoint, user, pass, token_cache=True)
+
+            >>> # release the connections after use
+            >>> with PILOT(endpoint, user, pass) as pilot_client:
+            >>>     ...
         """
 
         if not username and not password and not token_crediential:
             raise ValueError('Either username/password or tokens is required')
 
-        self.base_url = end_point
+        self.base_url = end_point or ConfigClass.api_gateway
         self.username = username
         self.password = password
-
+        self.upload_concurrency = upload_concurrency or ConfigClass.upload_concurrency
+        # the project/dataset lookups shared by all the api classes of client
+        self.metadata_cache = MetadataCache(cache_size, cache_ttl)
+        self.polling = polling or PollingStrategy()
+        # the upload throughput measured across the uploads for the "auto" chunk size
+        self.chunk_size_tuner = ChunkSizeTuner()
+        self._task_watcher = None
+        self._notification_hub = None
+        self._init_session(pool_connections, pool_maxsize, timeout)
+
+        self.token = self._init_token(token_crediential, token_cache)
+        # the username is used in the file paths. take it from the token if not given
+        self.username = self.username or self.token.claims.get('preferred_username')
+        self._start_token_refresh(auto_refresh)
+
+    def _new_token(self):
         token = self._login()
-        self.token = Credentials(token['access_token'], token['refresh_token'])
+        return Credentials(token['access_token'], token['refresh_token'])
+
+    def _refresh(self, token):
+        """Function Summary: private function to get the new token with the refresh token. login again if it
+        fails and the password is known.
+
+        Args:
+            token (Credentials): the current token
+
+        Returns:
+            Credentials
+        """
 
-        # TODO add the token based if possible
+        if token.refresh_token:
+            response = self.session.post(
+                self.base_url + ConfigClass.refresh_url,
+                json={'refreshtoken': token.refresh_token},
+                headers={'Content-Type': 'application/json'},
+                timeout=self.timeout,
+            )
+            if response.status_code == 200:
+                result = response.json()['result']
+                return Credentials(result['access_token'], result.get('refresh_token') or token.refresh_token)
+            # the server error might go away, so it is not taken as the rejected token
+            if response.status_code >= 500:
+                raise ConnectionError('Failed to refresh token. ' + response.text)
+            error = response.text
+        else:
+            error = 'no refresh token'
+
+        if self.password:
+            return self._new_token()
+        raise AuthenticationError('Failed to refresh token. ' + error)
+
+    def _token_cache_key(self):
+        return TokenCache.key(self.base_url, self.username)
 
     def _login(self):
         """Function Summary: private funtion to perform the user login.
@@ -63,7 +350,9 @@ class PILOT:
         }
         headers = {'Content-Type': 'application/json'}
         # TODO how they manage the api endpoints?????
-        response = requests.post(self.base_url + ConfigClass.auth_url, json=payload, headers=headers)
+        response = self.session.post(
+            self.base_url + ConfigClass.auth_url, json=payload, headers=headers, timeout=self.timeout
+        )
         # print(response.json())
 
         # parse the token if return 200 else raise the error
@@ -72,27 +361,74 @@ class PILOT:
 
         return response.json()['result']
 
+    @property
+    def task_watcher(self) -> TaskWatcher:
+        """the shared watcher to follow many file tasks and upload jobs with the batched status
+        requests. it is created on first use and stopped with `close`."""
+
+        if self._task_watcher is None:
+            self._task_watcher = TaskWatcher(self)
+        return self._task_watcher
+
+    @property
+    def notification_hub(self) -> NotificationHub:
+        """the long-lived socketio connection to wait for the dataset file operations. it is
+        connected on first use and disconnected with `close`."""
+
+        if self._notification_hub is None:
+            self._notification_hub = NotificationHub(ConfigClass.socketio_endpoint)
+        return self._notification_hub
+
+    def close(self):
+        """Function Summary: stop the task watcher, the notification hub and release the connection
+        pool of client.
+
+        Args:
+            None
+
+        Examples:
+            >>> pilot_client.close()
+        """
+
+        if self._task_watcher is not None:
+            self._task_watcher.close()
+        if self._notification_hub is not None:
+            self._notification_hub.close()
+        super().close()
 
-class HPC:
+
+class HPC(BaseClient):
     def __init__(
         self,
         token_issuer,
-        end_point=ConfigClass.hpc_endpoint,
+        end_point=None,
         username=None,
         password=None,
         token_crediential: Credentials = None,
+        pool_connections: int = None,
+        pool_maxsize: int = None,
+        timeout=None,
+        token_cache=False,
+        auto_refresh: bool = True,
     ):
         """Function Summary: The HPC class is the client object. It will perform login into hpc to fecth the token or
         store the existing token.
 
         Args:
-            endpoint (string): the connection to PILOT server
+            endpoint (string): the connection to hpc service. default is `hpc_endpoint` in config
             username (string): the username in the PILOT system you will get it from
                 system admin
             password (string): couple with username
             token_crediential (Credentials): token is the another way to fulfill the
                 username/password authentication if you dont want to pass the username/password
                 around the system
+            pool_connections (int): the number of hosts to keep the connection pool for
+            pool_maxsize (int): the max number of connections kept per host
+            timeout (float or tuple): the (connect, read) timeout in seconds for each request
+            token_cache (bool or TokenCache): reuse the non-expired token saved on disk by the previous
+                runs instead of login. True means the cache file at `token_cache_path` in config
+            auto_refresh (bool): login again in background `token_refresh_margin` seconds before the
+                token expires. it needs the username/password since hpc token has no refresh token
 
         Examples:
             >>> # password based auth
@@ -106,15 +442,26 @@ class HPC:
         if not username and not password and not token_crediential:
             raise ValueError('Either username/password or tokens is required')
 
-        self.base_url = end_point
+        self.base_url = end_point or ConfigClass.hpc_endpoint
         self.username = username
         self.password = password
         self.token_issuer = token_issuer
+        self._init_session(pool_connections, pool_maxsize, timeout)
 
-        token = self._login()
-        self.token = Credentials(token)
+        self.token = self._init_token(token_crediential, token_cache)
+        self._start_token_refresh(auto_refresh and bool(password))
+
+    def _new_token(self):
+        return Credentials(self._login())
+
+    def _refresh(self, token):
+        # the hpc service only issues the access token
+        if not self.password:
+            raise AuthenticationError('Failed to refresh token. The hpc token can only be renewed by login')
+        return self._new_token()
 
-        # TODO add the token based if possible
+    def _token_cache_key(self):
+        return TokenCache.key(self.base_url, self.token_issuer, self.username)
 
     def _login(self):
         """Function Summary: private funtion to perform the user login.
@@ -137,7 +484,9 @@ class HPC:
             'token_issuer': self.token_issuer,
         }
         headers = {'Content-Type': 'application/json'}
-        response = requests.post(self.base_url + '/v1/hpc/auth', json=payload, headers=headers)
+        response = self.session.post(
+            self.base_url + '/v1/hpc/auth', json=payload, headers=headers, timeout=self.timeout
+        )
 
         # parse the token if return 200 else raise the error
         if response.status_code != 200:
@@ -1,3 +1,18 @@
+import time
+
+
+def decode_jwt(token):
+    """the payload of JWT without verifying the signature. jwt is imported on the first call
+    to keep it out of the sdk import. raise ValueError if the token is not a JWT."""
+
+    import jwt
+
+    try:
+        return jwt.decode(token, options={'verify_signature': False})
+    except jwt.exceptions.DecodeError as e:
+        raise ValueError('Invalid JWT: %s' % e) from e
+
+
 class Credentials:
     """Storing the user login tokens."""
 
@@ -9,6 +24,7 @@ class Credentials:
 
         self._access_token = access_token
         self._refresh_token = refresh_token
+        self._claims = None
 
     @property
     def access_token(self):
@@ -17,3 +33,28 @@ class Credentials:
     @property
     def refresh_token(self):
         return self._refresh_token
+
+    @property
+    def claims(self):
+        """the payload of access token. the signature is not verified since it is only used to
+        read the expiry and username on the client side. empty if the token is not a JWT."""
+
+        if self._claims is None:
+            try:
+                self._claims = decode_jwt(self._access_token)
+            except ValueError:
+                self._claims = {}
+        return self._claims
+
+    @property
+    def expires_at(self):
+        """the unix time when the access token expires. None if the token does not tell."""
+
+        exp = self.claims.get('exp')
+        return float(exp) if exp is not None else None
+
+    def is_expired(self, leeway=0):
+        """check if the access token expires within <leeway> seconds. the token without
+        expiry is treated as valid."""
+
+        return self.expires_at is not None and self.expires_at - leeway <= time.time()
@@ -6,6 +6,21 @@ class PayloadTypeError(Exception):
     pass
 
 
+# the task is not finished before the polling deadline
+class TaskTimeoutError(Exception):
+    def __init__(self, message, last_status=None):
+        super().__init__(message)
+        self.last_status = last_status
+
+
+# the dataset file operation is not notified before the deadline
+class DatasetTaskTimeoutError(TaskTimeoutError):
+    def __init__(self, message, pending_geids=None, partial_results=None):
+        super().__init__(message, partial_results)
+        self.pending_geids = pending_geids or []
+        self.partial_results = partial_results or []
+
+
 # Http Code Exception
 # HTTP 400
 class BadRequest(Exception):
@@ -4,28 +4,23 @@ import os
 import os.path
 import sys
 
-from pythonjsonlogger import jsonlogger
 
+def formatter_factory():
+    # the json logger is only loaded when the first logger is created
+    from pythonjsonlogger import jsonlogger
 
-class CustomJsonFormatter(jsonlogger.JsonFormatter):
-    def add_fields(self, log_record, record, message_dict):
-        super(CustomJsonFormatter, self).add_fields(log_record, record, message_dict)
-        log_record['level'] = record.levelname
-        # log_record['namespace'] = service_namespace
-        # log_record['sub_name'] = record.name
-
+    class CustomJsonFormatter(jsonlogger.JsonFormatter):
+        def add_fields(self, log_record, record, message_dict):
+            super(CustomJsonFormatter, self).add_fields(log_record, record, message_dict)
+            log_record['level'] = record.levelname
+            # log_record['namespace'] = service_namespace
+            # log_record['sub_name'] = record.name
 
-def formatter_factory():
     return CustomJsonFormatter(fmt='%(asctime)s %(level)s %(message)s')
 
 
 class SrvLoggerFactory:
-
-    my_formatter = formatter_factory()
-
     def __init__(self, name='PILOT_SDK'):
-        if not os.path.exists('./logs/'):
-            os.makedirs('./logs/')
         self.name = name
 
     def get_logger(self):
@@ -33,24 +28,30 @@ class SrvLoggerFactory:
         logger.setLevel(logging.DEBUG)
 
         if not logger.handlers:
-
-            # File Handler
-            handler = logging.FileHandler('logs/{}.log'.format(self.name))
-            handler.setFormatter(self.my_formatter)
-            handler.setLevel(logging.DEBUG)
+            my_formatter = formatter_factory()
+
+            # File Handler. the ./logs is created with the first logger and
+            # skipped if the working directory is read-only
+            try:
+                os.makedirs('./logs/', exist_ok=True)
+                handler = logging.FileHandler('logs/{}.log'.format(self.name))
+                handler.setFormatter(my_formatter)
+                handler.setLevel(logging.DEBUG)
+                logger.addHandler(handler)
+            except OSError:
+                pass
 
             # Standard Out Handler
             stdout_handler = logging.StreamHandler(sys.stdout)
-            stdout_handler.setFormatter(self.my_formatter)
+            stdout_handler.setFormatter(my_formatter)
             stdout_handler.setLevel(logging.DEBUG)
 
             # Standard Err Handler
             stderr_handler = logging.StreamHandler(sys.stderr)
-            stderr_handler.setFormatter(self.my_formatter)
+            stderr_handler.setFormatter(my_formatter)
             stderr_handler.setLevel(logging.ERROR)
 
             # register handlers
-            logger.addHandler(handler)
             logger.addHandler(stdout_handler)
             logger.addHandler(stderr_handler)
 
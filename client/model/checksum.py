@@ -0,0 +1,158 @@
+import base64
+import binascii
+import hashlib
+import threading
+
+from config import ConfigClass
+
+# the block size to read the file for hashing
+HASH_BLOCK_SIZE = 1024 * 1024
+# the algorithm names of http digest headers to the hashlib names
+DIGEST_HEADER_ALGORITHMS = {'md5': 'md5', 'sha-256': 'sha256', 'sha-512': 'sha512'}
+
+
+def file_md5(file_path, block_size=HASH_BLOCK_SIZE):
+    """return the hex md5 digest of the local file. the file is read block by block."""
+
+    md5 = hashlib.md5()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            md5.update(block)
+
+    return md5.hexdigest()
+
+
+def checksum_algorithms(checksum):
+    """return the list of hash algorithms from the `checksum` argument of transfer functions.
+    True means `checksum_algorithms` in config, False or None means no checksum."""
+
+    if checksum is True:
+        return list(ConfigClass.checksum_algorithms)
+    if not checksum:
+        return []
+    if isinstance(checksum, str):
+        return [checksum]
+    return list(checksum)
+
+
+class StreamingChecksum:
+    """the checksum computed from the data while it is transferred.
+
+    The data is fed with its offset in the file. The hashes are computed in order, so
+    the bytes which are not passed in(eg. the chunks uploaded before resume or the part
+    downloaded in last try) are read from <file_path> to fill the gap. When the data is
+    fed in order, the file is never read again.
+
+    Examples:
+        >>> checksum = StreamingChecksum(['md5', 'blake2b'], <local_file_path>)
+        >>> checksum.update_at(0, <first_chunk>)
+        >>> checksum.hexdigests(<total_size>)
+        {'md5': '...', 'blake2b': '...'}
+    """
+
+    def __init__(self, algorithms=None, file_path=None):
+        self.algorithms = list(algorithms or ConfigClass.checksum_algorithms)
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.hashes = {x: hashlib.new(x) for x in self.algorithms}
+        self.position = 0
+
+    def _update(self, data):
+        for h in self.hashes.values():
+            h.update(data)
+        self.position += len(data)
+
+    def _catch_up(self, offset):
+        # the data before current position is sent again(eg. restart from the beginning)
+        if offset < self.position:
+            self._reset()
+
+        if offset > self.position:
+            if not self.file_path:
+                raise ValueError('Cannot checksum the bytes %s-%s without the file' % (self.position, offset - 1))
+            with open(self.file_path, 'rb') as f:
+                f.seek(self.position)
+                while self.position < offset:
+                    block = f.read(min(HASH_BLOCK_SIZE, offset - self.position))
+                    if not block:
+                        raise IOError('File is shorter than %s bytes for checksum' % offset)
+                    self._update(block)
+
+    def update_at(self, offset, data):
+        """feed the <data> which starts at <offset> of the file."""
+
+        with self._lock:
+            self._catch_up(offset)
+            self._update(data)
+
+    def update_from_file(self, end):
+        """hash the file up to the <end> offset(exclusive). it is used when the data is written
+        out of order(eg. the ranges of download) and read back while it is still cached."""
+
+        with self._lock:
+            self._catch_up(end)
+
+    def hexdigests(self, total_size=None):
+        """return the dict of <algorithm>: <hex digest>. the bytes up to <total_size> which are not
+        fed are read from file."""
+
+        with self._lock:
+            if total_size is not None:
+                self._catch_up(total_size)
+            return {x: h.hexdigest() for x, h in self.hashes.items()}
+
+
+def checksum_chunks(chunks, offset_of, checksum):
+    """the generator will hash the (<chunk_number>, <chunk_data>) pairs before they are yielded.
+
+    Args:
+        chunks (iterator): the chunk pairs eg. from `mmap_chunks`
+        offset_of (callable): the function takes the chunk number and returns its offset in file
+        checksum (StreamingChecksum): the checksum to feed. None means no hashing
+
+    Returns:
+        iterator of the same chunk pairs
+    """
+
+    for chunk_number, chunk in chunks:
+        if checksum:
+            checksum.update_at(offset_of(chunk_number), chunk)
+        yield chunk_number, chunk
+
+
+def header_digests(headers, partial=False):
+    """Function Summary: find the checksum of whole file provided by server in the response headers. The
+    `Repr-Digest`/`Digest` headers are for the whole file even in the range response, while the `Content-MD5`
+    is only for the body so it is used when the response is not <partial>.
+
+    Args:
+        headers (dict): the response headers
+        partial (bool): if the response is for the byte range
+
+    Returns:
+        dict of <algorithm>: <hex digest>. empty if server does not provide it
+    """
+
+    digests = {}
+    for name in ['Digest', 'Repr-Digest']:
+        for item in (headers.get(name) or '').split(','):
+            algorithm, _, value = item.strip().partition('=')
+            algorithm = DIGEST_HEADER_ALGORITHMS.get(algorithm.strip().lower())
+            if algorithm and value:
+                digests[algorithm] = _b64_to_hex(value.strip().strip(':'))
+
+    content_md5 = headers.get('Content-MD5')
+    if content_md5 and not partial:
+        digests.setdefault('md5', _b64_to_hex(content_md5))
+
+    return {x: y for x, y in digests.items() if y}
+
+
+def _b64_to_hex(value):
+    try:
+        return base64.b64decode(value).hex()
+    except (binascii.Error, ValueError):
+        return None
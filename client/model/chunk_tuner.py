@@ -0,0 +1,74 @@
+import threading
+from collections import deque
+
+from config import ConfigClass
+
+MB = 1024 * 1024
+
+
+class ChunkSizeTuner:
+    """pick the upload chunk size from the measured per-chunk throughput.
+
+    The tuner collect the (bytes, seconds) of the recent chunks uploaded. The
+    throughput of single stream is estimated from them and the chunk size is
+    chosen so each chunk takes about TARGET_CHUNK_SECONDS on the wire. Result
+    will be rounded down to MB and limited within the server accepted bounds
+    (`upload_min_chunk_size` and `upload_max_chunk_size` in config). The size is
+    only picked between files, since every chunk of a file declares the same
+    chunk size and total chunks to server.
+    """
+
+    # the number of recent chunks to measure the throughput from
+    SAMPLES = 32
+    # the expected time to transfer one chunk
+    TARGET_CHUNK_SECONDS = 2
+
+    def __init__(self, min_chunk_size=None, max_chunk_size=None):
+        self.min_chunk_size = min_chunk_size or ConfigClass.upload_min_chunk_size
+        self.max_chunk_size = max_chunk_size or ConfigClass.upload_max_chunk_size
+        self.samples = deque(maxlen=self.SAMPLES)
+
+        self._lock = threading.Lock()
+
+    def clamp(self, chunk_size):
+        """limit the chunk size within the bounds."""
+
+        return min(max(int(chunk_size), self.min_chunk_size), self.max_chunk_size)
+
+    def record(self, chunk_bytes, seconds):
+        """record the transfer of one chunk. it is safe to call from worker threads."""
+
+        with self._lock:
+            self.samples.append((chunk_bytes, seconds))
+
+    def throughput(self):
+        """return the measured bytes per second of single stream or None if nothing measured."""
+
+        with self._lock:
+            total_bytes = sum([x[0] for x in self.samples])
+            total_seconds = sum([x[1] for x in self.samples])
+
+        if not total_bytes or total_seconds <= 0:
+            return None
+
+        return total_bytes / total_seconds
+
+    def pick_chunk_size(self, default):
+        """Function Summary: pick the chunk size from the measured throughput.
+
+        Args:
+            default (int): the chunk size returned if there is no measurement
+
+        Returns:
+            the chunk size in bytes
+        """
+
+        throughput = self.throughput()
+        if not throughput:
+            return self.clamp(default)
+
+        chunk_size = throughput * self.TARGET_CHUNK_SECONDS
+        if chunk_size >= MB:
+            chunk_size = chunk_size // MB * MB
+
+        return self.clamp(chunk_size)
@@ -0,0 +1,235 @@
+import math
+import mmap
+import time
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+
+from client.api.base_class import BaseAPIClass
+from client.model.multipart import MultipartBody
+from config import ConfigClass
+
+
+class ChunkLayout:
+    """the byte range of each chunk in the file.
+
+    All the chunks of file have the same <chunk_size> except the last one, since the
+    chunk size and total chunks are declared to server with every chunk.
+    """
+
+    def __init__(self, total_size, chunk_size):
+        self.total_size = total_size
+        self.chunk_size = chunk_size
+
+    @property
+    def total_chunks(self):
+        return math.ceil(self.total_size / self.chunk_size)
+
+    def offset(self, chunk_number):
+        return (chunk_number - 1) * self.chunk_size
+
+    def length(self, chunk_number):
+        return min(self.chunk_size, self.total_size - self.offset(chunk_number))
+
+
+def file_chunks(file_path, layout: ChunkLayout, chunk_numbers):
+    """the generator will read the local file and yield (<chunk_number>, <chunk_data>) pairs.
+
+    the chunk number start from 1 to follow the resumable_chunk_number. Only the chunks in
+    <chunk_numbers> will be read from disk.
+    """
+
+    with open(file_path, 'rb') as f:
+        for chunk_number in chunk_numbers:
+            f.seek(layout.offset(chunk_number))
+            yield chunk_number, f.read(layout.length(chunk_number))
+
+
+def mmap_chunks(file_path, layout: ChunkLayout, chunk_numbers):
+    """the generator will memory map the local file and yield (<chunk_number>, <memoryview>) pairs.
+
+    The chunk is a slice of the mapping so nothing is read into memory until the chunk is
+    sent. Only the chunks in <chunk_numbers> will be yield.
+    """
+
+    if layout.total_size == 0:
+        return
+
+    with open(file_path, 'rb') as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            for chunk_number in chunk_numbers:
+                start = layout.offset(chunk_number)
+                yield chunk_number, memoryview(mapping)[start : start + layout.length(chunk_number)]
+        finally:
+            try:
+                mapping.close()
+            except BufferError:
+                # the last chunks are still in flight. the mapping will be
+                # released with the last memoryview
+                pass
+
+
+def stream_chunks(stream, chunk_size):
+    """the generator will cut the stream into (<chunk_number>, <chunk_data>) pairs.
+
+    The stream can be a binary file-like object with `read` or any iterable of bytes
+    (eg. generator, subprocess stdout). The data is re-cut so each chunk has exactly
+    <chunk_size> bytes except the last one.
+    """
+
+    if hasattr(stream, 'read'):
+        blocks = iter(lambda: stream.read(chunk_size), b'')
+    else:
+        blocks = iter(stream)
+
+    buffer = bytearray()
+    chunk_number = 1
+    for block in blocks:
+        if not block:
+            continue
+
+        # the block can be used as it is if it is already the whole chunk
+        if not buffer and len(block) == chunk_size:
+            yield chunk_number, block
+            chunk_number += 1
+            continue
+
+        buffer += block
+        while len(buffer) >= chunk_size:
+            yield chunk_number, bytes(buffer[:chunk_size])
+            del buffer[:chunk_size]
+            chunk_number += 1
+
+    if buffer:
+        yield chunk_number, bytes(buffer)
+
+
+class ChunkUploader(BaseAPIClass):
+    @property
+    def chunk_upload_url(self):
+        return ConfigClass.chunk_upload_url
+
+    def __init__(self, api_client, concurrency=None, tuner=None):
+        """Function Summary: The helper class to upload the file chunks with a bounded worker pool. Each chunk
+        will carry its own `resumable_chunk_number` so the server can assemble them in order no matter which
+        request finish first.
+
+        Args:
+            api_client (PILOT): the client instance that initialize by password or token
+                based authentication
+            concurrency (int): the number of chunks uploading at the same time. if not specified
+                it will use the `upload_concurrency` of client
+            tuner (ChunkSizeTuner): the optional tuner to record the transfer time of each chunk
+
+        Examples:
+            >>> uploader = ChunkUploader(pilot_client, concurrency=8)
+            >>> uploader.upload(file_chunks(<file_path>, <layout>, <chunk_numbers>), <chunk_payload>, <headers>)
+        """
+
+        super().__init__(api_client)
+
+        if not concurrency:
+            concurrency = getattr(api_client, 'upload_concurrency', None) or ConfigClass.upload_concurrency
+        self.concurrency = max(1, int(concurrency))
+        self.tuner = tuner
+
+    def upload(self, chunks, chunk_payload: dict, headers: dict, on_ack=None) -> list:
+        """Function Summary: upload the chunks and return when every chunk is acknowledged by server. At most
+        two chunks per worker will be queued at the same time and each request body is streamed from the chunk
+        without copy.
+
+        Args:
+            chunks (iterable): the (<chunk_number>, <chunk_data>) pairs
+            chunk_payload (dict): the form payload shared by all chunks. the `resumable_chunk_number`
+                will be filled for each chunk
+            headers (dict): the headers for chunk request eg. `Session-ID`
+            on_ack (callable): the optional callback with the chunk number once the chunk is
+                acknowledged. It will be called from the worker threads
+
+        Returns:
+            list of chunk number acknowledged by server
+
+        Examples:
+            >>> acked = uploader.upload(<chunks>, <chunk_payload>, <headers>)
+        """
+
+        tasks = ((chunk_number, chunk, chunk_payload, on_ack) for chunk_number, chunk in chunks)
+        return sorted(self.upload_many(tasks, headers))
+
+    def upload_many(self, tasks, headers: dict) -> list:
+        """Function Summary: upload the chunks which might belong to different files on the same worker pool.
+        Each task carries its own form payload so the chunks of many files can be mixed in one pool.
+
+        Args:
+            tasks (iterable): the (<chunk_number>, <chunk_data>, <chunk_payload>, <on_ack>) tuples. the
+                <on_ack> can be None
+            headers (dict): the headers for chunk request eg. `Session-ID`
+
+        Returns:
+            list of chunk number acknowledged by server in the finishing order
+
+        Examples:
+            >>> tasks = [(1, <chunk1>, <payload1>, None), (1, <chunk2>, <payload2>, None)]
+            >>> uploader.upload_many(tasks, <headers>)
+        """
+
+        acked = []
+        pending = set()
+        max_pending = self.concurrency * 2
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            try:
+                for chunk_number, chunk, chunk_payload, on_ack in tasks:
+                    # wait for the slot before reading more chunk into memory
+                    if len(pending) >= max_pending:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        acked.extend([x.result() for x in done])
+
+                    future = executor.submit(self._upload_chunk, chunk_number, chunk, chunk_payload, headers, on_ack)
+                    pending.add(future)
+
+                done, pending = wait(pending)
+                acked.extend([x.result() for x in done])
+            except Exception as e:
+                # stop the queued chunks if any of chunk failed
+                for future in pending:
+                    future.cancel()
+                raise e
+
+        return acked
+
+    def _upload_chunk(self, chunk_number, chunk, chunk_payload, headers, on_ack=None):
+        """Function Summary: private function to upload single chunk.
+
+        Args:
+            chunk_number (int): the resumable_chunk_number of chunk start from 1
+            chunk (bytes or memoryview): the chunk data
+            chunk_payload (dict): the form payload shared by all chunks
+            headers (dict): the headers for chunk request
+            on_ack (callable): the optional callback once the chunk is acknowledged
+
+        Returns:
+            the chunk number
+        """
+
+        payload = dict(chunk_payload, resumable_chunk_number=chunk_number)
+        # stream the multipart body instead of building it in memory
+        body = MultipartBody(payload, 'chunk_data', chunk)
+
+        # the header will be updated in _send_request so each thread take a copy
+        chunk_headers = dict(headers, **{'Content-Type': body.content_type})
+        try:
+            start_time = time.monotonic()
+            self._send_request(self.chunk_upload_url, method='POST', data=body, headers=chunk_headers)
+            if self.tuner:
+                self.tuner.record(len(chunk), time.monotonic() - start_time)
+        finally:
+            body.close()
+            if isinstance(chunk, memoryview):
+                chunk.release()
+
+        if on_ack:
+            on_ack(chunk_number)
+
+        return chunk_number
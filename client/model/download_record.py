@@ -0,0 +1,140 @@
+import glob
+import json
+import os
+import threading
+import time
+
+from config import ConfigClass
+
+
+class DownloadRecord:
+    """the sidecar record of the `.part` file for the resumable download.
+
+    The record is saved as `<download_name>.part.json` next to the part file. It keeps
+    the hash_code of the prepared download so the retry can skip the pre download and
+    the ZIPPING wait, and the progress of the part file:
+        - bytes_received: the continuous bytes from the beginning(single stream)
+        - done_ranges: the start offset of finished ranges(multiple connections)
+
+    The progress is not written for every block. It is saved once `download_save_interval_bytes`
+    or `download_save_interval_seconds`(config) passed since the last save, and once more when
+    the download stops(finished or failed). So the record may fall behind the part file but
+    never runs ahead of it, and the retry only fetches the last bytes again.
+    """
+
+    PART_SUFFIX = '.part'
+    RECORD_SUFFIX = '.part.json'
+
+    def __init__(self, record_path, record: dict):
+        self.record_path = record_path
+        self.record = record
+
+        self._lock = threading.Lock()
+        # the progress since the last save
+        self._unsaved_bytes = 0
+        self._unsaved_ranges = False
+        self._saved_at = time.monotonic()
+
+    @classmethod
+    def create(cls, output_path, **kwargs):
+        """Function Summary: create the record for the download. The existing record will be overwritten.
+
+        Args:
+            output_path (string): the final path of the downloaded file
+            kwargs: the attributes saved in record eg. hash_code, source_geids
+
+        Returns:
+            DownloadRecord
+        """
+
+        record = dict(kwargs, output_path=output_path, total_size=None, bytes_received=0, done_ranges=[])
+        download_record = cls(output_path + cls.RECORD_SUFFIX, record)
+        download_record._save()
+
+        return download_record
+
+    @classmethod
+    def find(cls, folder, project_code, source_geids: list):
+        """Function Summary: find the record of unfinished download with the same project and geids.
+
+        Args:
+            folder (string): the folder to look for the records
+            project_code (string): project code
+            source_geids (list): the file geid from system
+
+        Returns:
+            DownloadRecord or None if not found
+        """
+
+        for record_path in glob.glob(os.path.join(glob.escape(folder), '*' + cls.RECORD_SUFFIX)):
+            try:
+                with open(record_path, 'r') as f:
+                    record = json.load(f)
+            except ValueError:
+                continue
+
+            if record.get('project_code') == project_code and record.get('source_geids') == sorted(source_geids):
+                return cls(record_path, record)
+
+        return None
+
+    @property
+    def part_path(self):
+        return self.record['output_path'] + self.PART_SUFFIX
+
+    def get(self, key, default=None):
+        return self.record.get(key, default)
+
+    def _save(self):
+        # write to temp file then replace to avoid the half written record
+        temp_path = self.record_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(self.record, f)
+        os.replace(temp_path, self.record_path)
+
+        self._unsaved_bytes = 0
+        self._unsaved_ranges = False
+        self._saved_at = time.monotonic()
+
+    def _due(self, nbytes):
+        self._unsaved_bytes += nbytes
+        return (
+            self._unsaved_bytes >= ConfigClass.download_save_interval_bytes
+            or time.monotonic() - self._saved_at >= ConfigClass.download_save_interval_seconds
+        )
+
+    def due(self, nbytes):
+        """count the <nbytes> written since the last save and return if the progress should be saved now."""
+
+        with self._lock:
+            return self._due(nbytes)
+
+    def update(self, **kwargs):
+        """update the attributes and save the record. it is safe to call from worker threads."""
+
+        with self._lock:
+            self.record.update(kwargs)
+            self._save()
+
+    def add_range(self, start, nbytes=0):
+        """record the range starting from <start> with <nbytes> is finished. it is saved on the interval
+        or by `flush`. it is safe to call from worker threads."""
+
+        with self._lock:
+            self.record['done_ranges'].append(start)
+            self._unsaved_ranges = True
+            if self._due(nbytes):
+                self._save()
+
+    def flush(self):
+        """save the finished ranges which are not saved yet."""
+
+        with self._lock:
+            if self._unsaved_ranges:
+                self._save()
+
+    def remove(self):
+        """remove the record after the part file is renamed to the final name."""
+
+        if os.path.exists(self.record_path):
+            os.remove(self.record_path)
@@ -0,0 +1,347 @@
+import json
+import os
+import posixpath
+import sqlite3
+import time
+
+from client.api.base_class import BaseAPIClass
+from client.api.dataset_files import DatasetFileApis
+from client.api.project_files import ProjectFilesApis
+from client.model.tree_walker import is_folder
+from config import ConfigClass
+
+
+class EntityIndex(BaseAPIClass):
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS entities (
+            geid TEXT PRIMARY KEY,
+            container_geid TEXT NOT NULL,
+            zone TEXT NOT NULL,
+            parent_geid TEXT,
+            path TEXT NOT NULL,
+            name TEXT,
+            extension TEXT,
+            size INTEGER,
+            is_folder INTEGER,
+            tags TEXT,
+            time_created,
+            time_lastmodified,
+            node TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_entities_container ON entities (container_geid, zone, path);
+        CREATE INDEX IF NOT EXISTS idx_entities_name ON entities (container_geid, zone, name);
+        CREATE INDEX IF NOT EXISTS idx_entities_extension ON entities (container_geid, zone, extension);
+        CREATE TABLE IF NOT EXISTS sync_state (
+            container_geid TEXT NOT NULL,
+            zone TEXT NOT NULL,
+            synced_at REAL,
+            full_synced_at REAL,
+            PRIMARY KEY (container_geid, zone)
+        );
+    '''
+
+    # the zone name of dataset entities in the index
+    DATASET_ZONE = 'Dataset'
+
+    def __init__(self, api_client, db_path=None):
+        """Function Summary: The local SQLite index of the entity tree of project or dataset. The tree is mirrored
+        with the listing apis. Each sync only writes the changed entities(modified time or path) and removes the
+        entities which are gone from server. The folders whose modified time and path did not change are not walked
+        into and their indexed children are kept as they are. Since it relies on server updating the
+        `time_lastmodified` of folder as its content changes, the whole tree is listed again if the last full
+        listing is older than `entity_index_full_sync_interval` in config. The queries are answered from the local
+        file without any request.
+
+        Args:
+            api_client (PILOT): the client instance that initialize by password or token
+                based authentication
+            db_path (string): the location of SQLite file. default is `entity_index_path` in config
+
+        Examples:
+            >>> index = EntityIndex(pilot_client)
+            >>> index.sync_project(<project_geid>, zone='Core')
+            >>> res = index.query(<project_geid>, zone='Core', path_prefix='admin/raw', extension='nii')
+        """
+
+        super().__init__(api_client)
+
+        self.db_path = db_path or ConfigClass.entity_index_path
+        if self.db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(self.SCHEMA)
+        # the index file created before the full sync time is recorded
+        columns = [row['name'] for row in self.conn.execute('PRAGMA table_info(sync_state)')]
+        if 'full_synced_at' not in columns:
+            self.conn.execute('ALTER TABLE sync_state ADD COLUMN full_synced_at REAL')
+
+    def sync_project(
+        self, project_geid, zone='Greenroom', concurrency=None, page_size=None, skip_unchanged_folders=None
+    ):
+        """Function Summary: mirror the entity tree of project zone into the index.
+
+        Args:
+            project_geid (string): unique identifier of project
+            zone (string): "Greenroom" or "Core"
+            concurrency (int): the number of listing requests at the same time. default is
+                `walk_concurrency` in config
+            page_size (int): page size of each listing request. default is `list_page_size` in config
+            skip_unchanged_folders (bool): do not list the folders with the same modified time and
+                path as last sync. False lists the whole tree. default is None which skips them unless
+                the last full listing is older than `entity_index_full_sync_interval` in config
+
+        Returns:
+            dict of the number of added, updated, removed and unchanged entities
+
+        Examples:
+            >>> index.sync_project(<project_geid>, zone='Greenroom')
+        """
+
+        project_files_apis = ProjectFilesApis(self.client)
+        project_files_apis.track_flag = self.track_flag
+        tree = project_files_apis.walk(project_geid, zone=zone, concurrency=concurrency, page_size=page_size)
+
+        return self._sync(project_geid, zone, tree, skip_unchanged_folders)
+
+    def sync_dataset(self, dataset_geid, concurrency=None, page_size=None, skip_unchanged_folders=None):
+        """Function Summary: mirror the entity tree of dataset into the index.
+
+        Args:
+            dataset_geid (string): unique identifier of dataset
+            concurrency (int): the number of listing requests at the same time. default is
+                `walk_concurrency` in config
+            page_size (int): page size of each listing request. default is `list_page_size` in config
+            skip_unchanged_folders (bool): do not list the folders with the same modified time and
+                path as last sync. False lists the whole tree. default is None which skips them unless
+                the last full listing is older than `entity_index_full_sync_interval` in config
+
+        Returns:
+            dict of the number of added, updated, removed and unchanged entities
+
+        Examples:
+            >>> index.sync_dataset(<dataset_geid>)
+        """
+
+        dataset_file_apis = DatasetFileApis(self.client)
+        dataset_file_apis.track_flag = self.track_flag
+        tree = dataset_file_apis.walk(dataset_geid, concurrency=concurrency, page_size=page_size)
+
+        return self._sync(dataset_geid, self.DATASET_ZONE, tree, skip_unchanged_folders)
+
+    def _sync(self, container_geid, zone, tree, skip_unchanged_folders=None):
+        """Function Summary: private function to write the walked tree into the index.
+
+        Args:
+            container_geid (string): the geid of project or dataset
+            zone (string): the zone of entities
+            tree (iterator): the (path, folders, files) from walk
+            skip_unchanged_folders (bool): remove the unchanged folders from the walk and keep
+                their indexed children. None means to skip unless the full listing is due
+
+        Returns:
+            dict of the number of added, updated, removed and unchanged entities
+        """
+
+        full_synced_at = self._full_synced_at(container_geid, zone)
+        if skip_unchanged_folders is None:
+            skip_unchanged_folders = (
+                full_synced_at is not None
+                and time.time() - full_synced_at < ConfigClass.entity_index_full_sync_interval
+            )
+
+        existing = {
+            row['geid']: (row['path'], row['time_lastmodified'])
+            for row in self.conn.execute(
+                'SELECT geid, path, time_lastmodified FROM entities WHERE container_geid = ? AND zone = ?',
+                (container_geid, zone),
+            )
+        }
+
+        stats = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0}
+        # the folder geid of each walked path to find the parent of the listing
+        folder_geids = {'': container_geid}
+        seen = set()
+
+        try:
+            for path, folders, files in tree:
+                parent_geid = folder_geids.get(path)
+                rows, skipped = [], []
+                for node in folders + files:
+                    geid = node.get('global_entity_id')
+                    node_path = posixpath.join(path, node.get('name', ''))
+                    seen.add(geid)
+                    if is_folder(node):
+                        folder_geids[node_path] = geid
+
+                    if geid in existing:
+                        if existing[geid] == (node_path, node.get('time_lastmodified')):
+                            stats['unchanged'] += 1
+                            if skip_unchanged_folders and is_folder(node):
+                                skipped.append((node, node_path))
+                            continue
+                        stats['updated'] += 1
+                    else:
+                        stats['added'] += 1
+                    rows.append(self._row(container_geid, zone, parent_geid, node_path, node))
+
+                self.conn.executemany('INSERT OR REPLACE INTO entities VALUES (%s)' % ', '.join(['?'] * 13), rows)
+
+                # like os.walk, the folders removed from the list are not walked into
+                for node, node_path in skipped:
+                    folders.remove(node)
+                    children = self._indexed_children(container_geid, zone, node_path)
+                    seen.update(children)
+                    stats['unchanged'] += len(children)
+
+            # only remove the entities after the whole tree is walked without error
+            removed = [(x,) for x in existing if x not in seen]
+            self.conn.executemany('DELETE FROM entities WHERE geid = ?', removed)
+            stats['removed'] = len(removed)
+
+            now = time.time()
+            if not skip_unchanged_folders:
+                full_synced_at = now
+            self.conn.execute(
+                'INSERT OR REPLACE INTO sync_state (container_geid, zone, synced_at, full_synced_at) '
+                'VALUES (?, ?, ?, ?)',
+                (container_geid, zone, now, full_synced_at),
+            )
+            self.conn.commit()
+        except Exception as e:
+            # keep the index as the last successful sync
+            self.conn.rollback()
+            raise e
+
+        return stats
+
+    def _indexed_children(self, container_geid, zone, folder_path):
+        """return the geids of all the indexed entities under <folder_path>."""
+
+        # the paths between "<folder>/" and "<folder>0" are the ones under the folder
+        rows = self.conn.execute(
+            'SELECT geid FROM entities WHERE container_geid = ? AND zone = ? AND path > ? AND path < ?',
+            (container_geid, zone, folder_path + '/', folder_path + '0'),
+        )
+        return [row['geid'] for row in rows]
+
+    @staticmethod
+    def _row(container_geid, zone, parent_geid, path, node):
+        name = node.get('name', '')
+        extension = name.rsplit('.', 1)[-1].lower() if '.' in name and not is_folder(node) else None
+        return (
+            node.get('global_entity_id'),
+            container_geid,
+            zone,
+            parent_geid,
+            path,
+            name,
+            extension,
+            node.get('file_size'),
+            int(is_folder(node)),
+            json.dumps(node.get('tags', [])),
+            node.get('time_created'),
+            node.get('time_lastmodified'),
+            json.dumps(node),
+        )
+
+    def _full_synced_at(self, container_geid, zone):
+        """return the timestamp of last sync which listed the whole tree. None if never."""
+
+        row = self.conn.execute(
+            'SELECT full_synced_at FROM sync_state WHERE container_geid = ? AND zone = ?', (container_geid, zone)
+        ).fetchone()
+
+        return row['full_synced_at'] if row else None
+
+    def last_synced(self, container_geid, zone='Greenroom'):
+        """return the timestamp of last sync of project zone or dataset(zone is `DATASET_ZONE`). None if never."""
+
+        row = self.conn.execute(
+            'SELECT synced_at FROM sync_state WHERE container_geid = ? AND zone = ?', (container_geid, zone)
+        ).fetchone()
+
+        return row['synced_at'] if row else None
+
+    def query(
+        self,
+        container_geid,
+        zone='Greenroom',
+        path_prefix=None,
+        name_pattern=None,
+        extension=None,
+        min_size=None,
+        max_size=None,
+        modified_after=None,
+        modified_before=None,
+        tag=None,
+        folder=None,
+        limit=None,
+    ):
+        """Function Summary: query the entities from the local index. All the conditions are combined with AND.
+
+        Args:
+            container_geid (string): the geid of project or dataset
+            zone (string): "Greenroom" or "Core" for project. `EntityIndex.DATASET_ZONE` for dataset
+            path_prefix (string): the entities under the folder path eg. "admin/raw"
+            name_pattern (string): the glob pattern of name eg. "*.nii.gz"
+            extension (string): the file extension without dot eg. "csv"
+            min_size (int): the min file size in bytes
+            max_size (int): the max file size in bytes
+            modified_after (int or string): the entities modified after the time. it should be the
+                same format as `time_lastmodified` of entity
+            modified_before (int or string): the entities modified before the time
+            tag (string): the entities with the tag
+            folder (bool): True for only folders, False for only files. None for both
+            limit (int): the max number of result
+
+        Returns:
+            list of the entity nodes
+
+        Examples:
+            >>> index.query(<project_geid>, name_pattern='sub-*', extension='nii', min_size=1024 * 1024)
+        """
+
+        conditions = ['container_geid = ?', 'zone = ?']
+        args = [container_geid, zone]
+        if path_prefix:
+            path_prefix = path_prefix.strip('/')
+            conditions.append('(path = ? OR substr(path, 1, ?) = ?)')
+            args.extend([path_prefix, len(path_prefix) + 1, path_prefix + '/'])
+        if name_pattern:
+            conditions.append('name GLOB ?')
+            args.append(name_pattern)
+        if extension:
+            conditions.append('extension = ?')
+            args.append(extension.lstrip('.').lower())
+        if min_size is not None:
+            conditions.append('size >= ?')
+            args.append(min_size)
+        if max_size is not None:
+            conditions.append('size <= ?')
+            args.append(max_size)
+        if modified_after is not None:
+            conditions.append('time_lastmodified > ?')
+            args.append(modified_after)
+        if modified_before is not None:
+            conditions.append('time_lastmodified < ?')
+            args.append(modified_before)
+        if tag:
+            conditions.append('EXISTS (SELECT 1 FROM json_each(entities.tags) WHERE json_each.value = ?)')
+            args.append(tag)
+        if folder is not None:
+            conditions.append('is_folder = ?')
+            args.append(int(folder))
+
+        sql = 'SELECT node FROM entities WHERE %s ORDER BY path' % ' AND '.join(conditions)
+        if limit:
+            sql += ' LIMIT %d' % int(limit)
+
+        return [json.loads(row['node']) for row in self.conn.execute(sql, args)]
+
+    def close(self):
+        """close the SQLite connection."""
+
+        self.conn.close()
@@ -7,9 +7,12 @@ from config import ConfigClass
 
 class ProjectFileTaskManager(BaseAPIClass):
 
-    project_file_task_url = ConfigClass.project_file_task_url
     label = 'Container'
 
+    @property
+    def project_file_task_url(self):
+        return ConfigClass.project_file_task_url
+
     def check_status(self, action, project_code, session_id, job_id='*'):
 
         query_params = {
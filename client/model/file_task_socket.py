@@ -1,24 +1,24 @@
-import time
+import threading
 
-import socketio
+from client.exceptions import DatasetTaskTimeoutError
+from config import ConfigClass
+
+
+def dataset_wait_timeout(count):
+    """return the seconds to wait for the dataset file operation of <count> files."""
+
+    return ConfigClass.dataset_wait_timeout + ConfigClass.dataset_wait_timeout_per_file * count
 
 
 # since dataset is using the socketio to recieve
-# so here it will start a socket client to wait for msg
+# so here it will register on the notification hub of client to wait for msg
 class DatasetFileTaskManager(object):
-    # default waiting time 20s for the wait
-    DEFAULT_WAIT_TIME = 20
 
     # initialization
     source_geid = None
 
-    def connect_handler(self):
-        # print('Connected!')
-        pass
-
     def set_notification(self, data):
 
-        # print(data)
         # we might recieve other unrelated message(in case later the dataset is shared
         # or multiple scripts are running). the checking condition is:
         # 1. status is FINISH
@@ -28,53 +28,87 @@ class DatasetFileTaskManager(object):
         # then we will try to pop the key out to say job done
         # if the key not exist then nothing happened
         source_geid = data['payload']['source']['global_entity_id']
-        # print(self.source_map)
-        # print(source_geid, self.source_map.get(source_geid))
-        # print(data['payload']['session_id'], self.session_id)
-        # print(data['payload']['status'])
-        # print(data['payload']['action'], self.action)
-        # print()
         if (
             data['payload']['session_id'] == self.session_id
             and data['payload']['status'] == 'FINISH'
             and data['payload']['action'] == self.action
-            and self.source_map.get(source_geid)
         ):
+            with self._lock:
+                # the job finished before the request returns the geids
+                if self.source_map is None:
+                    self._early_msg.append(data)
+                elif self.source_map.get(source_geid):
+                    self.file_notification_msg.append(data)
+                    self.source_map.pop(source_geid)
 
-            self.file_notification_msg.append(data)
-            self.source_map.pop(source_geid)
-            # print(source_geid)
+                    # wake up the waiter as soon as the last job is done
+                    if not self.source_map:
+                        self._finished.set()
 
     ########################################################################################
 
-    def __init__(self, socketio_endpoint, dataset_geid, source_geids: list, action, session_id):
-        self.namespace = '/' + dataset_geid
-        # since we might have batch operation so make a dict
-        # to keep track if all job are finished
-        self.source_map = {x: 1 for x in source_geids}
+    def __init__(self, hub, dataset_geid, action, session_id):
+        self.hub = hub
+        self.dataset_geid = dataset_geid
+        # the source geids are only known after the request. set by `set_sources`
+        self.source_map = None
         self.action = action
         self.session_id = session_id
         self.file_notification_msg = []
-        self.sio = socketio.Client()
-
-        # open the event
-        self.sio.on('connect', self.connect_handler, namespace=self.namespace)
-        self.sio.on('DATASET_FILE_NOTIFICATION', self.set_notification, namespace=self.namespace)
-        # connect to socket server
-        self.sio.connect(socketio_endpoint, namespaces=[self.namespace])
-
-    def wait_response(self):
-        # we set the timeout for this waiting
-        for _ in range(self.DEFAULT_WAIT_TIME):
-            # here if we have all job done then exit
-            if len(self.source_map) == 0:
-                self._disconnect()
-                return self.file_notification_msg
-            time.sleep(1)
-
-        # raise the error if we timeout
-        self._disconnect()
-        raise Exception('TIMEOUT FOR SOCKETIO, Job %s are not finished' % (str(self.source_map)))
-
-    def _disconnect(self):
-        self.sio.disconnect()
+        self._early_msg = []
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+
+        # listen before the request is sent
+        self.hub.add_waiter(dataset_geid, session_id, action, self)
+
+    def set_sources(self, source_geids: list):
+        """set the geids to wait and apply the notifications received before."""
+
+        with self._lock:
+            # since we might have batch operation so make a dict
+            # to keep track if all job are finished
+            self.source_map = {x: 1 for x in source_geids}
+            early_msg, self._early_msg = self._early_msg, []
+            if not self.source_map:
+                self._finished.set()
+
+        for data in early_msg:
+            self.set_notification(data)
+
+    def wait_response(self, timeout=None):
+        """Function Summary: block until all the jobs are notified.
+
+        Args:
+            timeout (float): the max seconds to wait. default is scaled by the number of files
+                (see `dataset_wait_timeout` in config)
+
+        Returns:
+            list of notification message
+
+        Raises:
+            DatasetTaskTimeoutError with the pending geids and the received messages
+        """
+
+        if timeout is None:
+            timeout = dataset_wait_timeout(len(self.source_map))
+
+        finished = self._finished.wait(timeout)
+        self.close()
+        if not finished:
+            # raise the error if we timeout. the jobs might still finish on server
+            with self._lock:
+                pending = list(self.source_map)
+                partial = list(self.file_notification_msg)
+            raise DatasetTaskTimeoutError(
+                'Timeout after %s seconds for socketio, Job %s are not finished' % (timeout, str(pending)),
+                pending,
+                partial,
+            )
+
+        return self.file_notification_msg
+
+    def close(self):
+        """stop receiving the notifications. the connection of hub is kept for other operations."""
+
+        self.hub.remove_waiter(self.dataset_geid, self.session_id, self.action, self)
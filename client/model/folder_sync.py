@@ -0,0 +1,85 @@
+import os
+import posixpath
+
+from client.model.checksum import file_md5
+
+
+def local_tree(source_folder_path):
+    """Function Summary: list the files and folders under the local folder by the relative path.
+
+    Args:
+        source_folder_path (string): the folder path on the local file system
+
+    Returns:
+        (files, folders). files is the dict of <relative_path>: (<local_path>, <size>) and
+        folders is the set of relative folder path. the relative path is separated by "/"
+    """
+
+    files, folders = {}, set()
+    for root, dirs, names in os.walk(source_folder_path):
+        relative_folder = os.path.relpath(root, source_folder_path)
+        relative_folder = '' if relative_folder == '.' else relative_folder.replace(os.sep, '/')
+
+        for name in dirs:
+            folders.add(posixpath.join(relative_folder, name))
+        for name in names:
+            local_path = os.path.join(root, name)
+            files[posixpath.join(relative_folder, name)] = (local_path, os.path.getsize(local_path))
+
+    return files, folders
+
+
+class FolderSyncPlan:
+    """the difference between the local folder and the project folder.
+
+    - upload: the relative paths of local files which are not in project
+    - update: the relative paths of local files which are different from the project ones.
+        the remote node is kept in `remote_files`
+    - delete: the (relative_path, node) of remote files or folders which are not in local folder
+    - unchanged: the relative paths of files which are same on both sides
+    """
+
+    # the checksum attribute of remote node if the server records it
+    CHECKSUM_FIELD = 'md5'
+
+    def __init__(self, local_files, remote_files, extra_folders, checksum=False, hash_file=file_md5):
+        self.local_files = local_files
+        self.remote_files = remote_files
+        # the function to get the md5 of local file eg. `HashCache.md5`
+        self.hash_file = hash_file
+        self.upload, self.update, self.unchanged = [], [], []
+
+        for relative_path in sorted(local_files):
+            local_path, size = local_files[relative_path]
+            node = remote_files.get(relative_path)
+            if node is None:
+                self.upload.append(relative_path)
+            elif self._changed(local_path, size, node, checksum):
+                self.update.append(relative_path)
+            else:
+                self.unchanged.append(relative_path)
+
+        # the files under the extra folders are removed with the folder
+        extra_files = [(x, remote_files[x]) for x in remote_files if x not in local_files]
+        self.delete = sorted(list(extra_folders) + extra_files, key=lambda x: x[0])
+
+    def _changed(self, local_path, size, node, checksum):
+        if node.get('file_size') != size:
+            return True
+
+        # only compare the checksum where the server has it
+        remote_checksum = node.get(self.CHECKSUM_FIELD)
+        if checksum and remote_checksum:
+            return self.hash_file(local_path) != remote_checksum
+
+        return False
+
+    def summary(self):
+        """return the dict report of plan."""
+
+        return {
+            'upload': list(self.upload),
+            'update': list(self.update),
+            'delete': [x[0] for x in self.delete],
+            'unchanged': len(self.unchanged),
+        }
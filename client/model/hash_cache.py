@@ -0,0 +1,96 @@
+import os
+import sqlite3
+import threading
+
+from client.model.checksum import file_md5
+from config import ConfigClass
+
+
+class HashCache:
+    """the local cache of file md5 keyed by the path, size and modified time.
+
+    The unchanged local files are not hashed again across the runs. The entry is only
+    used when the size and mtime of file are the same as the time it is hashed.
+
+    Examples:
+        >>> with HashCache() as hash_cache:
+        >>>     md5 = hash_cache.md5(<local_file_path>)
+    """
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS hashes (
+            path TEXT PRIMARY KEY,
+            size INTEGER,
+            mtime_ns INTEGER,
+            md5 TEXT
+        );
+    '''
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or ConfigClass.hash_cache_path
+        if self.db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+
+        # the cache might be shared by the upload threads
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.executescript(self.SCHEMA)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def signature(file_path):
+        """return the (absolute path, size, mtime_ns) of the local file."""
+
+        stat = os.stat(file_path)
+        return os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns
+
+    def get(self, file_path):
+        """return the cached md5 of file. None if it is not cached or the file is changed."""
+
+        path, size, mtime_ns = self.signature(file_path)
+        with self._lock:
+            row = self.conn.execute('SELECT size, mtime_ns, md5 FROM hashes WHERE path = ?', (path,)).fetchone()
+
+        if row and row[0] == size and row[1] == mtime_ns:
+            return row[2]
+        return None
+
+    def put(self, file_path, md5, signature=None):
+        """Function Summary: save the md5 of file.
+
+        Args:
+            file_path (string): the local file path
+            md5 (string): the hex md5 digest
+            signature (tuple): the (path, size, mtime_ns) taken before the file is hashed. default
+                is the current one
+
+        Returns:
+            None
+        """
+
+        signature = signature or self.signature(file_path)
+        with self._lock:
+            self.conn.execute('INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?)', tuple(signature) + (md5,))
+            self.conn.commit()
+
+    def md5(self, file_path):
+        """return the md5 of file from the cache, or hash the file and cache it."""
+
+        md5 = self.get(file_path)
+        if md5 is None:
+            # take the signature first so the change during hashing is not cached
+            signature = self.signature(file_path)
+            md5 = file_md5(file_path)
+            self.put(file_path, md5, signature)
+
+        return md5
+
+    def close(self):
+        """close the SQLite connection."""
+
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
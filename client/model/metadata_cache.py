@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import OrderedDict
+
+from config import ConfigClass
+
+
+class MetadataCache:
+    """the in memory TTL/LRU cache for the metadata lookups (eg. project by geid/code).
+
+    The cache is kept on the client so it is shared by all the api classes bound to
+    the client. Each entry expires <ttl> seconds after it is set, and the least
+    recently used entry is evicted when there are more than <maxsize> entries. It is
+    safe to use from multiple threads.
+    """
+
+    def __init__(self, maxsize=None, ttl=None):
+        self.maxsize = ConfigClass.metadata_cache_size if maxsize is None else maxsize
+        self.ttl = ConfigClass.metadata_cache_ttl if ttl is None else ttl
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """return the cached value of <key> or <default> if it is not cached or expired."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+
+            value, expire_at = entry
+            if expire_at <= time.monotonic():
+                del self._entries[key]
+                return default
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """cache the <value> of <key>. nothing will be cached if the maxsize or ttl is 0."""
+
+        if not self.maxsize or self.ttl <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, key, loader):
+        """Function Summary: return the cached value of <key>. If it is not cached, the <loader> is called and
+        the result is cached.
+
+        Args:
+            key (hashable): the cache key eg. ('project', <geid>)
+            loader (callable): the function without argument to fetch the value
+
+        Returns:
+            the cached or loaded value
+
+        Examples:
+            >>> cache.get_or_load(('project', geid), lambda: api.get_project_by_geid(geid, use_cache=False))
+        """
+
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = loader()
+            # only the found entity is cached
+            if value:
+                self.set(key, value)
+
+        return value
+
+    def invalidate(self, key=None):
+        """Function Summary: remove the <key> from cache. If <key> is None, the whole cache is cleared.
+
+        Args:
+            key (hashable): the cache key or None for all the keys
+
+        Examples:
+            >>> pilot_client.metadata_cache.invalidate(('project', <project_geid>))
+            >>> pilot_client.metadata_cache.invalidate()
+        """
+
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,84 @@
+import uuid
+
+
+class MultipartBody:
+    """the file-like multipart/form-data body for the chunk upload.
+
+    The chunk data is kept as a memoryview and read block by block while the body is
+    streamed, so the chunk is never copied into a complete request body in memory. The
+    form fields are encoded in the same way as `requests` does for `data` + `files`
+    (None value is skipped and list value is sent as repeated field).
+    """
+
+    def __init__(self, fields: dict, file_field: str, file_data, filename=None):
+        self.boundary = uuid.uuid4().hex
+
+        head = b''
+        for name, value in fields.items():
+            values = value if isinstance(value, (list, tuple)) else [value]
+            for v in values:
+                if v is None:
+                    continue
+                head += ('--%s\r\nContent-Disposition: form-data; name="%s"\r\n\r\n' % (self.boundary, name)).encode()
+                head += str(v).encode() + b'\r\n'
+
+        head += (
+            '--%s\r\nContent-Disposition: form-data; name="%s"; filename="%s"\r\n\r\n'
+            % (self.boundary, file_field, filename or file_field)
+        ).encode()
+        tail = ('\r\n--%s--\r\n' % self.boundary).encode()
+
+        self._parts = [memoryview(head), memoryview(file_data).cast('B'), memoryview(tail)]
+        self._length = sum([len(x) for x in self._parts])
+        self._position = 0
+
+    @property
+    def content_type(self):
+        return 'multipart/form-data; boundary=%s' % self.boundary
+
+    def __len__(self):
+        return self._length
+
+    def __bool__(self):
+        return True
+
+    def read(self, size=-1):
+        """read at most <size> bytes from the current position. Only the returned block is copied."""
+
+        if size is None or size < 0:
+            size = self._length - self._position
+
+        blocks = []
+        offset = 0
+        for part in self._parts:
+            start = self._position - offset
+            offset += len(part)
+            if size <= 0 or start >= len(part):
+                continue
+
+            block = part[max(start, 0) : max(start, 0) + size]
+            blocks.append(bytes(block))
+            self._position += len(block)
+            size -= len(block)
+
+        return b''.join(blocks)
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=0):
+        """rewind the body so the same chunk can be sent again(eg. retry)."""
+
+        if whence == 1:
+            offset += self._position
+        elif whence == 2:
+            offset += self._length
+        self._position = min(max(offset, 0), self._length)
+
+        return self._position
+
+    def close(self):
+        """release the memoryview so the underlying mmap can be closed."""
+
+        for part in self._parts:
+            part.release()
@@ -0,0 +1,108 @@
+import threading
+
+
+class NotificationHub:
+    """the long-lived socketio connections to receive the dataset file notifications.
+
+    The hub keeps one connection per dataset namespace for the client and opens it on the
+    first use of dataset. Since the socketio client can only give the namespaces at connect,
+    each namespace has its own connection, so subscribing a new dataset never drops the
+    notifications of the datasets already waited. The `DATASET_FILE_NOTIFICATION` events
+    are routed to the waiters registered by (dataset, session_id, action), then the waiter
+    checks the geid. The lost connection is reconnected automatically by the socketio client.
+
+    Examples:
+        >>> hub = pilot_client.notification_hub
+        >>> hub.subscribe(<dataset_geid>)
+    """
+
+    EVENT = 'DATASET_FILE_NOTIFICATION'
+
+    def __init__(self, socketio_endpoint):
+        self.socketio_endpoint = socketio_endpoint
+        # the socketio client of each namespace
+        self.connections = {}
+
+        self._waiters = {}
+        self._lock = threading.Lock()
+        self._connect_lock = threading.Lock()
+
+    def subscribe(self, dataset_geid):
+        """Function Summary: make sure the hub is connected and listens to the dataset namespace.
+
+        Args:
+            dataset_geid (string): unique identifier of dataset
+
+        Returns:
+            None
+        """
+
+        # socketio(with aiohttp) is slow to import. it is only loaded when the hub is used
+        import socketio
+
+        namespace = '/' + dataset_geid
+        with self._connect_lock:
+            sio = self.connections.get(namespace)
+            if sio is not None and sio.connected:
+                return
+
+            if sio is None:
+                sio = socketio.Client(reconnection=True)
+                sio.on(self.EVENT, self._handler(namespace), namespace=namespace)
+                self.connections[namespace] = sio
+
+            # the other namespaces keep their connections
+            sio.connect(self.socketio_endpoint, namespaces=[namespace])
+
+    def _handler(self, namespace):
+        def on_notification(data):
+            self.dispatch(namespace, data)
+
+        return on_notification
+
+    def dispatch(self, namespace, data):
+        """route the notification to the waiters of same dataset, session and action."""
+
+        payload = data.get('payload', {})
+        with self._lock:
+            waiters = list(self._waiters.get((namespace, payload.get('session_id'), payload.get('action')), []))
+
+        for waiter in waiters:
+            waiter.set_notification(data)
+
+    def add_waiter(self, dataset_geid, session_id, action, waiter):
+        """Function Summary: register the waiter for the notifications of the session. The waiter should be
+        registered before the request is sent, so the fast jobs are not missed.
+
+        Args:
+            dataset_geid (string): unique identifier of dataset
+            session_id (string): the session id of request
+            action (string): the action of job eg. dataset_file_import
+            waiter (object): the object with `set_notification(data)`
+
+        Returns:
+            None
+        """
+
+        self.subscribe(dataset_geid)
+        with self._lock:
+            self._waiters.setdefault(('/' + dataset_geid, session_id, action), []).append(waiter)
+
+    def remove_waiter(self, dataset_geid, session_id, action, waiter):
+        key = ('/' + dataset_geid, session_id, action)
+        with self._lock:
+            waiters = self._waiters.get(key, [])
+            if waiter in waiters:
+                waiters.remove(waiter)
+            if not waiters:
+                self._waiters.pop(key, None)
+
+    def close(self):
+        """disconnect all the namespaces from the socketio server."""
+
+        with self._connect_lock:
+            connections, self.connections = self.connections, {}
+
+        for sio in connections.values():
+            if sio.connected:
+                sio.disconnect()
@@ -0,0 +1,56 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from config import ConfigClass
+
+
+class PageIterator:
+    """the iterator to yield the items of list api across all the pages.
+
+    The <fetch_page> is called with the page number(start from 0) and returns the list of
+    items in that page. While the caller is consuming page N, the next <prefetch> pages are
+    already requested in the background threads. The iteration stops at the first page
+    which has less than <page_size> items.
+
+    Examples:
+        >>> pages = PageIterator(lambda page: PA.list_projects(page=page, page_size=100), 100)
+        >>> for project in pages:
+        >>>     print(project)
+    """
+
+    def __init__(self, fetch_page, page_size=None, prefetch=None, start_page=0):
+        self.fetch_page = fetch_page
+        self.page_size = page_size or ConfigClass.list_page_size
+        self.prefetch = ConfigClass.list_prefetch_pages if prefetch is None else max(0, int(prefetch))
+        self.start_page = start_page
+
+    def __iter__(self):
+        # without prefetch just request the page one by one
+        if not self.prefetch:
+            page = self.start_page
+            while 1:
+                items = self.fetch_page(page)
+                yield from items
+                if len(items) < self.page_size:
+                    return
+                page += 1
+
+        pending = deque()
+        next_page = self.start_page
+        with ThreadPoolExecutor(max_workers=self.prefetch) as executor:
+            try:
+                while 1:
+                    # keep current page and <prefetch> pages after it in flight
+                    while len(pending) < self.prefetch + 1:
+                        pending.append(executor.submit(self.fetch_page, next_page))
+                        next_page += 1
+
+                    items = pending.popleft().result()
+                    yield from items
+                    if len(items) < self.page_size:
+                        return
+            finally:
+                # the pages after the last one are not needed. also stop them
+                # if the caller break the loop early
+                for future in pending:
+                    future.cancel()
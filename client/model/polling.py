@@ -0,0 +1,101 @@
+import random
+import time
+
+from client.exceptions import TaskTimeoutError
+from config import ConfigClass
+
+
+class PollingStrategy:
+    """the shared strategy to poll the status of long running task.
+
+    The first check is sent right away, then the interval between the checks starts
+    from <initial_interval> and is multiplied by <backoff_factor> up to <max_interval>.
+    Each interval is randomized by +-<jitter>(fraction of interval) so the scripts
+    started together do not poll in lockstep. If the task is not done within <timeout>
+    seconds, the TaskTimeoutError is raised. The timeout 0 or None means no deadline.
+
+    Examples:
+        >>> polling = PollingStrategy(initial_interval=1, max_interval=30, timeout=600)
+        >>> pilot_client = PILOT(endpoint, user, pass, polling=polling)
+    """
+
+    def __init__(self, initial_interval=None, backoff_factor=None, max_interval=None, jitter=None, timeout=None):
+        self.initial_interval = ConfigClass.poll_initial_interval if initial_interval is None else initial_interval
+        self.backoff_factor = ConfigClass.poll_backoff_factor if backoff_factor is None else backoff_factor
+        self.max_interval = ConfigClass.poll_max_interval if max_interval is None else max_interval
+        self.jitter = ConfigClass.poll_jitter if jitter is None else jitter
+        self.timeout = ConfigClass.poll_timeout if timeout is None else timeout
+
+    def intervals(self):
+        """return the iterator of the sleep seconds between the checks. it stops when the deadline is reached.
+        the deadline is counted from this call."""
+
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+        return self._intervals(deadline)
+
+    def _intervals(self, deadline):
+        interval = self.initial_interval
+        while 1:
+            delay = interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                delay = min(delay, remaining)
+
+            yield max(delay, 0)
+            interval = min(interval * self.backoff_factor, self.max_interval)
+
+    def poll(self, check, is_done, description='task'):
+        """Function Summary: call <check> until <is_done> returns true for its result.
+
+        Args:
+            check (callable): the function without argument to fetch the status
+            is_done (callable): the function takes the status and returns if the task is finished
+            description (string): the task name in the timeout message
+
+        Returns:
+            the last status returned by <check>
+
+        Examples:
+            >>> polling.poll(lambda: api.check_status(...), lambda x: x.get('status') != 'RUNNING')
+        """
+
+        intervals = self.intervals()
+        status = check()
+        for delay in intervals:
+            if is_done(status):
+                return status
+            time.sleep(delay)
+            status = check()
+
+        if is_done(status):
+            return status
+        raise TaskTimeoutError('Timeout after %s seconds waiting for %s' % (self.timeout, description), status)
+
+    async def async_poll(self, check, is_done, description='task'):
+        """Function Summary: the async version of `poll`. The <check> is the coroutine function.
+
+        Args:
+            check (callable): the coroutine function without argument to fetch the status
+            is_done (callable): the function takes the status and returns if the task is finished
+            description (string): the task name in the timeout message
+
+        Returns:
+            the last status returned by <check>
+        """
+
+        # asyncio is only needed by the async client
+        import asyncio
+
+        intervals = self.intervals()
+        status = await check()
+        for delay in intervals:
+            if is_done(status):
+                return status
+            await asyncio.sleep(delay)
+            status = await check()
+
+        if is_done(status):
+            return status
+        raise TaskTimeoutError('Timeout after %s seconds waiting for %s' % (self.timeout, description), status)
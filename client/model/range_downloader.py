@@ -0,0 +1,222 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from client.api.base_class import BaseAPIClass
+from client.model.checksum import header_digests
+from config import ConfigClass
+
+
+class RangeDownloader(BaseAPIClass):
+
+    # the size of each read from the response stream
+    BLOCK_SIZE = 1024 * 1024
+
+    def __init__(self, api_client, concurrency=None, range_size=None):
+        """Function Summary: The helper class to download the file with several connections. The file is split into
+        byte ranges and each range is fetched with HTTP Range request into the preallocated local file. If the
+        server does not support Range, it will fall back to the single stream.
+
+        Args:
+            api_client (PILOT): the client instance that initialize by password or token
+                based authentication
+            concurrency (int): the number of ranges downloading at the same time. default is
+                `download_concurrency` in config
+            range_size (int): the bytes of each range. default is `download_range_size` in config
+
+        Examples:
+            >>> downloader = RangeDownloader(pilot_client, concurrency=8)
+            >>> downloader.download(<download_url>, <local_file_path>)
+        """
+
+        super().__init__(api_client)
+
+        self.concurrency = max(1, int(concurrency or ConfigClass.download_concurrency))
+        self.range_size = range_size or ConfigClass.download_range_size
+        # the checksum of whole file from the response headers if server provides it
+        self.expected_digests = {}
+
+    def probe(self, download_url):
+        """Function Summary: check if the download endpoint supports Range by requesting the first byte.
+
+        Args:
+            download_url (string): the relative path of download api
+
+        Returns:
+            (response, total_size). the total_size is None if Range is not supported, then the
+            response is the full file stream which can be consumed directly
+        """
+
+        r = self._send_request(download_url, method='GET', headers={'Range': 'bytes=0-0'}, stream=True)
+        r.raise_for_status()
+
+        # the Content-Range is like "bytes 0-0/12345"
+        content_range = r.headers.get('Content-Range', '')
+        if r.status_code == 206 and '/' in content_range:
+            total_size = content_range.rsplit('/', 1)[-1]
+            if total_size.isdigit():
+                return r, int(total_size)
+
+        return r, None
+
+    def download(self, download_url, output_path, record=None, checksum=None):
+        """Function Summary: download the file to <output_path>. If the record is given, the progress will be saved
+        in the record and the download will continue from the bytes or ranges already in the record.
+
+        Args:
+            download_url (string): the relative path of download api
+            output_path (string): the local file path
+            record (DownloadRecord): the optional sidecar record of <output_path>
+            checksum (StreamingChecksum): the optional checksum fed with the data as it is written.
+                for the ranges, each range is hashed in order right after it is written
+
+        Returns:
+            the total size of file. None if server does not tell the size
+
+        Examples:
+            >>> downloader.download(<download_url>, <local_file_path>)
+        """
+
+        r, total_size = self.probe(download_url)
+        self.expected_digests = header_digests(r.headers, partial=total_size is not None)
+
+        # without Range the whole file has to be downloaded again
+        if total_size is None:
+            if record:
+                record.update(total_size=None, bytes_received=0, done_ranges=[])
+            content_length = r.headers.get('Content-Length')
+            received = self._download_stream(r, output_path, 0, record, checksum)
+            if content_length and content_length.isdigit() and received != int(content_length):
+                raise IOError('Download is incomplete, received %s of %s bytes' % (received, content_length))
+            return int(content_length) if content_length and content_length.isdigit() else None
+
+        r.close()
+
+        # continue only if the record is for the same file and the same way of download
+        single_stream = self.concurrency == 1 or total_size <= self.range_size
+        if record and (
+            record.get('total_size') != total_size
+            or record.get('single_stream') != single_stream
+            or not os.path.exists(output_path)
+        ):
+            record.update(
+                total_size=total_size,
+                single_stream=single_stream,
+                range_size=self.range_size,
+                bytes_received=0,
+                done_ranges=[],
+            )
+
+        if single_stream:
+            offset = record.get('bytes_received', 0) if record else 0
+            if offset < total_size:
+                headers = {'Range': 'bytes=%s-' % offset} if offset else {}
+                r = self._send_request(download_url, method='GET', headers=headers, stream=True)
+                r.raise_for_status()
+                # server may still send the whole file
+                if offset and r.status_code != 206:
+                    offset = 0
+                self._download_stream(r, output_path, offset, record, checksum)
+            return total_size
+
+        # the range size must be the same as last try
+        done_ranges = set()
+        if record:
+            self.range_size = record.get('range_size')
+            done_ranges = set(record.get('done_ranges'))
+
+        # preallocate the file then each worker write its own range
+        with open(output_path, 'r+b' if done_ranges else 'wb') as f:
+            f.truncate(total_size)
+
+        ranges = [(x, min(x + self.range_size, total_size) - 1) for x in range(0, total_size, self.range_size)]
+        ranges = [(x, y) for x, y in ranges if x not in done_ranges]
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                futures = [
+                    executor.submit(self._download_range, download_url, output_path, x, y, record) for x, y in ranges
+                ]
+                for future, (_, end) in zip(futures, ranges):
+                    future.result()
+                    # hash the finished ranges in order while the later ones are downloading
+                    if checksum:
+                        checksum.update_from_file(end + 1)
+        finally:
+            # keep the ranges finished before the failure for the retry
+            if record:
+                record.flush()
+
+        return total_size
+
+    def _download_stream(self, r, output_path, offset=0, record=None, checksum=None):
+        """Function Summary: private function to save the response stream to local file.
+
+        Args:
+            r (Response): the response in stream mode
+            output_path (string): the local file path
+            offset (int): the response starts from this byte of file. the bytes before it are
+                kept in the local file
+            record (DownloadRecord): the optional record to save the progress
+            checksum (StreamingChecksum): the optional checksum fed with the data
+
+        Returns:
+            the number of bytes in local file
+        """
+
+        # here the request is in stream mode, since we request the file which might
+        # be very large. It will save the file block by block to avoid blowing up the memory
+        received = offset
+        try:
+            with r:
+                with open(output_path, 'r+b' if offset else 'wb') as f:
+                    f.seek(offset)
+                    f.truncate()
+                    for chunk in r.iter_content(chunk_size=self.BLOCK_SIZE):
+                        f.write(chunk)
+                        if checksum:
+                            checksum.update_at(received, chunk)
+                        received += len(chunk)
+                        # save the progress on the interval instead of every block
+                        if record and record.due(len(chunk)):
+                            f.flush()
+                            record.update(bytes_received=received)
+        finally:
+            # the file is closed here so the saved progress never runs ahead of the data
+            if record:
+                record.update(bytes_received=received)
+
+        return received
+
+    def _download_range(self, download_url, output_path, start, end, record=None):
+        """Function Summary: private function to download one byte range into the local file.
+
+        Args:
+            download_url (string): the relative path of download api
+            output_path (string): the preallocated local file
+            start (int): the first byte of range
+            end (int): the last byte of range(inclusive)
+            record (DownloadRecord): the optional record to save the finished range
+
+        Returns:
+            the number of bytes downloaded
+        """
+
+        headers = {'Range': 'bytes=%s-%s' % (start, end)}
+        received = 0
+        with self._send_request(download_url, method='GET', headers=headers, stream=True) as r:
+            r.raise_for_status()
+            if r.status_code != 206:
+                raise IOError('Server ignored the range request bytes=%s-%s' % (start, end))
+
+            with open(output_path, 'r+b') as f:
+                f.seek(start)
+                for chunk in r.iter_content(chunk_size=self.BLOCK_SIZE):
+                    f.write(chunk)
+                    received += len(chunk)
+
+        if received != end - start + 1:
+            raise IOError('Range bytes=%s-%s is incomplete, received %s bytes' % (start, end, received))
+
+        if record:
+            record.add_range(start, received)
+
+        return received
@@ -0,0 +1,81 @@
+from concurrent.futures import ALL_COMPLETED
+from concurrent.futures import wait
+
+
+class TaskHandle:
+    """the handle of the file task submitted without waiting.
+
+    The handle is returned by `copy_to_core` and `delete_entity` with `wait=False`. The job
+    status is followed by the task watcher of client and the final status is returned by
+    `result`. Cancelling the handle only stops the waiting, the job keeps running on server.
+
+    Examples:
+        >>> handle = PFA.copy_to_core(<project_geid>, <source_geids>, <target_geid>, wait=False)
+        >>> handle.done()
+        >>> res = handle.result(timeout=600)
+    """
+
+    def __init__(self, future, job_type, session_id, submitted=None):
+        self.future = future
+        self.job_type = job_type
+        self.session_id = session_id
+        # the response of submission eg. the nodes to be copied
+        self.submitted = submitted
+
+    def done(self):
+        """return true if the job is finished, failed or the waiting is cancelled."""
+
+        return self.future.done()
+
+    def result(self, timeout=None):
+        """Function Summary: wait for the job and return its final status.
+
+        Args:
+            timeout (float): the max seconds to wait. None means until the job is finished or the
+                deadline of task watcher
+
+        Returns:
+            the job status
+
+        Raises:
+            concurrent.futures.TimeoutError if the job is not finished within <timeout>.
+            TaskTimeoutError if the job is not finished before the deadline of task watcher.
+            concurrent.futures.CancelledError if the waiting is cancelled.
+        """
+
+        return self.future.result(timeout)
+
+    def cancel(self):
+        """stop waiting for the job. return false if the job is already finished."""
+
+        return self.future.cancel()
+
+    def cancelled(self):
+        return self.future.cancelled()
+
+    def __repr__(self):
+        return '<TaskHandle %s %s done=%s>' % (self.job_type, self.session_id, self.done())
+
+
+def wait_all(handles, timeout=None, return_when=ALL_COMPLETED):
+    """Function Summary: wait for many task handles together.
+
+    Args:
+        handles (list): the TaskHandle list
+        timeout (float): the max seconds to wait. None means no limit
+        return_when (string): `concurrent.futures.ALL_COMPLETED`, `FIRST_COMPLETED` or `FIRST_EXCEPTION`
+
+    Returns:
+        (done, not_done) the two lists of handles in the original order
+
+    Examples:
+        >>> done, not_done = wait_all(handles, timeout=600)
+        >>> res = [x.result() for x in done]
+    """
+
+    handles = list(handles)
+    finished, _ = wait([x.future for x in handles], timeout=timeout, return_when=return_when)
+
+    done = [x for x in handles if x.future in finished]
+    not_done = [x for x in handles if x.future not in finished]
+    return done, not_done
@@ -0,0 +1,293 @@
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import InvalidStateError
+from concurrent.futures import ThreadPoolExecutor
+
+from client.api.base_class import BaseAPIClass
+from client.api.project_files import ProjectFilesApis
+from client.exceptions import TaskTimeoutError
+from config import ConfigClass
+
+
+class _Watch:
+    """the task followed by watcher and the future to deliver its status."""
+
+    def __init__(self, session_id, job_ids, deadline):
+        self.future = Future()
+        self.session_id = session_id
+        self.job_ids = list(job_ids) if job_ids else None
+        self.deadline = deadline
+
+
+class TaskWatcher(BaseAPIClass):
+
+    FILE_TASK = 'file'
+    UPLOAD_JOB = 'upload'
+
+    def __init__(self, api_client, interval=None, timeout=None, concurrency=None, max_requests=None):
+        """Function Summary: The watcher to follow many file tasks and upload jobs from one background thread. The
+        status apis only take one session, so each session is queried once per tick no matter how many tasks or
+        jobs are waiting on it. The queries of a tick are sent by a small pool of threads and at most
+        <max_requests> sessions are queried per tick, the ones not queried for the longest time first. So a tick
+        takes at most about max_requests / concurrency request times however many tasks are watched. Each
+        watched task gets a `concurrent.futures.Future` with its final status.
+
+        Args:
+            api_client (PILOT): the client instance that initialize by password or token
+                based authentication
+            interval (float): the seconds between the ticks. default is `task_watch_interval` in config
+            timeout (float): the seconds before the task is failed with TaskTimeoutError. default is
+                the timeout of client polling strategy. 0 means no deadline
+            concurrency (int): the number of status requests at the same time. default is
+                `task_watch_concurrency` in config
+            max_requests (int): the max number of sessions queried per tick. default is
+                `task_watch_max_requests` in config
+
+        Examples:
+            >>> watcher = pilot_client.task_watcher
+            >>> futures = [watcher.watch_file_task(<project_code>, 'data_transfer', x) for x in <session_ids>]
+            >>> res = [x.result() for x in futures]
+        """
+
+        super().__init__(api_client)
+        # the status requests of every tick are not logged
+        self.track_flag = False
+
+        polling = getattr(api_client, 'polling', None)
+        self.interval = ConfigClass.task_watch_interval if interval is None else interval
+        if timeout is None:
+            timeout = polling.timeout if polling else ConfigClass.poll_timeout
+        self.timeout = timeout
+        self.concurrency = max(1, int(concurrency or ConfigClass.task_watch_concurrency))
+        self.max_requests = max(1, int(max_requests or ConfigClass.task_watch_max_requests))
+
+        self._groups = {}
+        # the last time each (group key, session id) is queried
+        self._polled_at = {}
+        self._executor = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._closed = False
+
+    def watch_file_task(self, project_code, action, session_id, job_ids=None) -> Future:
+        """Function Summary: follow the file task(eg. copy or delete) of the session.
+
+        Args:
+            project_code (string): project code
+            action (string): the action of task eg. data_transfer, data_delete
+            session_id (string): the session id of file operation
+            job_ids (list): the optional job ids in the session. if not given the first task of
+                session is followed like `ProjectFileTaskManager.check_status`
+
+        Returns:
+            Future. the result is the task status, or the list of status in the order of
+            <job_ids> if it is given
+
+        Examples:
+            >>> future = watcher.watch_file_task(<project_code>, 'data_delete', <session_id>)
+            >>> future.result(timeout=60)
+        """
+
+        return self._watch((self.FILE_TASK, project_code, action), session_id, job_ids)
+
+    def watch_upload_jobs(self, project_code, session_id, job_ids: list) -> Future:
+        """Function Summary: follow the upload jobs of the session until all of them are finished.
+
+        Args:
+            project_code (string): project code
+            session_id (string): the session id of upload
+            job_ids (list): the job ids returned by combine requests
+
+        Returns:
+            Future. the result is the list of upload status in the order of <job_ids>
+
+        Examples:
+            >>> future = watcher.watch_upload_jobs(<project_code>, <session_id>, [<job_id>])
+        """
+
+        return self._watch((self.UPLOAD_JOB, project_code, session_id), session_id, job_ids)
+
+    def _watch(self, key, session_id, job_ids):
+        if self._closed:
+            raise RuntimeError('The task watcher is closed')
+
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+        watch = _Watch(session_id, job_ids, deadline)
+        with self._lock:
+            self._groups.setdefault(key, []).append(watch)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='pilot-task-watcher', daemon=True)
+                self._thread.start()
+
+        # check the new task right away
+        self._wakeup.set()
+        return watch.future
+
+    def pending(self):
+        """return the number of tasks which are not finished yet."""
+
+        with self._lock:
+            return sum([len(x) for x in self._groups.values()])
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.clear()
+            try:
+                self._tick()
+            except Exception as e:
+                # keep the thread alive, otherwise the pending futures wait forever
+                if not self._closed:
+                    self._logger.error('Task watcher tick failed, retry in next tick: %s' % e)
+            self._wakeup.wait(self.interval)
+
+    def _tick(self):
+        """Function Summary: private function to query the sessions once and deliver the finished tasks.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+
+        with self._lock:
+            groups = {k: [x for x in v if not x.future.cancelled()] for k, v in self._groups.items()}
+
+        # the sessions over the cap are queried in next ticks. the sort is stable
+        # so the sessions never queried keep the order they are watched
+        sessions = list(dict.fromkeys([(k, x.session_id) for k, v in groups.items() for x in v]))
+        sessions.sort(key=lambda x: self._polled_at.get(x, 0))
+        sessions = sessions[: self.max_requests]
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='pilot-task-watcher')
+        futures = {x: self._executor.submit(self._fetch, *x) for x in sessions}
+
+        results = {}
+        for session, future in futures.items():
+            try:
+                results[session] = future.result()
+            except Exception as e:
+                # the failed request(eg. 5xx or timeout) is retried in next tick
+                self._logger.warning(
+                    'Failed to fetch the status of session %s, retry in next tick: %s' % (session[1], e)
+                )
+                results[session] = e
+            self._polled_at[session] = time.monotonic()
+
+        for key, watches in groups.items():
+            finished = []
+            for watch in watches:
+                statuses = results.get((key, watch.session_id))
+                error = statuses if isinstance(statuses, Exception) else None
+                # the session not queried in this tick only checks the deadline
+                done, result = (False, None) if statuses is None or error else self._match(key, watch, statuses)
+                if done:
+                    self._resolve(watch, result=result)
+                    finished.append(watch)
+                elif watch.deadline is not None and time.monotonic() > watch.deadline:
+                    message = 'Timeout after %s seconds waiting for session %s' % (self.timeout, watch.session_id)
+                    if error:
+                        message += '. Last error: %s' % error
+                    timeout_error = TaskTimeoutError(message, result)
+                    timeout_error.__cause__ = error
+                    self._resolve(watch, exception=timeout_error)
+                    finished.append(watch)
+
+            with self._lock:
+                remain = [x for x in self._groups.get(key, []) if x not in finished and not x.future.cancelled()]
+                if remain:
+                    self._groups[key] = remain
+                else:
+                    self._groups.pop(key, None)
+
+        with self._lock:
+            watched = {(k, x.session_id) for k, v in self._groups.items() for x in v}
+        self._polled_at = {k: v for k, v in self._polled_at.items() if k in watched}
+
+    def _fetch(self, key, session_id):
+        """Function Summary: private function to fetch the status of one session. It runs in the worker
+        threads of watcher.
+
+        Args:
+            key (tuple): the group key
+            session_id (string): the session id
+
+        Returns:
+            list of status in the session
+        """
+
+        kind, project_code, name = key
+        if kind == self.FILE_TASK:
+            query_params = {'action': name, 'project_code': project_code, 'session_id': session_id}
+            res = self._send_request(ConfigClass.project_file_task_url, method='GET', params=query_params)
+        else:
+            task_param = {'project_code': project_code, 'operator': self.client.username}
+            headers = {'Session-ID': session_id}
+            res = self._send_request(ConfigClass.upload_status_url, method='GET', params=task_param, headers=headers)
+
+        return res.json().get('result', []) or []
+
+    def _match(self, key, watch, statuses):
+        """Function Summary: private function to find the status of task and check if it is finished.
+
+        Args:
+            key (tuple): the group key
+            watch (_Watch): the task
+            statuses (list): the status list of the session of task
+
+        Returns:
+            (done, result)
+        """
+
+        if key[0] == self.UPLOAD_JOB:
+            status_map = {x.get('job_id'): x for x in statuses}
+            job_status = [status_map.get(x, {}) for x in watch.job_ids]
+            done = all([x.get('status') in ProjectFilesApis.UPLOAD_FINISHED_STATUS for x in job_status])
+            return done, job_status
+
+        matched = list(statuses)
+        if watch.job_ids:
+            status_map = {x.get('job_id'): x for x in matched}
+            matched = [status_map.get(x) for x in watch.job_ids]
+            done = all([x and x.get('status') != 'RUNNING' for x in matched])
+            return done, matched
+
+        # the task might not be registered yet
+        if not matched:
+            return False, None
+        return matched[0].get('status') != 'RUNNING', matched[0]
+
+    @staticmethod
+    def _resolve(watch, result=None, exception=None):
+        try:
+            if exception is not None:
+                watch.future.set_exception(exception)
+            else:
+                watch.future.set_result(result)
+        except InvalidStateError:
+            # the future is cancelled by caller in the meantime
+            pass
+
+    def close(self):
+        """Function Summary: stop the background thread. The unfinished futures are cancelled.
+
+        Args:
+            None
+
+        Examples:
+            >>> watcher.close()
+        """
+
+        self._closed = True
+        self._wakeup.set()
+        with self._lock:
+            for watches in self._groups.values():
+                for watch in watches:
+                    watch.future.cancel()
+            self._groups.clear()
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
@@ -0,0 +1,108 @@
+import contextlib
+import json
+import os
+
+from client.credentials import Credentials
+from config import ConfigClass
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # no advisory lock on windows. the cache still works without the login stampede protection
+    fcntl = None
+
+
+class TokenCache:
+    """the on-disk cache of login tokens shared by the processes of same user.
+
+    The tokens are kept in a json file by the endpoint and username. The file and its
+    lock file are only readable by the owner(0600) and the file is replaced atomically,
+    so the concurrent processes never read the half written tokens.
+
+    Examples:
+        >>> token_cache = TokenCache()
+        >>> with token_cache.lock():
+        >>>     token = token_cache.load(<key>)
+        >>>     if token is None:
+        >>>         token_cache.save(<key>, <credentials>)
+    """
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path or ConfigClass.token_cache_path
+
+    @staticmethod
+    def key(*parts):
+        """return the cache key from the endpoint, username and so on."""
+
+        return '|'.join(str(x) for x in parts if x)
+
+    @contextlib.contextmanager
+    def lock(self):
+        """the exclusive lock across processes. hold it from checking the cache to saving the new
+        token, so only one of the processes starting together will login."""
+
+        self._makedirs()
+        fd = os.open(self.cache_path + '.lock', os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            yield self
+        finally:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def _makedirs(self):
+        folder = os.path.dirname(os.path.abspath(self.cache_path))
+        os.makedirs(folder, mode=0o700, exist_ok=True)
+
+    def _read(self):
+        try:
+            with open(self.cache_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # missing or broken file is the same as empty cache
+            return {}
+
+    def _write(self, tokens):
+        self._makedirs()
+        temp_path = '%s.%s.tmp' % (self.cache_path, os.getpid())
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(tokens, f)
+        os.replace(temp_path, self.cache_path)
+
+    def load(self, key):
+        """return the cached Credentials of <key>. None if it is not cached."""
+
+        token = self._read().get(key)
+        if not token or not token.get('access_token'):
+            return None
+        return Credentials(token['access_token'], token.get('refresh_token'))
+
+    def save(self, key, token: Credentials):
+        """cache the Credentials under <key>."""
+
+        tokens = self._read()
+        tokens[key] = {'access_token': token.access_token, 'refresh_token': token.refresh_token}
+        self._write(tokens)
+
+    def get(self, key):
+        """load the token of <key> under the lock. it is used when the login is done outside the lock
+        (eg. the async client which cannot hold the lock while awaiting)."""
+
+        with self.lock():
+            return self.load(key)
+
+    def put(self, key, token: Credentials):
+        """save the token of <key> under the lock."""
+
+        with self.lock():
+            self.save(key, token)
+
+    def remove(self, key):
+        """drop the cached token of <key> eg. when it is rejected by server."""
+
+        tokens = self._read()
+        if tokens.pop(key, None) is not None:
+            self._write(tokens)
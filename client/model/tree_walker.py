@@ -0,0 +1,71 @@
+import posixpath
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+
+from config import ConfigClass
+
+
+def is_folder(node):
+    """the function will check if the entity node is a folder by its labels."""
+
+    return 'Folder' in node.get('labels', [])
+
+
+def walk_tree(list_children, root_geid=None, root_path='', max_depth=None, concurrency=None):
+    """Function Summary: the generator will traverse the folder tree breadth first. The folders are listed with
+    a bounded pool of concurrent requests and the (path, folders, files) of each folder is yielded as soon as its
+    listing arrives, so the order between the folders of same level is not kept.
+
+    Args:
+        list_children (callable): the function takes the folder geid(None for root) and returns
+            the list or iterator of all the child nodes in that folder
+        root_geid (string): the geid of folder to start from. None means the root
+        root_path (string): the path of the start folder in the result
+        max_depth (int): the max level of sub folders to list. 0 means only the start folder.
+            None means no limit
+        concurrency (int): the number of listing requests at the same time. default is
+            `walk_concurrency` in config
+
+    Returns:
+        iterator of (path, folders, files). folders and files are the list of nodes
+
+    Examples:
+        >>> for path, folders, files in walk_tree(lambda geid: list_all(geid), max_depth=2):
+        >>>     print(path, len(files))
+    """
+
+    concurrency = max(1, int(concurrency or ConfigClass.walk_concurrency))
+
+    # each item is (folder geid, path, depth)
+    queue = deque([(root_geid, root_path, 0)])
+    pending = {}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        try:
+            while queue or pending:
+                while queue and len(pending) < concurrency:
+                    folder_geid, path, depth = queue.popleft()
+                    # consume the listing in the worker since it might be a lazy iterator
+                    future = executor.submit(lambda geid: list(list_children(geid)), folder_geid)
+                    pending[future] = (path, depth)
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, depth = pending.pop(future)
+                    nodes = future.result()
+                    folders = [x for x in nodes if is_folder(x)]
+                    files = [x for x in nodes if not is_folder(x)]
+
+                    yield path, folders, files
+
+                    # like os.walk, the caller can remove the folders from the list to skip them
+                    if max_depth is None or depth < max_depth:
+                        for folder in folders:
+                            folder_path = posixpath.join(path, folder.get('name', ''))
+                            queue.append((folder.get('global_entity_id'), folder_path, depth + 1))
+        finally:
+            # stop the queued listing if the caller break the loop early
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import threading
+
+
+class UploadJournal:
+    """the local checkpoint journal for the resumable upload.
+
+    The journal is an append only file. The first line is the json header of upload
+    (file path, size, mtime, chunk size, resumable_identifier, session id ...) and each
+    following line is a json record like {"chunk": <number>} or {"job_id": <id>}.
+    So a crash in the middle of writing will at most lose the last record.
+    """
+
+    def __init__(self, journal_path, header: dict, acked_chunks=None, job_id=None):
+        self.journal_path = journal_path
+        self.header = header
+        self.acked_chunks = set(acked_chunks or [])
+        self.job_id = job_id
+
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def journal_path_for(journal_dir, project_code, source_file_path, target_path):
+        """the function will return the journal location of the upload.
+
+        the journal is identified by the project, absolute file path and target folder.
+        """
+
+        key = '|'.join([project_code, os.path.abspath(source_file_path), target_path])
+        return os.path.join(journal_dir, hashlib.sha1(key.encode()).hexdigest() + '.journal')
+
+    @staticmethod
+    def file_signature(source_file_path):
+        """the function will return the size and mtime to detect if the local file is changed."""
+
+        stat = os.stat(source_file_path)
+        return {'file_size': stat.st_size, 'file_mtime': stat.st_mtime_ns}
+
+    @classmethod
+    def create(cls, journal_path, header: dict):
+        """Function Summary: create the new journal and write the header. The existing journal will be
+        overwritten.
+
+        Args:
+            journal_path (string): the location of journal file
+            header (dict): the upload information
+
+        Returns:
+            UploadJournal
+        """
+
+        os.makedirs(os.path.dirname(journal_path), exist_ok=True)
+        with open(journal_path, 'w') as f:
+            f.write(json.dumps(header) + '\n')
+
+        return cls(journal_path, header)
+
+    @classmethod
+    def load(cls, journal_path, expected: dict):
+        """Function Summary: load the journal if it exist and still match the expected upload information
+        (eg. the local file has not been changed since last try).
+
+        Args:
+            journal_path (string): the location of journal file
+            expected (dict): the header attributes must match the journal
+
+        Returns:
+            UploadJournal or None if journal not exist or not match
+        """
+
+        if not os.path.exists(journal_path):
+            return None
+
+        with open(journal_path, 'r') as f:
+            lines = f.read().splitlines()
+
+        try:
+            header = json.loads(lines[0])
+        except (IndexError, ValueError):
+            return None
+
+        for key, value in expected.items():
+            if header.get(key) != value:
+                return None
+
+        acked_chunks, job_id = [], None
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # the last line might be half written
+                continue
+            if 'chunk' in record:
+                acked_chunks.append(record['chunk'])
+            if 'job_id' in record:
+                job_id = record['job_id']
+
+        return cls(journal_path, header, acked_chunks=acked_chunks, job_id=job_id)
+
+    def _append(self, record: dict):
+        with self._lock:
+            with open(self.journal_path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+
+    def ack_chunk(self, chunk_number):
+        """record the chunk is acknowledged by server. it is safe to call from worker threads."""
+
+        self._append({'chunk': chunk_number})
+        with self._lock:
+            self.acked_chunks.add(chunk_number)
+
+    def set_job(self, job_id):
+        """record the combine request is accepted so retry can go straight to the status checking."""
+
+        self._append({'job_id': job_id})
+        self.job_id = job_id
+
+    def remove(self):
+        """remove the journal after upload finished."""
+
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
@@ -1,67 +1,156 @@
+import os
 from functools import lru_cache
 
-from pydantic import BaseSettings
-from pydantic import Extra
-from starlette.config import Config
 
-config = Config('.env')
+def settings_class():
+    """return the Settings class. pydantic is imported here so it is only loaded when the
+    first setting is read."""
+
+    from pydantic import BaseSettings
+    from pydantic import Extra
+
+    class Settings(BaseSettings):
+
+        api_gateway: str
+        hpc_endpoint: str
+        socketio_endpoint: str
+
+        # http connection pool settings
+        http_pool_connections: int = 10
+        http_pool_maxsize: int = 32
+        http_connect_timeout: float = 10
+        http_read_timeout: float = 300
+
+        # upload related settings
+        upload_chunk_size: int = 1024 * 1024 * 2
+        upload_min_chunk_size: int = 1024 * 1024
+        upload_max_chunk_size: int = 1024 * 1024 * 64
+        upload_concurrency: int = 4
+        upload_pre_batch_size: int = 500
+        upload_journal_dir: str = os.path.join(os.path.expanduser('~'), '.pilot_sdk', 'upload_journal')
+
+        # download related settings
+        download_concurrency: int = 4
+        download_range_size: int = 1024 * 1024 * 16
+        # the progress of resumable download is saved after this many bytes or seconds
+        download_save_interval_bytes: int = 1024 * 1024 * 16
+        download_save_interval_seconds: float = 1
+
+        # list related settings
+        list_page_size: int = 100
+        list_prefetch_pages: int = 1
+        walk_concurrency: int = 8
+
+        # metadata cache settings
+        metadata_cache_size: int = 1024
+        metadata_cache_ttl: float = 300
+
+        # task status polling settings. poll_timeout 0 means no deadline
+        poll_initial_interval: float = 0.5
+        poll_backoff_factor: float = 2
+        poll_max_interval: float = 10
+        poll_jitter: float = 0.2
+        poll_timeout: float = 3600
+        # the seconds between the batched status requests of task watcher
+        task_watch_interval: float = 2
+        # the status requests of each tick are sent by this many threads and at most
+        # task_watch_max_requests sessions are queried per tick(the rest in next ticks)
+        task_watch_concurrency: int = 8
+        task_watch_max_requests: int = 64
+        # the deadline of dataset file operation is
+        # dataset_wait_timeout + dataset_wait_timeout_per_file * number of files
+        dataset_wait_timeout: float = 20
+        dataset_wait_timeout_per_file: float = 1
+
+        # the hash algorithms computed while the files are transferred. md5 is sent
+        # as the upload metadata, the others(eg. blake2b) are only returned in the result
+        checksum_algorithms: list = ['md5']
+
+        # local entity index settings
+        entity_index_path: str = os.path.join(os.path.expanduser('~'), '.pilot_sdk', 'entity_index.db')
+        # the sync skips the unchanged folders, but lists the whole tree again
+        # if the last full listing is older than the seconds
+        entity_index_full_sync_interval: float = 24 * 3600
+
+        # local file hash cache for the upload dedup
+        hash_cache_path: str = os.path.join(os.path.expanduser('~'), '.pilot_sdk', 'hash_cache.db')
+
+        # login token cache. the cached access token is reused until
+        # it expires in token_expiry_leeway seconds
+        token_cache_path: str = os.path.join(os.path.expanduser('~'), '.pilot_sdk', 'tokens.json')
+        token_expiry_leeway: float = 60
+        # the seconds before expiry to refresh the access token in background
+        token_refresh_margin: float = 120
+        # the background refresh is retried from the interval with exponential
+        # backoff and gives up after the max failures in a row
+        token_refresh_retry_interval: float = 5
+        token_refresh_max_failures: int = 5
+
+        def __init__(self):
+            super().__init__()
+            self.auth_url = '/portal/users/auth'
+            self.refresh_url = '/portal/users/refresh'
+
+            # dataset related api
+            self.user_dataset_url = '/portal/v1/users/%s/datasets'
+            self.dataset_url = '/portal/v1/dataset'
+            self.dataset_ops_url = '/portal/v1/dataset/%s'
+            self.dataset_files_url = '/portal/v1/dataset/%s/files'
+            self.dataset_file_ops_url = '/portal/v1/dataset/%s/files/%s'
+
+            # file update related api
+            self.pre_upload_url = '/upload/gr/v1/files/jobs'
+            self.chunk_upload_url = '/upload/gr/v1/files/chunks'
+            self.combine_chunk_url = '/upload/gr/v1/files'
+            # TODO after update the task api change to task object
+            self.upload_status_url = '/upload/gr/v1/files/jobs'
+
+            # project related api
+            self.project_file_task_url = '/portal/v1/files/actions/tasks'
+            self.project_list_user_url = '/portal/v1/containers/%s/users'
+            self.project_user_ops_url = '/portal/v1/containers/%s/users/%s'
+            self.list_all_project_url = '/portal/v1/containers/'
+            self.list_project_by_user_url = '/portal/v1/users/%s/containers'
+            self.create_project_url = '/portal/v1/projects'
+            self.get_project_by_geid_url = '/portal/v1/project/%s'
+
+            # project files related api
+            self.project_file_meta_url = '/portal/v1/files/entity/meta/'
+            self.project_file_action_url = '/portal/v1/files/actions'
+
+            # download related api
+            self.pre_download_url = '/portal/v2/download/pre'
+            self.download_status_url = '/portal/download/gr/v1/download/status/%s'
+            self.download_url = '/portal/download/gr/v1/download/%s'
+
+        class Config:
+            env_file = '.env'
+            env_file_encoding = 'utf-8'
+            extra = Extra.allow
+
+            @classmethod
+            def customise_sources(cls, init_settings, env_settings, file_secret_settings):
+                return env_settings, init_settings, file_secret_settings
+
+    return Settings
 
 
-class Settings(BaseSettings):
-
-    api_gateway: str
-    hpc_endpoint: str
-    socketio_endpoint: str
-
-    def __init__(self):
-        super().__init__()
-        self.auth_url = '/portal/users/auth'
-
-        # dataset related api
-        self.user_dataset_url = '/portal/v1/users/%s/datasets'
-        self.dataset_url = '/portal/v1/dataset'
-        self.dataset_files_url = '/portal/v1/dataset/%s/files'
-        self.dataset_file_ops_url = '/portal/v1/dataset/%s/files/%s'
-
-        # file update related api
-        self.pre_upload_url = '/upload/gr/v1/files/jobs'
-        self.chunk_upload_url = '/upload/gr/v1/files/chunks'
-        self.combine_chunk_url = '/upload/gr/v1/files'
-        # TODO after update the task api change to task object
-        self.upload_status_url = '/upload/gr/v1/files/jobs'
-
-        # project related api
-        self.project_file_task_url = '/portal/v1/files/actions/tasks'
-        self.project_list_user_url = '/portal/v1/containers/%s/users'
-        self.project_user_ops_url = '/portal/v1/containers/%s/users/%s'
-        self.list_all_project_url = '/portal/v1/containers/'
-        self.list_project_by_user_url = '/portal/v1/users/%s/containers'
-        self.create_project_url = '/portal/v1/projects'
-        self.get_project_by_geid_url = '/portal/v1/project/%s'
-
-        # project files related api
-        self.project_file_meta_url = '/portal/v1/files/entity/meta/'
-        self.project_file_action_url = '/portal/v1/files/actions'
-
-        # download related api
-        self.pre_download_url = '/portal/v2/download/pre'
-        self.download_status_url = '/portal/download/gr/v1/download/status/%s'
-        self.download_url = '/portal/download/gr/v1/download/%s'
+@lru_cache(1)
+def get_settings():
+    settings = settings_class()()
+    return settings
 
-    class Config:
-        env_file = '.env'
-        env_file_encoding = 'utf-8'
-        extra = Extra.allow
 
-        @classmethod
-        def customise_sources(cls, init_settings, env_settings, file_secret_settings):
-            return env_settings, init_settings, file_secret_settings
+class LazySettings:
+    """the proxy of settings which is created on the first attribute access. the sdk can be imported
+    without loading the settings(eg. the env file) and the settings can still be changed at runtime by
+    `ConfigClass.<name> = <value>`."""
 
+    def __getattr__(self, name):
+        return getattr(get_settings(), name)
 
-@lru_cache(1)
-def get_settings():
-    settings = Settings()
-    return settings
+    def __setattr__(self, name, value):
+        setattr(get_settings(), name, value)
 
 
-ConfigClass = get_settings()
+ConfigClass = LazySettings()
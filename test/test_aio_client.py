@@ -0,0 +1,220 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import jwt
+
+from client.aio.base_class import AsyncBaseAPIClass
+from client.aio.client import AsyncPILOT
+from client.aio.dataset_files import AsyncDatasetFileApis
+from client.aio.file_task_socket import AsyncDatasetFileTaskManager
+from client.aio.project_files import AsyncProjectFilesApis
+from client.api.base_class import BaseAPIClass
+from client.credentials import Credentials
+
+# the hmac key of test tokens. it is long enough for the jwt warning
+SECRET = 'x' * 32
+
+
+def access_token(expires_in):
+    return jwt.encode({'preferred_username': 'admin', 'exp': int(time.time() + expires_in)}, SECRET)
+
+
+class FakeContent:
+    def __init__(self, body, block_size):
+        self.body = body
+        self.block_size = block_size
+
+    async def iter_chunked(self, size):
+        for i in range(0, len(self.body), self.block_size):
+            yield self.body[i : i + self.block_size]
+
+
+class FakeResponse:
+    def __init__(self, status=200, body=b'', block_size=4):
+        self.status = status
+        self.headers = {}
+        self.body = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.content = FakeContent(self.body, block_size)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def read(self):
+        return self.body
+
+    async def text(self):
+        return self.body.decode()
+
+    def json(self):
+        return json.loads(self.body)
+
+    def release(self):
+        pass
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    """the aiohttp session replying the requests with the responses set by test."""
+
+    closed = False
+
+    def __init__(self, responses, refresh_response=None):
+        self.responses = responses
+        self.refresh_response = refresh_response
+        self.requests = []
+        self.refreshes = 0
+
+    async def request(self, method, url, **kwargs):
+        self.requests.append(dict(kwargs, method=method, url=url))
+        return self.responses.pop(0)
+
+    def post(self, url, **kwargs):
+        self.refreshes += 1
+        return self.refresh_response
+
+
+class RequestApis(AsyncBaseAPIClass):
+    async def get(self, url):
+        return await self._send_request(url)
+
+
+class AsyncClientTestCase(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(BaseAPIClass, '_logger', mock.Mock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_client(self, responses, token=None, refresh_response=None):
+        token = token or Credentials(access_token(3600), 'refresh')
+        client = AsyncPILOT(token_crediential=token)
+        client._session = FakeSession(responses, refresh_response)
+        return client
+
+
+class TestAsyncTokenRefresh(AsyncClientTestCase):
+    def test_01_refresh_before_request(self):
+        new_token = access_token(3600)
+        refresh_response = FakeResponse(body={'result': {'access_token': new_token}})
+        client = self.create_client(
+            [FakeResponse(body={'code': 200, 'result': []})],
+            token=Credentials(access_token(-10), 'refresh'),
+            refresh_response=refresh_response,
+        )
+
+        asyncio.run(RequestApis(client).get('/v1/test'))
+
+        assert client._session.refreshes == 1
+        assert client.token.access_token == new_token and client.token.refresh_token == 'refresh'
+        assert client._session.requests[0]['headers']['Authorization'] == 'Bearer ' + new_token
+
+    def test_02_server_error(self):
+        token = Credentials(access_token(-10), 'refresh')
+        client = self.create_client([], token=token, refresh_response=FakeResponse(502, b'bad gateway'))
+
+        # the password is not used to login again for the server error
+        client.password = 'password'
+        with self.assertRaises(ConnectionError):
+            asyncio.run(client.refresh_token())
+        assert client.token is token
+
+
+class TestAsyncProjectFiles(AsyncClientTestCase):
+    def test_01_list_archived(self):
+        client = self.create_client([FakeResponse(body={'result': {'data': []}}) for _ in range(3)])
+        project_files = AsyncProjectFilesApis(client)
+
+        async def list_all():
+            await project_files.list_child_entities('project')
+            await project_files.list_child_entities('project', archived=True)
+            await project_files.list_child_entities('project', archived=True, query={'archived': False})
+
+        asyncio.run(list_all())
+
+        queries = [json.loads(dict(x['params'])['query']) for x in client._session.requests]
+        assert queries == [{'archived': False}, {'archived': True}, {'archived': False}]
+
+    def test_02_download_in_executor(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        cwd = os.getcwd()
+        os.chdir(workdir.name)
+        self.addCleanup(os.chdir, cwd)
+
+        hash_code = jwt.encode({'full_path': '/data/project/file.bin'}, SECRET)
+        body = os.urandom(10)
+        client = self.create_client(
+            [
+                FakeResponse(body={'result': {'payload': {'hash_code': hash_code}}}),
+                FakeResponse(body={'result': {'status': 'READY_FOR_DOWNLOADING'}}),
+                FakeResponse(body=body),
+            ]
+        )
+        executor = ThreadPoolExecutor(1)
+        self.addCleanup(executor.shutdown)
+        calls = []
+        submit = executor.submit
+        executor.submit = lambda fn, *args: calls.append(fn) or submit(fn, *args)
+
+        async def download():
+            asyncio.get_running_loop().set_default_executor(executor)
+            return await AsyncProjectFilesApis(client).fget_file_entity('project', ['file'])
+
+        status = asyncio.run(download())
+
+        with open('file.bin', 'rb') as f:
+            assert f.read() == body
+        assert status == {'status': 'READY_FOR_DOWNLOADING'}
+        # the open, each block of 4 bytes and the close
+        assert len(calls) == 5 and calls[0] is open
+
+
+class TestAsyncDatasetTask(AsyncClientTestCase):
+    def test_01_notified_before_response(self):
+        managers = []
+
+        async def connect(manager):
+            managers.append(manager)
+
+        async def close(manager):
+            pass
+
+        for name, value in [('connect', connect), ('close', close)]:
+            patcher = mock.patch.object(AsyncDatasetFileTaskManager, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        client = self.create_client([])
+        dataset_files = AsyncDatasetFileApis(client)
+
+        async def send():
+            # the job finishes before the request returns
+            manager = managers[0]
+            await manager.set_notification(
+                {
+                    'payload': {
+                        'session_id': manager.session_id,
+                        'status': 'FINISH',
+                        'action': 'dataset_file_move',
+                        'source': {'global_entity_id': 'file'},
+                    }
+                }
+            )
+            return FakeResponse(body={'result': {'processing': [{'global_entity_id': 'file'}]}})
+
+        async def wait():
+            return await dataset_files._wait_dataset_task('dataset', 'dataset_file_move', 'session', send, timeout=1)
+
+        res, task_res = asyncio.run(wait())
+
+        assert [x['payload']['source']['global_entity_id'] for x in task_res] == ['file']
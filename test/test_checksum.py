@@ -0,0 +1,83 @@
+import base64
+import hashlib
+import os
+import tempfile
+import unittest
+
+from client.model.checksum import StreamingChecksum
+from client.model.checksum import checksum_chunks
+from client.model.checksum import file_md5
+from client.model.checksum import header_digests
+
+
+class TestStreamingChecksum(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+
+        self.data = os.urandom(1000)
+        self.file_path = os.path.join(self.workdir.name, 'data.bin')
+        with open(self.file_path, 'wb') as f:
+            f.write(self.data)
+        self.expected = {x: hashlib.new(x, self.data).hexdigest() for x in ['md5', 'sha256', 'blake2b']}
+
+    def test_01_in_order(self):
+        checksum = StreamingChecksum(['md5', 'sha256', 'blake2b'])
+        for offset in range(0, len(self.data), 300):
+            checksum.update_at(offset, self.data[offset : offset + 300])
+
+        assert checksum.hexdigests() == self.expected
+
+    def test_02_gap_read_from_file(self):
+        # the chunks before resume are not fed
+        checksum = StreamingChecksum(['md5'], self.file_path)
+        checksum.update_at(600, self.data[600:800])
+
+        assert checksum.hexdigests(len(self.data)) == {'md5': self.expected['md5']}
+
+    def test_03_gap_without_file(self):
+        checksum = StreamingChecksum(['md5'])
+
+        with self.assertRaises(ValueError):
+            checksum.update_at(10, b'x')
+
+    def test_04_restart(self):
+        checksum = StreamingChecksum(['md5'])
+        checksum.update_at(0, b'broken')
+        checksum.update_at(0, self.data)
+
+        assert checksum.hexdigests() == {'md5': self.expected['md5']}
+
+    def test_05_checksum_chunks(self):
+        checksum = StreamingChecksum(['sha256'])
+        chunks = [(x // 250 + 1, self.data[x : x + 250]) for x in range(0, len(self.data), 250)]
+
+        assert list(checksum_chunks(iter(chunks), lambda x: (x - 1) * 250, checksum)) == chunks
+        assert checksum.hexdigests() == {'sha256': self.expected['sha256']}
+
+    def test_06_file_md5(self):
+        assert file_md5(self.file_path, block_size=7) == self.expected['md5']
+
+
+class TestHeaderDigests(unittest.TestCase):
+    def b64(self, name, data=b'abc'):
+        return base64.b64encode(hashlib.new(name, data).digest()).decode()
+
+    def test_01_digest_headers(self):
+        headers = {
+            'Repr-Digest': 'sha-256=:%s:, md5=:%s:' % (self.b64('sha256'), self.b64('md5')),
+            'Digest': 'SHA-512=%s, crc32c=AAAA' % self.b64('sha512'),
+        }
+
+        assert header_digests(headers) == {x: hashlib.new(x, b'abc').hexdigest() for x in ['md5', 'sha256', 'sha512']}
+
+    def test_02_content_md5(self):
+        headers = {'Content-MD5': self.b64('md5')}
+
+        assert header_digests(headers) == {'md5': hashlib.md5(b'abc').hexdigest()}
+        # the content md5 of range response is only for the part
+        assert header_digests(headers, partial=True) == {}
+
+    def test_03_broken_value(self):
+        assert header_digests({'Content-MD5': 'not base64!', 'Digest': 'md5='}) == {}
+        assert header_digests({}) == {}
@@ -0,0 +1,123 @@
+import os
+import re
+import tempfile
+import unittest
+from unittest import mock
+
+from client.api.base_class import BaseAPIClass
+from client.api.project_files import ProjectFilesApis
+from client.model.chunk_tuner import MB
+from client.model.chunk_tuner import ChunkSizeTuner
+from client.model.upload_journal import UploadJournal
+from config import ConfigClass
+
+
+class TestChunkSizeTuner(unittest.TestCase):
+    def setUp(self):
+        self.tuner = ChunkSizeTuner(min_chunk_size=MB, max_chunk_size=64 * MB)
+
+    def test_01_no_measurement(self):
+        assert self.tuner.throughput() is None
+        assert self.tuner.pick_chunk_size(2 * MB) == 2 * MB
+        assert self.tuner.pick_chunk_size(128 * MB) == 64 * MB
+
+    def test_02_rounded_to_mb(self):
+        # 5.5MB/s takes 11MB in two seconds
+        self.tuner.record(4 * MB, 1)
+        self.tuner.record(7 * MB, 1)
+
+        assert self.tuner.throughput() == 5.5 * MB
+        assert self.tuner.pick_chunk_size(2 * MB) == 11 * MB
+
+    def test_03_slow_link(self):
+        self.tuner.record(MB, 10)
+
+        assert self.tuner.pick_chunk_size(2 * MB) == MB
+
+    def test_04_fast_link(self):
+        self.tuner.record(64 * MB, 0.5)
+
+        assert self.tuner.pick_chunk_size(2 * MB) == 64 * MB
+
+    def test_05_zero_seconds(self):
+        self.tuner.record(MB, 0)
+
+        assert self.tuner.throughput() is None and self.tuner.pick_chunk_size(3 * MB) == 3 * MB
+
+    def test_06_clamp(self):
+        assert self.tuner.clamp(1) == MB
+        assert self.tuner.clamp(3.5 * MB) == int(3.5 * MB)
+        assert self.tuner.clamp(65 * MB) == 64 * MB
+
+
+class FakeResponse:
+    def __init__(self, result):
+        self.result = result
+
+    def json(self):
+        return {'result': self.result}
+
+
+class TestAutoChunkSize(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+
+        for name, value in [('upload_chunk_size', 4), ('upload_journal_dir', self.workdir.name)]:
+            self.addCleanup(setattr, ConfigClass, name, getattr(ConfigClass, name))
+            setattr(ConfigClass, name, value)
+        patcher = mock.patch.object(BaseAPIClass, '_logger', mock.Mock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.client = mock.Mock(username='admin', upload_concurrency=2)
+        self.client.chunk_size_tuner = ChunkSizeTuner(min_chunk_size=2, max_chunk_size=8)
+        self.project_files = ProjectFilesApis(self.client)
+        self.project_files._pre_upload = lambda *args: [{'payload': {'resumable_identifier': 'file'}}]
+        self.project_files._combine_chunks = lambda combine_payload, header: 'job'
+        self.project_files._wait_upload_status = lambda project_code, header: {'status': 'SUCCEED'}
+        self.chunks = []
+
+        self.file_path = os.path.join(self.workdir.name, 'data.bin')
+        with open(self.file_path, 'wb') as f:
+            f.write(os.urandom(10))
+
+    def send_request(self, api_endpoint, method='GET', data=None, **kwargs):
+        fields = dict(re.findall(rb'name="(\w+)"\r\n\r\n([^\r]*)', data.read()))
+        self.chunks.append(
+            tuple(
+                int(fields[x]) for x in [b'resumable_chunk_number', b'resumable_chunk_size', b'resumable_total_chunks']
+            )
+        )
+
+    def upload(self, **kwargs):
+        self.chunks = []
+        with mock.patch.object(BaseAPIClass, '_send_request', self.send_request):
+            return self.project_files.fput_file_entity(
+                'project', self.file_path, chunk_size='auto', checksum=False, **kwargs
+            )
+
+    def test_01_tuned_between_files(self):
+        # the first upload has no measurement
+        assert self.upload()['chunk_size'] == 4
+        assert sorted(self.chunks) == [(1, 4, 3), (2, 4, 3), (3, 4, 3)]
+
+        # the fast link picks the max size for the next file
+        assert self.upload()['chunk_size'] == 8
+        assert sorted(self.chunks) == [(1, 8, 2), (2, 8, 2)]
+
+    def test_02_resume_with_journal_size(self):
+        self.client.chunk_size_tuner.record(8 * MB, 1)
+        journal_path = UploadJournal.journal_path_for(self.workdir.name, 'project', self.file_path, '')
+        header = dict(
+            UploadJournal.file_signature(self.file_path),
+            auto_chunk_size=True,
+            chunk_size=4,
+            resumable_identifier='file',
+            session_id='session',
+        )
+        UploadJournal.create(journal_path, header).ack_chunk(1)
+
+        # the interrupted upload continues with the size it started with
+        assert self.upload(resumable=True)['chunk_size'] == 4
+        assert sorted(self.chunks) == [(2, 4, 3), (3, 4, 3)]
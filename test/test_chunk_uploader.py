@@ -0,0 +1,265 @@
+import io
+import os
+import re
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from client.model.chunk_uploader import ChunkLayout
+from client.model.chunk_uploader import ChunkUploader
+from client.model.chunk_uploader import file_chunks
+from client.model.chunk_uploader import mmap_chunks
+from client.model.chunk_uploader import stream_chunks
+from client.model.multipart import MultipartBody
+
+
+def join_chunks(chunks):
+    """return the chunk numbers and the joined data of (<chunk_number>, <chunk_data>) pairs."""
+
+    chunks = list(chunks)
+    return [x[0] for x in chunks], b''.join(bytes(x[1]) for x in chunks)
+
+
+class LocalFileTestCase(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+
+    def write_file(self, data):
+        file_path = os.path.join(self.workdir.name, 'data.bin')
+        with open(file_path, 'wb') as f:
+            f.write(data)
+        return file_path
+
+
+class TestFileChunks(LocalFileTestCase):
+    def test_01_read_chunks(self):
+        data = os.urandom(10)
+        file_path = self.write_file(data)
+
+        # the exact multiple and the partial last chunk
+        for size in [5, 3]:
+            layout = ChunkLayout(len(data), size)
+            chunk_numbers = list(range(1, layout.total_chunks + 1))
+            assert join_chunks(file_chunks(file_path, layout, chunk_numbers)) == (chunk_numbers, data)
+
+    def test_02_only_requested_chunks(self):
+        data = os.urandom(12)
+        file_path = self.write_file(data)
+
+        assert join_chunks(file_chunks(file_path, ChunkLayout(len(data), 4), [3])) == ([3], data[8:])
+
+    def test_03_empty_file(self):
+        file_path = self.write_file(b'')
+
+        assert list(file_chunks(file_path, ChunkLayout(0, 4), [])) == []
+
+
+class TestMmapChunks(LocalFileTestCase):
+    def test_01_read_chunks(self):
+        data = os.urandom(10)
+        file_path = self.write_file(data)
+
+        for size in [5, 3]:
+            layout = ChunkLayout(len(data), size)
+            chunk_numbers = list(range(1, layout.total_chunks + 1))
+            assert join_chunks(mmap_chunks(file_path, layout, chunk_numbers)) == (chunk_numbers, data)
+
+    def test_02_only_requested_chunks(self):
+        data = os.urandom(12)
+        file_path = self.write_file(data)
+
+        assert join_chunks(mmap_chunks(file_path, ChunkLayout(len(data), 4), [2])) == ([2], data[4:8])
+
+    def test_03_empty_file(self):
+        file_path = self.write_file(b'')
+
+        # an empty file cannot be memory mapped
+        assert list(mmap_chunks(file_path, ChunkLayout(0, 4), [])) == []
+
+
+class TestChunkLayout(unittest.TestCase):
+    def test_01_empty_file(self):
+        layout = ChunkLayout(0, 4)
+
+        assert layout.total_chunks == 0
+
+    def test_02_exact_multiple(self):
+        layout = ChunkLayout(8, 4)
+
+        assert layout.total_chunks == 2
+        assert [layout.offset(x) for x in [1, 2]] == [0, 4]
+        assert [layout.length(x) for x in [1, 2]] == [4, 4]
+
+    def test_03_last_partial_chunk(self):
+        layout = ChunkLayout(9, 4)
+
+        assert layout.total_chunks == 3
+        assert [layout.length(x) for x in [1, 2, 3]] == [4, 4, 1]
+
+
+class TestStreamChunks(unittest.TestCase):
+    def test_01_empty_stream(self):
+        assert list(stream_chunks(io.BytesIO(b''), 4)) == []
+        assert list(stream_chunks(iter([]), 4)) == []
+        assert list(stream_chunks([b'', b''], 4)) == []
+
+    def test_02_exact_multiple(self):
+        chunks = list(stream_chunks(io.BytesIO(b'abcdefgh'), 4))
+
+        assert chunks == [(1, b'abcd'), (2, b'efgh')]
+
+    def test_03_recut_blocks(self):
+        blocks = [b'ab', b'', b'cdefg', b'h', b'ijk']
+        chunks = list(stream_chunks(blocks, 4))
+
+        assert chunks == [(1, b'abcd'), (2, b'efgh'), (3, b'ijk')]
+
+    def test_04_whole_chunk_blocks(self):
+        chunks = list(stream_chunks([b'abcd', b'ef', b'gh', b'ijkl'], 4))
+
+        assert chunks == [(1, b'abcd'), (2, b'efgh'), (3, b'ijkl')]
+
+
+def parse_multipart(body: MultipartBody):
+    """return the form fields and file data of multipart body."""
+
+    data = body.read()
+    boundary = body.content_type.split('boundary=')[1].encode()
+    fields, file_data = {}, None
+    for part in data.split(b'--' + boundary)[1:-1]:
+        header, _, value = part[2:-2].partition(b'\r\n\r\n')
+        name = re.search(rb'name="([^"]*)"', header).group(1).decode()
+        if b'filename=' in header:
+            file_data = value
+        else:
+            fields.setdefault(name, []).append(value.decode())
+    return fields, file_data
+
+
+class FakeChunkServer:
+    """receive the chunk requests. the request of chunk number in <errors> fails."""
+
+    def __init__(self, errors=()):
+        self.chunks = {}
+        self.errors = set(errors)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def send_request(self, api_endpoint, method='GET', data=None, headers=None, **kwargs):
+        fields, file_data = parse_multipart(data)
+        chunk_number = int(fields['resumable_chunk_number'][0])
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            # the later chunks finish first
+            time.sleep(0.01 / chunk_number)
+            if chunk_number in self.errors:
+                raise ConnectionError('chunk %s failed' % chunk_number)
+            with self._lock:
+                self.chunks[(fields['resumable_identifier'][0], chunk_number)] = file_data
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class TestChunkUploader(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeChunkServer()
+        self.uploader = self.create_uploader(concurrency=4)
+
+    def create_uploader(self, **kwargs):
+        uploader = ChunkUploader(mock.Mock(upload_concurrency=None), **kwargs)
+        uploader._send_request = self.server.send_request
+        return uploader
+
+    def test_01_chunk_order(self):
+        data = os.urandom(20)
+        chunks = stream_chunks(io.BytesIO(data), 3)
+        acked = []
+
+        result = self.uploader.upload(chunks, {'resumable_identifier': 'file'}, {}, on_ack=acked.append)
+
+        # each chunk carries its own number no matter which request finishes first
+        assert result == list(range(1, 8)) and sorted(acked) == result
+        assert b''.join(self.server.chunks[('file', x)] for x in result) == data
+        assert 1 < self.server.max_in_flight <= 4
+
+    def test_02_many_files(self):
+        tasks = [(x, (name + str(x)).encode(), {'resumable_identifier': name}, None) for name in 'ab' for x in [1, 2]]
+
+        acked = self.uploader.upload_many(iter(tasks), {})
+
+        assert sorted(acked) == [1, 1, 2, 2]
+        assert self.server.chunks == {('a', 1): b'a1', ('a', 2): b'a2', ('b', 1): b'b1', ('b', 2): b'b2'}
+
+    def test_03_failed_chunk(self):
+        self.server.errors = {3}
+        acked = []
+
+        with self.assertRaises(ConnectionError):
+            self.uploader.upload_many(
+                ((x, b'x', {'resumable_identifier': 'file'}, acked.append) for x in range(1, 20)), {}
+            )
+
+        # the failed chunk is not acknowledged and the queued chunks are not sent
+        assert 3 not in acked and len(self.server.chunks) < 18
+
+    def test_04_tuner_record(self):
+        tuner = mock.Mock()
+        uploader = self.create_uploader(concurrency=1, tuner=tuner)
+        uploader.upload([(1, b'abcd'), (2, b'ef')], {'resumable_identifier': 'file'}, {})
+
+        assert [x[0][0] for x in tuner.record.call_args_list] == [4, 2]
+
+
+class TestMultipartBody(unittest.TestCase):
+    def test_01_fields_and_data(self):
+        data = os.urandom(10)
+        body = MultipartBody({'a': 1, 'tags': ['x', 'y'], 'dcm_id': None}, 'chunk_data', data, filename='f.bin')
+
+        fields, file_data = parse_multipart(body)
+
+        assert fields == {'a': ['1'], 'tags': ['x', 'y']} and file_data == data
+        assert len(body) == body.tell() and body.read() == b''
+
+    def test_02_same_as_requests(self):
+        import requests
+
+        body = MultipartBody({'a': 1, 'tags': ['x', 'y']}, 'chunk_data', b'abc', filename='f.bin')
+        prepared = requests.Request(
+            'POST', 'http://pilot', data={'a': 1, 'tags': ['x', 'y']}, files={'chunk_data': ('f.bin', b'abc')}
+        ).prepare()
+        boundary = prepared.headers['Content-Type'].split('boundary=')[1]
+
+        # the file part of requests has the content type header
+        expected = prepared.body.replace(boundary.encode(), body.boundary.encode())
+        expected = expected.replace(b'Content-Type: application/octet-stream\r\n', b'')
+        assert body.read() == expected
+
+    def test_03_read_blocks_and_seek(self):
+        body = MultipartBody({'a': 1}, 'chunk_data', bytearray(b'abcdef'))
+        whole = body.read()
+        body.seek(0)
+
+        blocks = iter(lambda: body.read(4), b'')
+        assert b''.join(blocks) == whole
+
+        body.seek(-3, 2)
+        assert body.read() == whole[-3:]
+        body.seek(0)
+        body.seek(2, 1)
+        assert body.read(2) == whole[2:4]
+
+    def test_04_close(self):
+        data = memoryview(bytearray(b'abc'))
+        body = MultipartBody({}, 'chunk_data', data)
+        body.close()
+
+        # the view of chunk is released so the mmap can be closed
+        with self.assertRaises(ValueError):
+            body.read()
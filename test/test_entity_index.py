@@ -0,0 +1,124 @@
+import os
+import posixpath
+import tempfile
+import unittest
+from unittest import mock
+
+from client.model.entity_index import EntityIndex
+from config import ConfigClass
+
+
+def folder(geid, name, modified=1):
+    return {'global_entity_id': geid, 'name': name, 'labels': ['Folder'], 'time_lastmodified': modified}
+
+
+def file(geid, name, size=1, modified=1):
+    return {
+        'global_entity_id': geid,
+        'name': name,
+        'labels': ['File'],
+        'file_size': size,
+        'time_lastmodified': modified,
+    }
+
+
+class FakeTree:
+    """walk the tree of {<path>: [<nodes>]} like `walk`. the folders removed by the caller are not walked."""
+
+    def __init__(self, children):
+        self.children = children
+        self.listed = []
+
+    def walk(self):
+        stack = ['']
+        while stack:
+            path = stack.pop(0)
+            self.listed.append(path)
+            nodes = self.children.get(path, [])
+            folders = [x for x in nodes if 'Folder' in x['labels']]
+            files = [x for x in nodes if 'Folder' not in x['labels']]
+            yield path, folders, files
+            stack.extend(posixpath.join(path, x['name']) for x in folders)
+
+
+class TestEntityIndex(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+
+        self.index = EntityIndex(mock.Mock(), db_path=os.path.join(self.workdir.name, 'index', 'entities.db'))
+        self.addCleanup(self.index.close)
+        self.tree = FakeTree(
+            {
+                '': [folder('f1', 'raw'), folder('f2', 'docs'), file('g1', 'readme.md')],
+                'raw': [file('g2', 'sub-01.nii.gz', size=10), folder('f3', 'sub')],
+                'raw/sub': [file('g3', 'sub-02.nii.gz', size=20)],
+                'docs': [file('g4', 'notes.csv')],
+            }
+        )
+
+    def sync(self, skip_unchanged_folders=None):
+        self.tree.listed = []
+        return self.index._sync('project', 'Core', self.tree.walk(), skip_unchanged_folders)
+
+    def paths(self, **kwargs):
+        return [x['name'] for x in self.index.query('project', zone='Core', **kwargs)]
+
+    def test_01_insert_update_delete(self):
+        assert self.sync() == {'added': 7, 'updated': 0, 'removed': 0, 'unchanged': 0}
+
+        self.tree.children['docs'] = [file('g4', 'notes.csv', size=5, modified=2)]
+        self.tree.children['raw/sub'] = []
+        self.tree.children[''][0]['time_lastmodified'] = 2
+        self.tree.children[''][1]['time_lastmodified'] = 2
+        self.tree.children['raw'][1]['time_lastmodified'] = 2
+        stats = self.sync(skip_unchanged_folders=False)
+
+        assert stats == {'added': 0, 'updated': 4, 'removed': 1, 'unchanged': 2}
+        assert self.index.query('project', zone='Core', name_pattern='notes.*')[0]['file_size'] == 5
+        assert self.paths(extension='gz') == ['sub-01.nii.gz']
+
+    def test_02_skip_unchanged_folders(self):
+        self.sync()
+        # only the file under docs is added. the folder is modified as its content changes
+        self.tree.children['docs'].append(file('g5', 'more.csv'))
+        self.tree.children[''][1]['time_lastmodified'] = 2
+        stats = self.sync(skip_unchanged_folders=True)
+
+        assert self.tree.listed == ['', 'docs']
+        assert stats == {'added': 1, 'updated': 1, 'removed': 0, 'unchanged': 6}
+        assert self.paths(extension='gz') == ['sub-01.nii.gz', 'sub-02.nii.gz']
+
+    def test_03_full_listing_when_due(self):
+        self.sync()
+        self.sync()
+        # the default skips the unchanged folders after the full listing
+        assert self.tree.listed == ['']
+
+        interval = getattr(ConfigClass, 'entity_index_full_sync_interval')
+        self.addCleanup(setattr, ConfigClass, 'entity_index_full_sync_interval', interval)
+        setattr(ConfigClass, 'entity_index_full_sync_interval', 0)
+        self.sync()
+        assert self.tree.listed == ['', 'raw', 'docs', 'raw/sub']
+
+    def test_04_path_lookup(self):
+        self.sync()
+
+        # ordered by path
+        assert self.paths(path_prefix='raw') == ['raw', 'sub', 'sub-01.nii.gz', 'sub-02.nii.gz']
+        assert self.paths(path_prefix='/raw/sub/') == ['sub', 'sub-02.nii.gz']
+        assert self.paths(path_prefix='ra') == []
+        assert self.paths(path_prefix='raw', folder=False, min_size=15) == ['sub-02.nii.gz']
+
+    def test_05_failed_sync_kept(self):
+        self.sync()
+
+        def broken():
+            yield '', [], []
+            raise ConnectionError('listing failed')
+
+        with self.assertRaises(ConnectionError):
+            self.index._sync('project', 'Core', broken(), False)
+
+        # nothing is removed by the partial walk
+        assert len(self.paths()) == 7
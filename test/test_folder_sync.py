@@ -0,0 +1,150 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from client.api.base_class import BaseAPIClass
+from client.api.project_files import ProjectFilesApis
+from client.model.folder_sync import FolderSyncPlan
+from client.model.folder_sync import local_tree
+
+
+class TestLocalTree(unittest.TestCase):
+    def test_01_relative_paths(self):
+        with tempfile.TemporaryDirectory() as workdir:
+            os.makedirs(os.path.join(workdir, 'sub', 'empty'))
+            for path, data in [('a.txt', b'abc'), (os.path.join('sub', 'b.txt'), b'')]:
+                with open(os.path.join(workdir, path), 'wb') as f:
+                    f.write(data)
+
+            files, folders = local_tree(workdir)
+
+            assert {x: y[1] for x, y in files.items()} == {'a.txt': 3, 'sub/b.txt': 0}
+            assert files['sub/b.txt'][0] == os.path.join(workdir, 'sub', 'b.txt')
+            assert folders == {'sub', 'sub/empty'}
+
+
+class TestFolderSyncPlan(unittest.TestCase):
+    def setUp(self):
+        self.local_files = {
+            'new.txt': ('/local/new.txt', 1),
+            'same.txt': ('/local/same.txt', 2),
+            'bigger.txt': ('/local/bigger.txt', 4),
+            'edited.txt': ('/local/edited.txt', 3),
+        }
+        self.remote_files = {
+            'same.txt': {'global_entity_id': 'g1', 'file_size': 2, 'md5': 'md5-same'},
+            'bigger.txt': {'global_entity_id': 'g2', 'file_size': 3, 'md5': 'md5-bigger'},
+            'edited.txt': {'global_entity_id': 'g3', 'file_size': 3, 'md5': 'md5-old'},
+            'gone.txt': {'global_entity_id': 'g4', 'file_size': 5},
+        }
+        self.extra_folders = [('old', {'global_entity_id': 'g5'})]
+        self.hashed = []
+
+    def hash_file(self, local_path):
+        self.hashed.append(local_path)
+        return {'/local/same.txt': 'md5-same', '/local/edited.txt': 'md5-new'}[local_path]
+
+    def test_01_by_size(self):
+        plan = FolderSyncPlan(self.local_files, self.remote_files, self.extra_folders, hash_file=self.hash_file)
+
+        assert plan.upload == ['new.txt']
+        assert plan.update == ['bigger.txt']
+        assert plan.unchanged == ['edited.txt', 'same.txt']
+        assert [x[0] for x in plan.delete] == ['gone.txt', 'old']
+        assert self.hashed == []
+
+    def test_02_by_checksum(self):
+        plan = FolderSyncPlan(
+            self.local_files, self.remote_files, self.extra_folders, checksum=True, hash_file=self.hash_file
+        )
+
+        assert plan.update == ['bigger.txt', 'edited.txt']
+        assert plan.unchanged == ['same.txt']
+        # only the files with same size and the remote md5 are hashed
+        assert sorted(self.hashed) == ['/local/edited.txt', '/local/same.txt']
+
+    def test_03_no_remote_checksum(self):
+        remote_files = {'same.txt': {'global_entity_id': 'g1', 'file_size': 2}}
+        plan = FolderSyncPlan({'same.txt': ('/local/same.txt', 2)}, remote_files, [], checksum=True)
+
+        assert plan.unchanged == ['same.txt'] and plan.delete == []
+
+    def test_04_summary(self):
+        plan = FolderSyncPlan(self.local_files, self.remote_files, self.extra_folders, hash_file=self.hash_file)
+
+        assert plan.summary() == {
+            'upload': ['new.txt'],
+            'update': ['bigger.txt'],
+            'delete': ['gone.txt', 'old'],
+            'unchanged': 2,
+        }
+
+
+class TestSyncUpdate(unittest.TestCase):
+    """the changed files of `sync_folder` with the remote tree and delete job stubbed."""
+
+    def setUp(self):
+        patcher = mock.patch.object(BaseAPIClass, '_logger', mock.Mock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.project_files = ProjectFilesApis(mock.Mock(username='admin'))
+        self.remote_files = {'a.txt': {'global_entity_id': 'g1'}, 'b.txt': {'global_entity_id': 'g2'}}
+        self.staged_files = {'a.txt': {'global_entity_id': 's1'}, 'b.txt': {'global_entity_id': 's2'}}
+        self.uploads = []
+        self.deleted = []
+        # the status of each delete job and the remote files left after it
+        self.delete_status = []
+        self.remote_left = {}
+
+        self.project_files.delete_entity = self.delete_entity
+        self.project_files._remote_tree = self.remote_tree
+
+    def upload(self, relative_paths, upload_target):
+        self.uploads.append((list(relative_paths), upload_target))
+        return [{'status': 'SUCCEED'} for _ in relative_paths], []
+
+    def delete_entity(self, project_geid, targets):
+        self.deleted.append([x['geid'] for x in targets])
+        status = self.delete_status.pop(0) if self.delete_status else {'status': 'SUCCEED'}
+        if isinstance(status, Exception):
+            raise status
+        return status
+
+    def remote_tree(self, project_geid, base_path, local_folders=None):
+        if base_path == 'admin/raw/.pilot_sync/data':
+            return {'global_entity_id': 'staging'}, self.staged_files, []
+        return {'global_entity_id': 'data'}, self.remote_left, []
+
+    def sync_update(self):
+        report = {'jobs': [], 'failed': []}
+        self.project_files._sync_update(
+            'project', ['a.txt', 'b.txt'], self.remote_files, 'raw', 'data', self.upload, report
+        )
+        return report
+
+    def test_01_replaced(self):
+        report = self.sync_update()
+
+        assert self.uploads == [(['a.txt', 'b.txt'], 'raw/.pilot_sync'), (['a.txt', 'b.txt'], 'raw')]
+        assert self.deleted == [['g1', 'g2'], ['staging']]
+        assert len(report['jobs']) == 2 and report['failed'] == []
+
+    def test_02_partly_deleted(self):
+        self.delete_status = [{'status': 'TERMINATED'}]
+        self.remote_left = {'b.txt': {'global_entity_id': 'g2'}}
+        report = self.sync_update()
+
+        # the staged copy of b.txt is kept since its old version is still there
+        assert self.uploads[1] == (['a.txt'], 'raw')
+        assert self.deleted == [['g1', 'g2'], ['s1']]
+        assert report['failed'] == ['b.txt']
+
+    def test_03_delete_error(self):
+        self.delete_status = [ConnectionError('file api is down')]
+        report = self.sync_update()
+
+        assert self.uploads == [(['a.txt', 'b.txt'], 'raw/.pilot_sync')]
+        assert self.deleted == [['g1', 'g2']]
+        assert report['failed'] == ['a.txt', 'b.txt']
@@ -0,0 +1,82 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from client.api.base_class import BaseAPIClass
+from client.api.project_files import ProjectFilesApis
+from config import ConfigClass
+
+
+class FakeResponse:
+    def __init__(self, result):
+        self.result = result
+
+    def json(self):
+        return {'result': self.result}
+
+
+class TestUploadFiles(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+
+        self.requests = []
+        self._lock = threading.Lock()
+        for name, value in [('_send_request', self.send_request), ('_logger', mock.Mock())]:
+            patcher = mock.patch.object(BaseAPIClass, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.project_files = ProjectFilesApis(mock.Mock(username='admin', upload_concurrency=1))
+        self.project_files._wait_upload_jobs = lambda project_code, header, job_ids: [
+            {'job_id': x, 'status': 'SUCCEED'} for x in job_ids
+        ]
+
+    def send_request(self, api_endpoint, method='GET', json=None, data=None, headers=None, **kwargs):
+        with self._lock:
+            if api_endpoint == ConfigClass.pre_upload_url:
+                self.requests.append(('pre', [x['resumable_filename'] for x in json['data']]))
+                return FakeResponse(
+                    [{'payload': {'resumable_identifier': x['resumable_filename']}} for x in json['data']]
+                )
+            if api_endpoint == ConfigClass.combine_chunk_url:
+                self.requests.append(('combine', json['resumable_identifier'], json.get('md5')))
+                return FakeResponse({'job_id': 'job-' + json['resumable_identifier']})
+
+            fields = dict(re.findall(rb'name="(\w+)"\r\n\r\n([^\r]*)', data.read()))
+            self.requests.append(
+                ('chunk', fields[b'resumable_identifier'].decode(), int(fields[b'resumable_chunk_number']))
+            )
+            return FakeResponse({})
+
+    def write_file(self, name, data):
+        file_path = os.path.join(self.workdir.name, name)
+        with open(file_path, 'wb') as f:
+            f.write(data)
+        return file_path
+
+    def test_01_combine_on_last_ack(self):
+        files = [self.write_file('a.bin', b'abcde'), self.write_file('b.bin', b'xyz'), self.write_file('c.bin', b'')]
+
+        jobs = self.project_files._upload_files(
+            'project', [(x, 'data') for x in files], batch_size=2, chunk_size=3, memory_map=False
+        )
+
+        # the empty file has no chunk so it is combined at once
+        assert self.requests[0] == ('pre', ['a.bin', 'b.bin'])
+        assert ('combine', 'c.bin', hashlib.md5(b'').hexdigest()) in self.requests
+
+        # the single worker sends each combine right after the last chunk of file, before the chunks of next file
+        assert [x for x in self.requests if x[0] != 'pre' and x[1] != 'c.bin'] == [
+            ('chunk', 'a.bin', 1),
+            ('chunk', 'a.bin', 2),
+            ('combine', 'a.bin', hashlib.md5(b'abcde').hexdigest()),
+            ('chunk', 'b.bin', 1),
+            ('combine', 'b.bin', hashlib.md5(b'xyz').hexdigest()),
+        ]
+        assert [x['job_id'] for x in jobs] == ['job-a.bin', 'job-b.bin', 'job-c.bin']
+        assert jobs[0]['checksum'] == {'md5': hashlib.md5(b'abcde').hexdigest()}
@@ -0,0 +1,115 @@
+import hashlib
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from client.api.base_class import BaseAPIClass
+from client.api.project_files import ProjectFilesApis
+from client.model import hash_cache as hash_cache_module
+from client.model.hash_cache import HashCache
+from config import ConfigClass
+
+
+class HashCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+
+        self.db_path = os.path.join(self.workdir.name, 'cache', 'hashes.db')
+        self.file_path = os.path.join(self.workdir.name, 'data.bin')
+        with open(self.file_path, 'wb') as f:
+            f.write(b'abc')
+
+        # count the files hashed
+        self.hashed = []
+        file_md5 = hash_cache_module.file_md5
+        patcher = mock.patch.object(hash_cache_module, 'file_md5', lambda x: self.hashed.append(x) or file_md5(x))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class TestHashCache(HashCacheTestCase):
+    def test_01_hit(self):
+        with HashCache(self.db_path) as hash_cache:
+            assert hash_cache.md5(self.file_path) == hashlib.md5(b'abc').hexdigest()
+
+        # the same path, size and mtime in the next run
+        with HashCache(self.db_path) as hash_cache:
+            assert hash_cache.md5(self.file_path) == hashlib.md5(b'abc').hexdigest()
+
+        assert self.hashed == [self.file_path]
+
+    def test_02_mtime_changed(self):
+        with HashCache(self.db_path) as hash_cache:
+            hash_cache.md5(self.file_path)
+            # the same size but modified later
+            stat = os.stat(self.file_path)
+            os.utime(self.file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+            assert hash_cache.get(self.file_path) is None
+            hash_cache.md5(self.file_path)
+
+        assert self.hashed == [self.file_path, self.file_path]
+
+    def test_03_closed_after_use(self):
+        with HashCache(self.db_path) as hash_cache:
+            hash_cache.md5(self.file_path)
+
+        with self.assertRaises(sqlite3.ProgrammingError):
+            hash_cache.conn.execute('SELECT 1')
+
+
+class TestFindDuplicate(HashCacheTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(BaseAPIClass, '_logger', mock.Mock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        path = getattr(ConfigClass, 'hash_cache_path')
+        self.addCleanup(setattr, ConfigClass, 'hash_cache_path', path)
+        setattr(ConfigClass, 'hash_cache_path', self.db_path)
+
+        self.project_files = ProjectFilesApis(mock.Mock(username='admin'))
+        self.nodes = {
+            'admin': [{'name': 'admin', 'labels': ['Folder'], 'global_entity_id': 'f1'}],
+            'data.bin': [
+                {'name': 'data.bin', 'labels': ['File'], 'file_size': 3, 'md5': hashlib.md5(b'abc').hexdigest()}
+            ],
+        }
+        self.project_files.list_child_entities = lambda project_geid, folder_geid, query, **kwargs: self.nodes.get(
+            query['name'], []
+        )
+        patcher = mock.patch('client.api.project_files.ProjectApis')
+        patcher.start().return_value.get_project_by_code.return_value = {'global_entity_id': 'project'}
+        self.addCleanup(patcher.stop)
+
+    def find_duplicate(self, hash_cache=None):
+        with self.project_files._open_hash_cache(hash_cache) as cache:
+            duplicate = self.project_files._find_duplicate('project', self.file_path, '', cache)
+        return duplicate, cache
+
+    def test_01_default_cache_closed(self):
+        duplicate, cache = self.find_duplicate()
+
+        assert duplicate == self.nodes['data.bin'][0]
+        with self.assertRaises(sqlite3.ProgrammingError):
+            cache.conn.execute('SELECT 1')
+
+        # the md5 is cached for the next run
+        self.find_duplicate()
+        assert self.hashed == [self.file_path]
+
+    def test_02_given_cache_kept_open(self):
+        with HashCache(self.db_path) as hash_cache:
+            duplicate, cache = self.find_duplicate(hash_cache)
+
+            assert duplicate and cache is hash_cache
+            assert hash_cache.get(self.file_path) == hashlib.md5(b'abc').hexdigest()
+
+    def test_03_checksum_mismatch(self):
+        self.nodes['data.bin'][0]['md5'] = hashlib.md5(b'xyz').hexdigest()
+
+        assert self.find_duplicate()[0] is None
@@ -0,0 +1,77 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# the modules of the sync sdk imported by the scripts
+SDK_MODULES = [
+    'client.client',
+    'client.api.projects',
+    'client.api.project_files',
+    'client.api.datasets',
+    'client.api.dataset_files',
+    'client.api.hpc',
+]
+
+# the heavy dependencies which should only be loaded on first use
+LAZY_MODULES = ['pydantic', 'starlette', 'jwt', 'socketio', 'engineio', 'aiohttp', 'pythonjsonlogger', 'asyncio']
+
+SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+for name in %r:
+    __import__(name)
+elapsed = time.perf_counter() - start
+print(json.dumps({'elapsed': elapsed, 'modules': sorted(sys.modules)}))
+'''
+
+
+def cold_import(modules, cwd):
+    """import the <modules> in a new interpreter and return the seconds and the loaded modules."""
+
+    env = dict(os.environ, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE='1')
+    # the settings should not be needed to import the sdk
+    for name in ['api_gateway', 'hpc_endpoint', 'socketio_endpoint']:
+        env.pop(name, None)
+
+    output = subprocess.check_output([sys.executable, '-c', SCRIPT % (modules,)], cwd=cwd, env=env)
+    result = json.loads(output.decode().strip().splitlines()[-1])
+    return result['elapsed'], set(result['modules'])
+
+
+class TestImportTime(unittest.TestCase):
+
+    # the budget of sdk import on top of `requests`. override with the env
+    # variable to track the cold start in the slower environment
+    budget = float(os.environ.get('PILOT_SDK_IMPORT_BUDGET', 0.5))
+    rounds = 5
+
+    @classmethod
+    def setUpClass(self):
+        self.workdir = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(self):
+        self.workdir.cleanup()
+
+    def test_01_no_heavy_dependency(self):
+        _, modules = cold_import(SDK_MODULES, self.workdir.name)
+
+        loaded = [x for x in LAZY_MODULES if x in modules]
+        assert loaded == [], 'loaded on import: %s' % loaded
+
+    def test_02_no_side_effect(self):
+        cold_import(SDK_MODULES, self.workdir.name)
+
+        assert os.listdir(self.workdir.name) == []
+
+    def test_03_cold_start_budget(self):
+        baseline = statistics.median([cold_import(['requests'], self.workdir.name)[0] for _ in range(self.rounds)])
+        sdk = statistics.median([cold_import(SDK_MODULES, self.workdir.name)[0] for _ in range(self.rounds)])
+
+        assert sdk - baseline < self.budget, 'cold import: requests %.3fs, sdk %.3fs' % (baseline, sdk)
@@ -0,0 +1,59 @@
+import unittest
+from unittest import mock
+
+from client.model import metadata_cache as metadata_cache_module
+from client.model.metadata_cache import MetadataCache
+
+
+class TestMetadataCache(unittest.TestCase):
+    def setUp(self):
+        # the clock is moved by test
+        self.now = 100.0
+        patcher = mock.patch.object(metadata_cache_module, 'time', mock.Mock(monotonic=lambda: self.now))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.cache = MetadataCache(maxsize=2, ttl=10)
+
+    def test_01_hit_and_expiry(self):
+        self.cache.set(('project_geid', 'g1'), {'code': 'p1'})
+        self.now += 9
+
+        assert self.cache.get(('project_geid', 'g1')) == {'code': 'p1'}
+
+        self.now += 1
+        assert self.cache.get(('project_geid', 'g1'), 'missing') == 'missing'
+        assert len(self.cache) == 0
+
+    def test_02_lru(self):
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        # a is used recently so b is evicted
+        self.cache.get('a')
+        self.cache.set('c', 3)
+
+        assert (self.cache.get('a'), self.cache.get('b'), self.cache.get('c')) == (1, None, 3)
+
+    def test_03_get_or_load(self):
+        loader = mock.Mock(side_effect=[None, {'code': 'p1'}])
+
+        # the entity not found is not cached
+        assert self.cache.get_or_load('g1', loader) is None
+        assert self.cache.get_or_load('g1', loader) == {'code': 'p1'}
+        assert self.cache.get_or_load('g1', loader) == {'code': 'p1'}
+        assert loader.call_count == 2
+
+    def test_04_invalidate(self):
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+
+        self.cache.invalidate('a')
+        assert self.cache.get('a') is None and self.cache.get('b') == 2
+
+        self.cache.invalidate()
+        assert len(self.cache) == 0
+
+    def test_05_disabled(self):
+        for cache in [MetadataCache(maxsize=0, ttl=10), MetadataCache(maxsize=2, ttl=0)]:
+            cache.set('a', 1)
+            assert cache.get('a') is None
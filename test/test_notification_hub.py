@@ -0,0 +1,87 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from client.model.file_task_socket import DatasetFileTaskManager
+from client.model.notification_hub import NotificationHub
+
+
+class FakeSocketioClient:
+    """the socketio client which only delivers the events while it is connected."""
+
+    def __init__(self, **kwargs):
+        self.connected = False
+        self.handlers = {}
+        self.connects = []
+        self.disconnects = 0
+
+    def on(self, event, handler, namespace=None):
+        self.handlers[namespace] = handler
+
+    def connect(self, url, namespaces=None):
+        # the handshake takes a while so the other subscriber overlaps with it
+        time.sleep(0.2)
+        self.connects.append(list(namespaces))
+        self.connected = True
+
+    def disconnect(self):
+        self.disconnects += 1
+        self.connected = False
+
+    def emit_event(self, namespace, data):
+        if self.connected and namespace in self.handlers:
+            self.handlers[namespace](data)
+
+
+def notification(session_id, action, geid):
+    return {
+        'payload': {
+            'session_id': session_id,
+            'status': 'FINISH',
+            'action': action,
+            'source': {'global_entity_id': geid},
+        }
+    }
+
+
+class TestNotificationHub(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch('socketio.Client', FakeSocketioClient)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.hub = NotificationHub('http://socketio')
+        self.addCleanup(self.hub.close)
+
+    def test_01_concurrent_subscribers(self):
+        first = DatasetFileTaskManager(self.hub, 'dataset1', 'dataset_file_import', 'session1')
+        first.set_sources(['file1', 'file2'])
+        connection = self.hub.connections['/dataset1']
+
+        # the second dataset is subscribed while the first one is receiving
+        second = threading.Thread(
+            target=DatasetFileTaskManager, args=(self.hub, 'dataset2', 'dataset_file_delete', 'session2')
+        )
+        second.start()
+        time.sleep(0.05)
+        connection.emit_event('/dataset1', notification('session1', 'dataset_file_import', 'file1'))
+        connection.emit_event('/dataset1', notification('session1', 'dataset_file_import', 'file2'))
+        second.join()
+
+        res = first.wait_response(timeout=1)
+        assert [x['payload']['source']['global_entity_id'] for x in res] == ['file1', 'file2']
+        assert connection.connects == [['/dataset1']] and connection.disconnects == 0
+        assert self.hub.connections['/dataset2'].connects == [['/dataset2']]
+
+    def test_02_subscribe_once(self):
+        self.hub.subscribe('dataset1')
+        self.hub.subscribe('dataset1')
+
+        assert self.hub.connections['/dataset1'].connects == [['/dataset1']]
+
+    def test_03_close(self):
+        self.hub.subscribe('dataset1')
+        connection = self.hub.connections['/dataset1']
+        self.hub.close()
+
+        assert not connection.connected and self.hub.connections == {}
@@ -0,0 +1,54 @@
+import threading
+import unittest
+
+from client.model.page_iterator import PageIterator
+
+
+class FakePages:
+    """the list api of <total> items. the requested pages are recorded."""
+
+    def __init__(self, total):
+        self.items = list(range(total))
+        self.requested = []
+        self._lock = threading.Lock()
+
+    def fetch_page(self, page, page_size=3):
+        with self._lock:
+            self.requested.append(page)
+        return self.items[page * page_size : (page + 1) * page_size]
+
+
+class TestPageIterator(unittest.TestCase):
+    def test_01_all_pages(self):
+        for prefetch in [0, 2]:
+            pages = FakePages(8)
+
+            assert list(PageIterator(pages.fetch_page, page_size=3, prefetch=prefetch)) == pages.items
+
+    def test_02_stop_without_prefetch(self):
+        pages = FakePages(6)
+
+        assert list(PageIterator(pages.fetch_page, page_size=3, prefetch=0)) == pages.items
+        # the full last page needs one more request to know it is the end
+        assert pages.requested == [0, 1, 2]
+
+    def test_03_empty(self):
+        pages = FakePages(0)
+
+        assert list(PageIterator(pages.fetch_page, page_size=3, prefetch=0)) == []
+        assert pages.requested == [0]
+
+    def test_04_prefetch_bounded(self):
+        pages = FakePages(30)
+        iterator = iter(PageIterator(pages.fetch_page, page_size=3, prefetch=2))
+
+        assert [next(iterator) for _ in range(4)] == [0, 1, 2, 3]
+        iterator.close()
+
+        # the current page and at most two pages after it
+        assert max(pages.requested) <= 3
+
+    def test_05_start_page(self):
+        pages = FakePages(8)
+
+        assert list(PageIterator(pages.fetch_page, page_size=3, prefetch=1, start_page=1)) == pages.items[3:]
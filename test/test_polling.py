@@ -0,0 +1,81 @@
+import itertools
+import unittest
+from unittest import mock
+
+from client.exceptions import TaskTimeoutError
+from client.model.polling import PollingStrategy
+
+
+class FakeClock:
+    """the monotonic clock which only moves when the code sleeps."""
+
+    def __init__(self):
+        self.now = 0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestPollingStrategy(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        for name in ['monotonic', 'sleep']:
+            patcher = mock.patch('time.%s' % name, getattr(self.clock, name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_01_backoff(self):
+        polling = PollingStrategy(initial_interval=1, backoff_factor=2, max_interval=5, jitter=0, timeout=0)
+
+        assert list(itertools.islice(polling.intervals(), 6)) == [1, 2, 4, 5, 5, 5]
+
+    def test_02_deadline(self):
+        polling = PollingStrategy(initial_interval=1, backoff_factor=2, max_interval=5, jitter=0, timeout=10)
+
+        delays = []
+        for delay in polling.intervals():
+            delays.append(delay)
+            self.clock.sleep(delay)
+
+        # the last wait is cut to the deadline
+        assert delays == [1, 2, 4, 3]
+
+    def test_03_jitter(self):
+        polling = PollingStrategy(initial_interval=2, backoff_factor=1, max_interval=2, jitter=0.5, timeout=0)
+
+        delays = list(itertools.islice(polling.intervals(), 50))
+
+        assert all(1 <= x <= 3 for x in delays) and len(set(delays)) > 1
+
+    def test_04_poll(self):
+        polling = PollingStrategy(initial_interval=1, backoff_factor=2, max_interval=5, jitter=0, timeout=60)
+        statuses = iter(['RUNNING', 'RUNNING', 'SUCCEED'])
+
+        res = polling.poll(lambda: next(statuses), lambda x: x != 'RUNNING')
+
+        assert res == 'SUCCEED' and self.clock.now == 3
+
+    def test_05_poll_timeout(self):
+        polling = PollingStrategy(initial_interval=1, backoff_factor=2, max_interval=5, jitter=0, timeout=10)
+        checks = []
+
+        def check():
+            checks.append(self.clock.now)
+            return {'status': 'RUNNING'}
+
+        with self.assertRaises(TaskTimeoutError) as context:
+            polling.poll(check, lambda x: x['status'] != 'RUNNING', 'upload')
+
+        # the last check is at the deadline
+        assert checks == [0, 1, 3, 7, 10]
+        assert context.exception.last_status == {'status': 'RUNNING'}
+        assert 'upload' in str(context.exception)
+
+    def test_06_done_at_deadline(self):
+        polling = PollingStrategy(initial_interval=1, backoff_factor=1, max_interval=1, jitter=0, timeout=2)
+        statuses = iter(['RUNNING', 'RUNNING', 'SUCCEED'])
+
+        assert polling.poll(lambda: next(statuses), lambda x: x != 'RUNNING') == 'SUCCEED'
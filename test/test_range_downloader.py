@@ -0,0 +1,244 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from client.api.project_files import ProjectFilesApis
+from client.model.download_record import DownloadRecord
+from client.model.range_downloader import RangeDownloader
+from config import ConfigClass
+
+
+class FakeResponse:
+    def __init__(self, content, status_code=200, headers=None):
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i : i + chunk_size]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class FakeServer:
+    """serve the <data> with the Range support like the download api."""
+
+    def __init__(self, data, support_range=True, broken_after=None):
+        self.data = data
+        self.support_range = support_range
+        # the stream is cut after the bytes
+        self.broken_after = broken_after
+        self.ranges = []
+
+    def send_request(self, api_endpoint, method='GET', headers=None, **kwargs):
+        range_header = (headers or {}).get('Range')
+        self.ranges.append(range_header)
+        if not range_header or not self.support_range:
+            return FakeResponse(self.data[: self.broken_after], headers={'Content-Length': str(len(self.data))})
+
+        start, end = range_header[len('bytes=') :].split('-')
+        end = int(end) if end else len(self.data) - 1
+        content = self.data[int(start) : end + 1]
+        if self.broken_after is not None:
+            content = content[: max(self.broken_after - int(start), 0)]
+        content_range = 'bytes %s-%s/%s' % (start, end, len(self.data))
+        return FakeResponse(content, status_code=206, headers={'Content-Range': content_range})
+
+
+class TestRangeDownloader(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+
+        self.output_path = os.path.join(self.workdir.name, 'data.bin')
+        self.data = os.urandom(1000)
+
+    def downloader(self, server, concurrency=1, range_size=300):
+        downloader = RangeDownloader(None, concurrency=concurrency, range_size=range_size)
+        downloader.BLOCK_SIZE = 64
+        downloader._send_request = server.send_request
+        return downloader
+
+    def read_output(self, path=None):
+        with open(path or self.output_path, 'rb') as f:
+            return f.read()
+
+    def test_01_ranges(self):
+        server = FakeServer(self.data)
+
+        assert self.downloader(server, concurrency=2).download('/download', self.output_path) == 1000
+        assert sorted(server.ranges[1:]) == ['bytes=0-299', 'bytes=300-599', 'bytes=600-899', 'bytes=900-999']
+        assert self.read_output() == self.data
+
+    def test_02_small_file_single_stream(self):
+        server = FakeServer(self.data)
+
+        self.downloader(server, concurrency=2, range_size=2000).download('/download', self.output_path)
+
+        assert server.ranges == ['bytes=0-0', None] and self.read_output() == self.data
+
+    def test_03_no_range_support(self):
+        server = FakeServer(self.data, support_range=False)
+
+        assert self.downloader(server, concurrency=4).download('/download', self.output_path) == 1000
+        assert self.read_output() == self.data
+
+    def test_04_incomplete_stream(self):
+        server = FakeServer(self.data, support_range=False, broken_after=10)
+
+        with self.assertRaises(IOError):
+            self.downloader(server).download('/download', self.output_path)
+
+    def test_05_incomplete_range(self):
+        server = FakeServer(self.data, broken_after=500)
+
+        with self.assertRaises(IOError):
+            self.downloader(server, concurrency=2).download('/download', self.output_path)
+
+    def test_06_single_stream_resume(self):
+        record = DownloadRecord.create(self.output_path)
+        # the server closes the stream early
+        self.downloader(FakeServer(self.data, broken_after=400)).download('/download', record.part_path, record)
+
+        # the progress is saved when the stream stops
+        with open(record.record_path) as f:
+            assert json.load(f)['bytes_received'] == 400
+
+        server = FakeServer(self.data)
+        assert self.downloader(server).download('/download', record.part_path, record) == 1000
+        assert server.ranges == ['bytes=0-0', 'bytes=400-']
+        assert self.read_output(record.part_path) == self.data
+
+    def test_07_ranges_resume(self):
+        record = DownloadRecord.create(self.output_path)
+        with self.assertRaises(IOError):
+            self.downloader(FakeServer(self.data, broken_after=700), concurrency=2).download(
+                '/download', self.output_path, record
+            )
+
+        # the finished ranges are flushed on failure
+        with open(record.record_path) as f:
+            assert sorted(json.load(f)['done_ranges']) == [0, 300]
+
+        server = FakeServer(self.data)
+        self.downloader(server, concurrency=2).download('/download', self.output_path, record)
+
+        assert sorted(server.ranges[1:]) == ['bytes=600-899', 'bytes=900-999']
+        assert self.read_output() == self.data
+
+    def test_08_changed_file_restarts(self):
+        record = DownloadRecord.create(self.output_path)
+        record.update(total_size=2000, single_stream=True, bytes_received=500)
+        with open(self.output_path, 'wb') as f:
+            f.write(b'x' * 500)
+
+        server = FakeServer(self.data)
+        self.downloader(server).download('/download', self.output_path, record)
+
+        assert server.ranges == ['bytes=0-0', None] and self.read_output() == self.data
+
+
+class TestDownloadRecord(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+
+        self.output_path = os.path.join(self.workdir.name, 'data.bin')
+        for name, value in [('download_save_interval_bytes', 100), ('download_save_interval_seconds', 3600)]:
+            self.addCleanup(setattr, ConfigClass, name, getattr(ConfigClass, name))
+            setattr(ConfigClass, name, value)
+
+    def saved(self, record):
+        with open(record.record_path) as f:
+            return json.load(f)
+
+    def test_01_find(self):
+        DownloadRecord.create(self.output_path, project_code='p1', source_geids=['g1', 'g2'])
+        with open(os.path.join(self.workdir.name, 'broken' + DownloadRecord.RECORD_SUFFIX), 'w') as f:
+            f.write('{')
+
+        assert DownloadRecord.find(self.workdir.name, 'p1', ['g2', 'g1']).part_path == self.output_path + '.part'
+        assert DownloadRecord.find(self.workdir.name, 'p1', ['g1']) is None
+        assert DownloadRecord.find(self.workdir.name, 'p2', ['g1', 'g2']) is None
+
+    def test_02_save_on_interval(self):
+        record = DownloadRecord.create(self.output_path)
+
+        assert not record.due(60)
+        assert record.due(40)
+
+    def test_03_save_ranges_on_interval(self):
+        record = DownloadRecord.create(self.output_path)
+
+        record.add_range(0, 60)
+        assert self.saved(record)['done_ranges'] == []
+        record.add_range(60, 60)
+        assert self.saved(record)['done_ranges'] == [0, 60]
+
+    def test_04_flush(self):
+        record = DownloadRecord.create(self.output_path)
+        record.add_range(0, 10)
+        record.flush()
+
+        assert self.saved(record)['done_ranges'] == [0]
+
+    def test_05_remove(self):
+        record = DownloadRecord.create(self.output_path)
+        record.remove()
+
+        assert not os.path.exists(record.record_path)
+
+
+class TestDownloadRename(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+        cwd = os.getcwd()
+        os.chdir(self.workdir.name)
+        self.addCleanup(os.chdir, cwd)
+
+        self.project_files_apis = ProjectFilesApis(None)
+        self.project_files_apis.track_off()
+        self.record = DownloadRecord.create(
+            'data.bin', hash_code='hash', session_id='s1', project_code='p1', source_geids=['g1']
+        )
+
+        status = FakeResponse(json.dumps({'result': {'status': 'READY_FOR_DOWNLOADING'}}).encode())
+        status.json = lambda: json.loads(status.content)
+        patcher = mock.patch.object(ProjectFilesApis, '_send_request', return_value=status)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def download(self, data, total_size):
+        def fake_download(download_url, output_path, record=None, checksum=None):
+            with open(output_path, 'wb') as f:
+                f.write(data)
+            return total_size
+
+        with mock.patch.object(RangeDownloader, 'download', side_effect=fake_download):
+            return self.project_files_apis.fget_file_entity('p1', ['g1'], resumable=True, checksum=False)
+
+    def test_01_incomplete_part_is_kept(self):
+        with self.assertRaises(IOError):
+            self.download(b'abc', 10)
+
+        assert sorted(os.listdir('.')) == ['data.bin.part', 'data.bin.part.json']
+
+    def test_02_complete_part_is_renamed(self):
+        res = self.download(b'abc', 3)
+
+        assert res['status'] == 'READY_FOR_DOWNLOADING'
+        assert os.listdir('.') == ['data.bin']
@@ -0,0 +1,75 @@
+import time
+import unittest
+from unittest import mock
+
+import jwt
+
+from client.api.base_class import BaseAPIClass
+from client.api.project_files import ProjectFilesApis
+from client.api.projects import ProjectApis
+from client.client import HPC
+from client.client import PILOT
+from client.credentials import Credentials
+
+
+def token():
+    access_token = jwt.encode({'preferred_username': 'admin', 'exp': int(time.time() + 3600)}, 'x' * 32)
+    return Credentials(access_token, 'refresh')
+
+
+class FakeResponse:
+    status_code = 200
+
+    def json(self):
+        return {'code': 200, 'result': {}}
+
+
+class TestSessionPool(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(BaseAPIClass, '_logger', mock.Mock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_client(self, **kwargs):
+        pilot_client = PILOT('http://pilot', token_crediential=token(), auto_refresh=False, **kwargs)
+        self.addCleanup(pilot_client.close)
+        return pilot_client
+
+    def test_01_shared_by_apis(self):
+        pilot_client = self.create_client(pool_connections=2, pool_maxsize=16, timeout=(1, 30))
+        session = pilot_client.session
+        adapter = session.get_adapter('https://pilot')
+        assert adapter is session.get_adapter('http://pilot')
+        assert (adapter._pool_connections, adapter._pool_maxsize) == (2, 16)
+
+        with mock.patch.object(session, 'request', return_value=FakeResponse()) as request:
+            ProjectApis(pilot_client)._send_request('/v1/projects')
+            ProjectFilesApis(pilot_client)._send_request('/v1/files')
+
+        # both api objects send through the session of client with its timeout
+        assert [x[1]['url'] for x in request.call_args_list] == ['http://pilot/v1/projects', 'http://pilot/v1/files']
+        assert all(x[1]['timeout'] == (1, 30) for x in request.call_args_list)
+        assert pilot_client.session is session
+
+    def test_02_closed(self):
+        pilot_client = self.create_client()
+
+        with mock.patch.object(pilot_client.session, 'close') as close:
+            pilot_client.close()
+        close.assert_called_once_with()
+
+    def test_03_context_manager(self):
+        with self.create_client() as pilot_client:
+            close = mock.patch.object(pilot_client.session, 'close').start()
+            self.addCleanup(mock.patch.stopall)
+            assert not close.called
+
+        close.assert_called_once_with()
+
+    def test_04_hpc(self):
+        with HPC('issuer', 'http://hpc', token_crediential=token(), pool_maxsize=4) as hpc_client:
+            close = mock.patch.object(hpc_client.session, 'close').start()
+            self.addCleanup(mock.patch.stopall)
+            assert hpc_client.session.get_adapter('https://hpc')._pool_maxsize == 4
+
+        close.assert_called_once_with()
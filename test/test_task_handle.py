@@ -0,0 +1,70 @@
+import unittest
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError
+from unittest import mock
+
+from client.model.task_handle import TaskHandle
+from client.model.task_handle import wait_all
+from client.model.task_watcher import TaskWatcher
+
+
+def handle(result=None):
+    """return the handle of a new future. it is finished with <result> if given."""
+
+    future = Future()
+    if result is not None:
+        future.set_result(result)
+    return TaskHandle(future, 'data_transfer', 'session')
+
+
+class TestTaskHandle(unittest.TestCase):
+    def test_01_result(self):
+        task_handle = handle({'status': 'SUCCEED'})
+
+        assert task_handle.done() and task_handle.result() == {'status': 'SUCCEED'}
+        assert not task_handle.cancel()
+
+    def test_02_not_finished(self):
+        task_handle = handle()
+
+        assert not task_handle.done()
+        with self.assertRaises(TimeoutError):
+            task_handle.result(timeout=0.01)
+
+    def test_03_cancel(self):
+        task_handle = handle()
+
+        assert task_handle.cancel() and task_handle.cancelled() and task_handle.done()
+
+    def test_04_wait_all(self):
+        handles = [handle({'status': 'SUCCEED'}), handle(), handle({'status': 'TERMINATED'})]
+
+        done, not_done = wait_all(handles, timeout=0.01)
+
+        assert done == [handles[0], handles[2]] and not_done == [handles[1]]
+
+    def test_05_wait_first(self):
+        handles = [handle(), handle({'status': 'SUCCEED'})]
+
+        done, not_done = wait_all(handles, return_when=FIRST_COMPLETED)
+
+        assert done == [handles[1]] and not_done == [handles[0]]
+
+    def test_06_followed_by_watcher(self):
+        statuses = iter([[{'status': 'RUNNING'}], [{'status': 'SUCCEED'}]])
+        response = mock.Mock()
+        response.json.side_effect = lambda: {'result': next(statuses)}
+
+        with mock.patch.object(TaskWatcher, '_run', lambda self: None):
+            watcher = TaskWatcher(mock.Mock(username='admin', polling=None), interval=0.01)
+            self.addCleanup(watcher.close)
+            watcher._send_request = mock.Mock(return_value=response)
+
+            task_handle = TaskHandle(watcher.watch_file_task('project', 'data_transfer', 's1'), 'data_transfer', 's1')
+            watcher._tick()
+            assert not task_handle.done()
+            watcher._tick()
+
+        assert wait_all([task_handle], timeout=1) == ([task_handle], [])
+        assert task_handle.result() == {'status': 'SUCCEED'}
@@ -0,0 +1,162 @@
+import threading
+import time
+import unittest
+from concurrent.futures import CancelledError
+from unittest import mock
+
+from client.exceptions import TaskTimeoutError
+from client.model.task_watcher import TaskWatcher
+
+
+class FakeResponse:
+    def __init__(self, result):
+        self.result = result
+
+    def json(self):
+        return {'result': self.result}
+
+
+class FakeTaskServer:
+    """the status apis of file task and upload job. the status of each session can be changed by test."""
+
+    def __init__(self):
+        self.sessions = {}
+        # the sessions to fail the next request of
+        self.errors = set()
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def send_request(self, api_endpoint, method='GET', params=None, headers=None, **kwargs):
+        session_id = (params or {}).get('session_id') or (headers or {}).get('Session-ID')
+        with self._lock:
+            self.requests.append(session_id)
+            if session_id in self.errors:
+                self.errors.discard(session_id)
+                raise ConnectionError('status api is down')
+        return FakeResponse(list(self.sessions.get(session_id, [])))
+
+
+class TestTaskWatcher(unittest.TestCase):
+    def setUp(self):
+        # the ticks are run by test instead of the background thread
+        for name, value in [('_run', lambda self: None), ('_logger', mock.Mock())]:
+            patcher = mock.patch.object(TaskWatcher, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.server = FakeTaskServer()
+        self.watcher = self.create_watcher()
+
+    def create_watcher(self, **kwargs):
+        watcher = TaskWatcher(mock.Mock(username='admin', polling=None), interval=0.01, **kwargs)
+        watcher._send_request = self.server.send_request
+        self.addCleanup(watcher.close)
+        return watcher
+
+    def test_01_finished_and_pending(self):
+        self.server.sessions = {'s1': [{'status': 'SUCCEED'}], 's2': [{'status': 'RUNNING'}]}
+        first = self.watcher.watch_file_task('project', 'data_transfer', 's1')
+        second = self.watcher.watch_file_task('project', 'data_transfer', 's2')
+        self.watcher._tick()
+
+        assert first.result(0) == {'status': 'SUCCEED'}
+        assert not second.done() and self.watcher.pending() == 1
+
+        self.server.sessions['s2'] = [{'status': 'TERMINATED'}]
+        self.watcher._tick()
+
+        assert second.result(0) == {'status': 'TERMINATED'} and self.watcher.pending() == 0
+        assert sorted(self.server.requests[:2]) == ['s1', 's2'] and self.server.requests[2:] == ['s2']
+
+    def test_02_one_request_per_session(self):
+        self.server.sessions = {'s1': [{'job_id': 'j2', 'status': 'SUCCEED'}, {'job_id': 'j1', 'status': 'RUNNING'}]}
+        futures = [self.watcher.watch_upload_jobs('project', 's1', [x]) for x in ['j1', 'j2']]
+        self.watcher._tick()
+
+        assert self.server.requests == ['s1']
+        assert futures[1].result(0) == [{'job_id': 'j2', 'status': 'SUCCEED'}] and not futures[0].done()
+
+    def test_03_deadline_with_partial_result(self):
+        watcher = self.create_watcher(timeout=0.01)
+        self.server.sessions = {'s1': [{'job_id': 'j1', 'status': 'SUCCEED'}, {'job_id': 'j2', 'status': 'RUNNING'}]}
+        future = watcher.watch_file_task('project', 'data_delete', 's1', job_ids=['j1', 'j2'])
+        time.sleep(0.02)
+        watcher._tick()
+
+        with self.assertRaises(TaskTimeoutError) as context:
+            future.result(0)
+        assert context.exception.last_status == [
+            {'job_id': 'j1', 'status': 'SUCCEED'},
+            {'job_id': 'j2', 'status': 'RUNNING'},
+        ]
+
+    def test_04_cancelled_future_dropped(self):
+        self.server.sessions = {'s1': [{'status': 'RUNNING'}]}
+        future = self.watcher.watch_file_task('project', 'data_transfer', 's1')
+        future.cancel()
+        self.watcher._tick()
+
+        assert self.watcher.pending() == 0 and self.server.requests == []
+        with self.assertRaises(CancelledError):
+            future.result(0)
+
+    def test_05_failed_fetch_retried(self):
+        self.server.sessions = {'s1': [{'status': 'SUCCEED'}], 's2': [{'status': 'SUCCEED'}]}
+        self.server.errors = {'s1'}
+        first = self.watcher.watch_file_task('project', 'data_transfer', 's1')
+        second = self.watcher.watch_file_task('project', 'data_transfer', 's2')
+        self.watcher._tick()
+
+        # only the task of failed session waits for next tick
+        assert not first.done() and second.result(0) == {'status': 'SUCCEED'}
+
+        self.watcher._tick()
+        assert first.result(0) == {'status': 'SUCCEED'}
+
+    def test_06_requests_per_tick(self):
+        watcher = self.create_watcher(max_requests=2)
+        self.server.sessions = {'s%s' % x: [{'status': 'RUNNING'}] for x in range(5)}
+        for session_id in sorted(self.server.sessions):
+            watcher.watch_file_task('project', 'data_transfer', session_id)
+
+        ticks = []
+        for _ in range(3):
+            self.server.requests = []
+            watcher._tick()
+            ticks.append(sorted(self.server.requests))
+
+        # the sessions not queried for the longest time go first
+        assert ticks == [['s0', 's1'], ['s2', 's3'], ['s0', 's4']]
+
+    def test_07_closed(self):
+        future = self.watcher.watch_file_task('project', 'data_transfer', 's1')
+        self.watcher.close()
+
+        assert future.cancelled()
+        with self.assertRaises(RuntimeError):
+            self.watcher.watch_file_task('project', 'data_transfer', 's2')
+
+
+class TestTaskWatcherThread(unittest.TestCase):
+    def test_01_survive_tick_error(self):
+        server = FakeTaskServer()
+        server.sessions = {'s1': [{'status': 'SUCCEED'}]}
+        watcher = TaskWatcher(mock.Mock(username='admin', polling=None), interval=0.01)
+        watcher._send_request = server.send_request
+        self.addCleanup(watcher.close)
+
+        tick = watcher._tick
+        calls = []
+
+        def broken_tick():
+            calls.append(1)
+            if len(calls) == 1:
+                raise ValueError('unexpected')
+            tick()
+
+        logger = mock.Mock()
+        with mock.patch.object(watcher, '_tick', broken_tick), mock.patch.object(TaskWatcher, '_logger', logger):
+            future = watcher.watch_file_task('project', 'data_transfer', 's1')
+
+            assert future.result(5) == {'status': 'SUCCEED'}
+            assert len(calls) >= 2 and logger.error.called
@@ -0,0 +1,80 @@
+import os
+import stat
+import tempfile
+import threading
+import time
+import unittest
+
+from client.credentials import Credentials
+from client.model.token_cache import TokenCache
+
+
+class TestTokenCache(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+
+        self.cache_path = os.path.join(self.workdir.name, 'cache', 'tokens.json')
+        self.token_cache = TokenCache(self.cache_path)
+        self.key = TokenCache.key('http://pilot', 'admin')
+
+    def test_01_save_and_load(self):
+        self.token_cache.save(self.key, Credentials('access', 'refresh'))
+        self.token_cache.save(TokenCache.key('http://pilot', 'other'), Credentials('access2'))
+
+        token = TokenCache(self.cache_path).load(self.key)
+
+        assert (token.access_token, token.refresh_token) == ('access', 'refresh')
+        assert self.token_cache.load(TokenCache.key('http://pilot', 'other')).refresh_token is None
+
+    def test_02_owner_only(self):
+        self.token_cache.put(self.key, Credentials('access'))
+
+        assert stat.S_IMODE(os.stat(self.cache_path).st_mode) == 0o600
+        assert stat.S_IMODE(os.stat(self.cache_path + '.lock').st_mode) == 0o600
+        assert [x for x in os.listdir(os.path.dirname(self.cache_path)) if x.endswith('.tmp')] == []
+
+    def test_03_missing_or_broken(self):
+        assert self.token_cache.load(self.key) is None
+
+        os.makedirs(os.path.dirname(self.cache_path))
+        with open(self.cache_path, 'w') as f:
+            f.write('{"http://pilot|admin": ')
+        assert self.token_cache.load(self.key) is None
+
+        # the broken file is replaced by the next save
+        self.token_cache.save(self.key, Credentials('access'))
+        assert self.token_cache.load(self.key).access_token == 'access'
+
+    def test_04_remove(self):
+        self.token_cache.save(self.key, Credentials('access'))
+        self.token_cache.remove(self.key)
+        self.token_cache.remove(self.key)
+
+        assert self.token_cache.load(self.key) is None
+
+    def test_05_get_and_put(self):
+        self.token_cache.put(self.key, Credentials('access', 'refresh'))
+
+        assert self.token_cache.get(self.key).refresh_token == 'refresh'
+
+    def test_06_key(self):
+        assert TokenCache.key('http://pilot', 'admin', None) == 'http://pilot|admin'
+
+    def test_07_exclusive_lock(self):
+        events = []
+
+        def login(name):
+            with TokenCache(self.cache_path).lock():
+                events.append(name + ' start')
+                time.sleep(0.1)
+                events.append(name + ' end')
+
+        threads = [threading.Thread(target=login, args=(x,)) for x in ['a', 'b']]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # the second login only starts after the first one ends
+        assert events[1].endswith('end') and events[2].endswith('start')
@@ -0,0 +1,177 @@
+import gc
+import io
+import time
+import unittest
+import weakref
+from unittest import mock
+
+import jwt
+
+from client.api.base_class import BaseAPIClass
+from client.client import PILOT
+from client.credentials import Credentials
+from client.credentials import decode_jwt
+from client.exceptions import AuthenticationError
+from client.exceptions import Unauthorized
+from config import ConfigClass
+
+
+def access_token(expires_in):
+    return jwt.encode({'preferred_username': 'admin', 'exp': int(time.time() + expires_in)}, 'x' * 32)
+
+
+class TestCredentials(unittest.TestCase):
+    def test_01_claims(self):
+        token = access_token(3600)
+
+        assert decode_jwt(token)['preferred_username'] == 'admin'
+        assert Credentials(token).expires_at == decode_jwt(token)['exp']
+
+    def test_02_not_jwt(self):
+        with self.assertRaises(ValueError):
+            decode_jwt('opaque')
+        assert Credentials('opaque').claims == {} and Credentials('opaque').expires_at is None
+
+
+class FakeStopped:
+    """the stop event of refresh loop which records the delays instead of waiting."""
+
+    def __init__(self):
+        self.delays = []
+
+    def wait(self, timeout):
+        self.delays.append(timeout)
+        return False
+
+
+class FakeClient:
+    """the client which fails each refresh with the given error."""
+
+    def __init__(self, error):
+        self.token = Credentials(access_token(3600), 'refresh')
+        self.error = error
+        self.refreshes = 0
+
+    def refresh_token(self, stale=None):
+        self.refreshes += 1
+        raise self.error
+
+
+class TestRefreshLoop(unittest.TestCase):
+    def setUp(self):
+        for name, value in [('token_refresh_margin', 120), ('token_refresh_retry_interval', 5)]:
+            self.addCleanup(setattr, ConfigClass, name, getattr(ConfigClass, name))
+            setattr(ConfigClass, name, value)
+
+    def run_loop(self, client):
+        stopped = FakeStopped()
+        PILOT._refresh_loop(weakref.ref(client), stopped)
+        return stopped.delays
+
+    def test_01_backoff(self):
+        client = FakeClient(ConnectionError('refresh api is down'))
+        delays = self.run_loop(client)
+
+        # refresh <margin> seconds before expiry, then retry with the doubled interval
+        assert 3470 < delays[0] <= 3480
+        assert delays[1:] == [5, 10, 20, 40]
+
+    def test_02_give_up_after_max_failures(self):
+        client = FakeClient(ConnectionError('refresh api is down'))
+        self.run_loop(client)
+
+        assert client.refreshes == ConfigClass.token_refresh_max_failures
+
+    def test_03_backoff_capped_by_margin(self):
+        self.addCleanup(setattr, ConfigClass, 'token_refresh_max_failures', ConfigClass.token_refresh_max_failures)
+        setattr(ConfigClass, 'token_refresh_max_failures', 8)
+        delays = self.run_loop(FakeClient(ConnectionError('refresh api is down')))
+
+        assert delays[1:] == [5, 10, 20, 40, 80, 120, 120]
+
+    def test_04_rejected(self):
+        client = FakeClient(AuthenticationError('refresh token is revoked'))
+        self.run_loop(client)
+
+        assert client.refreshes == 1
+
+
+class TestRefreshThread(unittest.TestCase):
+    def test_01_stop_after_collected(self):
+        pilot_client = PILOT('http://pilot', token_crediential=Credentials(access_token(3600), 'refresh'))
+        thread = pilot_client._token_refresh_thread
+        assert thread.is_alive()
+
+        # the client is not closed
+        del pilot_client
+        gc.collect()
+        thread.join(5)
+
+        assert not thread.is_alive()
+
+    def test_02_stop_on_close(self):
+        with PILOT('http://pilot', token_crediential=Credentials(access_token(3600), 'refresh')) as pilot_client:
+            thread = pilot_client._token_refresh_thread
+
+        thread.join(5)
+        assert not thread.is_alive()
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.closed = False
+
+    def json(self):
+        return {'code': self.status_code}
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    """reject the first request with 401. the body of each request is recorded."""
+
+    def __init__(self):
+        self.bodies = []
+        self.tokens = []
+
+    def request(self, headers, data, **kwargs):
+        self.tokens.append(headers['Authorization'])
+        self.bodies.append(data.read() if hasattr(data, 'read') else data)
+        return FakeResponse(401 if len(self.bodies) == 1 else 200)
+
+
+class TestResendAfter401(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(BaseAPIClass, '_logger', mock.Mock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.token = Credentials('old', 'refresh')
+        self.client = mock.Mock(base_url='http://pilot', token=self.token, session=FakeSession())
+        self.client.refresh_token.return_value = Credentials('new', 'refresh')
+        self.apis = BaseAPIClass(self.client)
+        self.apis.track_flag = False
+
+    def test_01_stream_rewound(self):
+        body = io.BytesIO(b'chunk data')
+        res = self.apis._send_request('/v1/upload', method='POST', data=body)
+
+        assert res.status_code == 200
+        assert self.client.session.bodies == [b'chunk data', b'chunk data']
+        assert self.client.session.tokens == ['Bearer old', 'Bearer new']
+        self.client.refresh_token.assert_called_once_with(stale=self.token)
+
+    def test_02_only_once(self):
+        self.client.session.request = lambda headers, data, **kwargs: FakeResponse(401)
+
+        with self.assertRaises(Unauthorized):
+            self.apis._send_request('/v1/test')
+        assert self.client.refresh_token.call_count == 1
+
+    def test_03_iterator_not_resent(self):
+        with self.assertRaises(Unauthorized):
+            self.apis._send_request('/v1/upload', method='POST', data=iter([b'chunk data']))
+
+        assert len(self.client.session.bodies) == 1 and not self.client.refresh_token.called
@@ -0,0 +1,93 @@
+import threading
+import time
+import unittest
+
+from client.model.tree_walker import is_folder
+from client.model.tree_walker import walk_tree
+
+
+def folder(geid, name):
+    return {'global_entity_id': geid, 'name': name, 'labels': ['Folder']}
+
+
+def file(geid, name):
+    return {'global_entity_id': geid, 'name': name, 'labels': ['File']}
+
+
+class FakeTree:
+    """the child nodes of each folder geid. the listing of each folder can be delayed by test."""
+
+    def __init__(self):
+        self.children = {
+            None: [folder('a', 'a'), folder('b', 'b'), file('f1', 'root.txt')],
+            'a': [folder('a1', 'a1'), file('f2', 'a.txt')],
+            'a1': [folder('a2', 'a2')],
+            'a2': [file('f3', 'deep.txt')],
+            'b': [file('f4', 'b.txt')],
+        }
+        self.delays = {}
+        self.listed = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def list_children(self, geid):
+        with self._lock:
+            self.listed.append(geid)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delays.get(geid, 0.01))
+        with self._lock:
+            self.in_flight -= 1
+        return iter(self.children.get(geid, []))
+
+
+class TestWalkTree(unittest.TestCase):
+    def setUp(self):
+        self.tree = FakeTree()
+
+    def walk(self, **kwargs):
+        """return the (path, folder names, file names) of walk."""
+
+        return [
+            (path, [x['name'] for x in folders], [x['name'] for x in files])
+            for path, folders, files in walk_tree(self.tree.list_children, **kwargs)
+        ]
+
+    def test_01_breadth_first(self):
+        result = self.walk(concurrency=1)
+
+        assert result == [
+            ('', ['a', 'b'], ['root.txt']),
+            ('a', ['a1'], ['a.txt']),
+            ('b', [], ['b.txt']),
+            ('a/a1', ['a2'], []),
+            ('a/a1/a2', [], ['deep.txt']),
+        ]
+
+    def test_02_max_depth(self):
+        assert [x[0] for x in self.walk(max_depth=0)] == ['']
+        assert sorted(x[0] for x in self.walk(max_depth=1)) == ['', 'a', 'b']
+        assert 'a2' not in self.tree.listed
+
+    def test_03_yield_as_arrived(self):
+        # the slow folder does not hold back the others of same level
+        self.tree.delays = {'a': 0.2}
+        result = self.walk(concurrency=4)
+
+        assert [x[0] for x in result][:2] == ['', 'b']
+        assert sorted(x[0] for x in result) == ['', 'a', 'a/a1', 'a/a1/a2', 'b']
+        assert self.tree.max_in_flight == 2
+
+    def test_04_skip_removed_folders(self):
+        walker = walk_tree(self.tree.list_children, root_geid='a', root_path='a')
+        result = []
+        for path, folders, files in walker:
+            result.append(path)
+            # like os.walk, the removed folders are not listed
+            folders[:] = []
+
+        assert result == ['a'] and self.tree.listed == ['a']
+
+    def test_05_is_folder(self):
+        assert is_folder(folder('a', 'a')) and not is_folder(file('f', 'f')) and not is_folder({})
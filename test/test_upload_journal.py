@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+
+from client.model.upload_journal import UploadJournal
+
+
+class TestUploadJournal(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+
+        self.journal_path = UploadJournal.journal_path_for(self.workdir.name, 'project', 'a.txt', 'raw')
+        self.header = {'resumable_identifier': 'id1', 'file_size': 10, 'file_mtime': 1}
+
+    def test_01_replay(self):
+        journal = UploadJournal.create(self.journal_path, self.header)
+        journal.ack_chunk(1)
+        journal.ack_chunk(3)
+        journal.set_job('job1')
+
+        res = UploadJournal.load(self.journal_path, {'file_size': 10, 'file_mtime': 1})
+
+        assert res.header == self.header
+        assert res.acked_chunks == {1, 3}
+        assert res.job_id == 'job1'
+
+    def test_02_half_written_record(self):
+        journal = UploadJournal.create(self.journal_path, self.header)
+        journal.ack_chunk(1)
+        # the process is killed in the middle of writing the last record
+        with open(self.journal_path, 'a') as f:
+            f.write('{"chunk": ')
+
+        res = UploadJournal.load(self.journal_path, {'file_size': 10})
+
+        assert res.acked_chunks == {1}
+
+    def test_03_broken_header(self):
+        with open(self.journal_path, 'w') as f:
+            f.write('not json\n{"chunk": 1}\n')
+
+        assert UploadJournal.load(self.journal_path, {}) is None
+
+    def test_04_empty_journal(self):
+        open(self.journal_path, 'w').close()
+
+        assert UploadJournal.load(self.journal_path, {}) is None
+
+    def test_05_changed_file(self):
+        UploadJournal.create(self.journal_path, self.header).ack_chunk(1)
+
+        assert UploadJournal.load(self.journal_path, {'file_size': 10, 'file_mtime': 2}) is None
+
+    def test_06_missing_journal(self):
+        assert UploadJournal.load(self.journal_path, {}) is None
+
+    def test_07_create_overwrites(self):
+        UploadJournal.create(self.journal_path, self.header).ack_chunk(1)
+        UploadJournal.create(self.journal_path, dict(self.header, resumable_identifier='id2'))
+
+        res = UploadJournal.load(self.journal_path, {})
+
+        assert res.header['resumable_identifier'] == 'id2' and res.acked_chunks == set()
+
+    def test_08_remove(self):
+        journal = UploadJournal.create(self.journal_path, self.header)
+        journal.remove()
+        journal.remove()
+
+        assert not os.path.exists(self.journal_path)
+
+    def test_09_journal_path(self):
+        same = UploadJournal.journal_path_for(self.workdir.name, 'project', 'a.txt', 'raw')
+        other = UploadJournal.journal_path_for(self.workdir.name, 'project', 'a.txt', 'processed')
+
+        assert same == self.journal_path and other != self.journal_path